@@ -0,0 +1,82 @@
+"""
+Time building a corpus index and answering queries from it, against run processing the
+corpus again for the same table
+
+Usage:
+    python benchmarks/index.py /tmp/corpus --repeat 20
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+from frequent_interesting_words.index import CorpusIndex
+
+COMMAND = [
+    sys.executable,
+    "-c",
+    "from frequent_interesting_words.cli import main; main()",
+]
+
+
+def timed_command(*args: str) -> float:
+    """Run the command line, returning its wall time in seconds"""
+    start = time.perf_counter()
+    subprocess.run([*COMMAND, *args], stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def timed_query(query, repeat: int) -> float:
+    """The median wall time of a query in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+@click.command()
+@click.argument("path", type=click.Path("r"))
+@click.option("--repeat", type=int, default=20, show_default=True)
+@click.option("--jobs", type=int, default=1, show_default=True)
+def index_benchmark(path, repeat, jobs):
+    """Time index and run on PATH, then the queries of an open index"""
+    with tempfile.TemporaryDirectory() as td:
+        database = os.path.join(td, "index.db")
+        options = ["--jobs", str(jobs), "--no-cache"]
+        run_seconds = timed_command(
+            "run", path, *options, "--target", os.path.join(td, "run.md")
+        )
+        index_seconds = timed_command("index", path, *options, "--database", database)
+
+        with CorpusIndex(database) as index:
+            top = [word for word, _ in index.top(10)]
+            document = index.word_documents(top[0])[0][0]
+            queries = {
+                "top 10": lambda: index.top(10),
+                f"documents of {top[0]}": lambda: index.word_documents(top[0]),
+                "words of a document": lambda: index.document_words(document),
+                f"sentences of {top[0]}": lambda: index.sample_sentences(top[:1]),
+                "table of the top 10": lambda: index.sample_sentences(index.result(10)),
+            }
+            milliseconds = {
+                name: timed_query(query, repeat) for name, query in queries.items()
+            }
+        size = os.path.getsize(database)
+
+    click.echo(f"run {run_seconds:.2f}s, index {index_seconds:.2f}s")
+    click.echo(f"index {size / 2**20:.2f}MB")
+    click.echo("|query|median ms|")
+    click.echo("|-----|---------|")
+    for name, value in milliseconds.items():
+        click.echo(f"|{name}|{value:.2f}|")
+
+
+if __name__ == "__main__":
+    index_benchmark()
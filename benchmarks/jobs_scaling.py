@@ -0,0 +1,64 @@
+"""
+Report how the --jobs speedup scales with core count
+
+Usage:
+    python benchmarks/jobs_scaling.py sample_docs/ --max-jobs 8
+"""
+
+import os
+import tempfile
+import time
+
+import click
+
+from frequent_interesting_words.cli import frequent_interesting_words
+
+
+@click.command()
+@click.argument("path", type=click.Path("r"))
+@click.option(
+    "--max-jobs",
+    type=int,
+    default=os.cpu_count() or 1,
+    help="Largest worker count to measure, doubling from 1",
+)
+@click.option(
+    "--repeat", type=int, default=3, help="Runs per worker count, the fastest is kept"
+)
+def jobs_scaling(path, max_jobs, repeat):
+    """Time the full command at increasing --jobs values and print speedup and efficiency"""
+    job_counts = []
+    jobs = 1
+    while jobs < max_jobs:
+        job_counts.append(jobs)
+        jobs *= 2
+    job_counts.append(max_jobs)
+
+    with tempfile.TemporaryDirectory() as td:
+        baseline = None
+        click.echo("|jobs|seconds|speedup|efficiency|")
+        click.echo("|----|-------|-------|----------|")
+        for jobs in job_counts:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                frequent_interesting_words.main(
+                    [
+                        path,
+                        "--jobs",
+                        str(jobs),
+                        "--no-cache",
+                        "--target",
+                        os.path.join(td, "out.md"),
+                    ],
+                    standalone_mode=False,
+                )
+                timings.append(time.perf_counter() - start)
+            seconds = min(timings)
+            baseline = baseline or seconds
+            speedup = baseline / seconds
+            click.echo(f"|{jobs}|{seconds:.2f}|{speedup:.2f}x|{speedup / jobs:.0%}|")
+
+
+if __name__ == "__main__":
+    jobs_scaling()
@@ -0,0 +1,87 @@
+"""
+Compare the memory held by the aggregated WordsWithFrequencyDict as a plain dict of dicts,
+with a dict entry for every document of every word, against WordFrequencyAggregator's
+path table and packed posting lists
+
+Word frequencies follow a Zipf distribution and paths look like those of a real corpus,
+nested a few directories deep.
+
+Usage:
+    python benchmarks/memory.py --documents 20000 --words-per-document 50
+"""
+
+import random
+import tracemalloc
+from collections import defaultdict
+from itertools import accumulate
+
+import click
+
+from frequent_interesting_words.aggregation import WordFrequencyAggregator
+
+
+def synthetic_collection(
+    documents: int, words_per_document: int, vocabulary: int, seed: int = 0
+) -> list[dict[str, dict[str, int]]]:
+    """One WordsWithFrequencyDict per document, words drawn from a Zipf distribution"""
+    rng = random.Random(seed)
+    cum_weights = list(accumulate(1 / rank for rank in range(1, vocabulary + 1)))
+    words = [f"word{rank}" for rank in range(vocabulary)]
+    collection = []
+    for d in range(documents):
+        path = f"/data/corpora/news/{d // 10000:03d}/{d // 100 % 100:02d}/article-{d:08d}.txt"
+        drawn = rng.choices(words, cum_weights=cum_weights, k=words_per_document)
+        # fresh word strings for every document, as if unpickled from a worker
+        collection.append({"".join(word): {path: rng.randint(1, 20)} for word in drawn})
+    return collection
+
+
+def dict_of_dicts(collection):
+    words = defaultdict(dict)
+    totals = {}
+    for words_with_frequency in collection:
+        for word, v in words_with_frequency.items():
+            words[word].update(v)
+            totals[word] = totals.get(word, 0) + sum(v.values())
+    return words, totals
+
+
+def aggregator(collection):
+    aggregator = WordFrequencyAggregator()
+    for words_with_frequency in collection:
+        aggregator.add(words_with_frequency)
+    return aggregator
+
+
+REPRESENTATIONS = {"dict of dicts": dict_of_dicts, "aggregator": aggregator}
+
+
+def measure(build, collection) -> int:
+    """The bytes still allocated by what build returns, the collection is not counted"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build(collection)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del built
+    return size
+
+
+@click.command()
+@click.option("--documents", type=int, default=20_000, show_default=True)
+@click.option("--words-per-document", type=int, default=50, show_default=True)
+@click.option("--vocabulary", type=int, default=200_000, show_default=True)
+def memory(documents, words_per_document, vocabulary):
+    """Report the memory held by each representation of the aggregate"""
+    collection = synthetic_collection(documents, words_per_document, vocabulary)
+    postings = sum(len(words_with_frequency) for words_with_frequency in collection)
+    click.echo(f"{documents} documents, {postings} postings")
+    click.echo("|representation|MB|bytes per posting|")
+    click.echo("|--------------|--|-----------------|")
+    for name, build in REPRESENTATIONS.items():
+        size = measure(build, collection)
+        click.echo(f"|{name}|{size / 2**20:.1f}|{size / postings:.0f}|")
+
+
+if __name__ == "__main__":
+    memory()
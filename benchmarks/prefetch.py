@@ -0,0 +1,72 @@
+"""
+Compare the full command with documents read by the workers against documents read
+ahead by the prefetcher, with and without reusing the texts for sample sentences
+
+Reads from the page cache are cheap, drop it between runs or point PATH at a network
+or spinning disk to see what prefetching hides.
+
+Usage:
+    python benchmarks/prefetch.py sample_docs/ --jobs 4
+"""
+
+import os
+import tempfile
+import time
+
+import click
+
+from frequent_interesting_words.cli import frequent_interesting_words
+from frequent_interesting_words.prefetch import DEFAULT_READERS, DEFAULT_REUSE_MB
+
+SETTINGS = {
+    "workers read": ["--prefetch", "0"],
+    "prefetch": ["--reuse-budget", "0"],
+    "prefetch and reuse": ["--reuse-budget", str(DEFAULT_REUSE_MB)],
+}
+
+
+@click.command()
+@click.argument("path", type=click.Path("r"))
+@click.option("--jobs", type=int, default=0, help="Worker processes, as for run")
+@click.option(
+    "--readers",
+    type=int,
+    default=DEFAULT_READERS,
+    show_default=True,
+    help="Documents read ahead at once",
+)
+@click.option(
+    "--repeat", type=int, default=3, help="Runs per setting, the fastest is kept"
+)
+def prefetch(path, jobs, readers, repeat):
+    """Time the full command on PATH with prefetching off, on, and on with text reuse"""
+    with tempfile.TemporaryDirectory() as td:
+        baseline = None
+        click.echo("|setting|seconds|speedup|")
+        click.echo("|-------|-------|-------|")
+        for setting, args in SETTINGS.items():
+            if args[:2] != ["--prefetch", "0"]:
+                args = ["--prefetch", str(readers), *args]
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                frequent_interesting_words.main(
+                    [
+                        path,
+                        "--jobs",
+                        str(jobs),
+                        "--no-cache",
+                        "--target",
+                        os.path.join(td, "out.md"),
+                        *args,
+                    ],
+                    standalone_mode=False,
+                )
+                timings.append(time.perf_counter() - start)
+            seconds = min(timings)
+            baseline = baseline or seconds
+            click.echo(f"|{setting}|{seconds:.2f}|{baseline / seconds:.2f}x|")
+
+
+if __name__ == "__main__":
+    prefetch()
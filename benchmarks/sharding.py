@@ -0,0 +1,80 @@
+"""
+Time a corpus processed by run against the same corpus split into hash partitions, each
+mapped by its own process standing in for a node, then merged, checking the tables match
+
+Usage:
+    python benchmarks/sharding.py /tmp/corpus --shards 4
+"""
+
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+COMMAND = [
+    sys.executable,
+    "-c",
+    "from frequent_interesting_words.cli import main; main()",
+]
+
+
+def timed(*commands: list[str]) -> float:
+    """Run the commands at once, returning the seconds until the last one finished"""
+    start = time.perf_counter()
+    processes = [
+        subprocess.Popen(command, stdout=subprocess.DEVNULL) for command in commands
+    ]
+    for process in processes:
+        if process.wait():
+            raise click.ClickException(f"{' '.join(process.args)} failed")
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.argument("path", type=click.Path("r"))
+@click.option("--shards", type=int, default=4, show_default=True)
+@click.option(
+    "--jobs",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Worker processes of run and of each map",
+)
+def sharding(path, shards, jobs):
+    """Time run on PATH, then map on each of --shards partitions in parallel and merge"""
+    with tempfile.TemporaryDirectory() as td:
+        options = ["--jobs", str(jobs), "--no-cache"]
+        run_seconds = timed(
+            [*COMMAND, "run", path, *options, "--target", os.path.join(td, "run.md")]
+        )
+
+        partials = [os.path.join(td, f"shard-{i}.fiwp") for i in range(shards)]
+        map_seconds = timed(
+            *(
+                [*COMMAND, "map", path, *options, "--shard", f"{i}/{shards}"]
+                + ["--output", partial]
+                for i, partial in enumerate(partials)
+            )
+        )
+        merge_seconds = timed(
+            [*COMMAND, "merge", *partials, "--target", os.path.join(td, "merge.md")]
+        )
+        size = sum(os.path.getsize(partial) for partial in partials)
+        identical = filecmp.cmp(
+            os.path.join(td, "run.md"), os.path.join(td, "merge.md"), shallow=False
+        )
+
+    click.echo("|stage|seconds|")
+    click.echo("|-----|-------|")
+    click.echo(f"|run|{run_seconds:.2f}|")
+    click.echo(f"|map, {shards} shards at once|{map_seconds:.2f}|")
+    click.echo(f"|merge|{merge_seconds:.2f}|")
+    click.echo(f"partials total {size / 2**20:.2f}MB, tables identical: {identical}")
+
+
+if __name__ == "__main__":
+    sharding()
@@ -0,0 +1,350 @@
+"""
+Time each stage of the pipeline on a synthetic corpus and catch regressions between commits
+
+Usage:
+    python benchmarks/stages.py sample_docs/ --documents 1000 --document-size 4KB --output results.json
+    python benchmarks/stages.py sample_docs/ --documents 1000 --document-size 4KB --baseline results.json
+"""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import click
+from synthetic_corpus import SizeType, generate_corpus
+
+from frequent_interesting_words.discovery import iter_filepaths
+from frequent_interesting_words.pipeline import (
+    aggregate_words_with_frequency,
+    build_word_occurance_dict,
+    extract_keywords,
+    extract_sample_sentences_for_keywords,
+    format_output_table,
+)
+
+RESULTS_VERSION = 1
+STAGES = (
+    "discovery",
+    "extract_keywords",
+    "build_word_occurance_dict",
+    "aggregate_words_with_frequency",
+    "extract_sample_sentences",
+    "render",
+)
+
+
+class StageTimings:
+    """Wall and CPU time, items and bytes accumulated per stage over many timed calls"""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.cpu_seconds = defaultdict(float)
+        self.items = defaultdict(int)
+        self.bytes = defaultdict(int)
+        self.peak_rss = {}
+
+    @contextmanager
+    def time(self, stage: str, items: int = 1, nbytes: int = 0):
+        start, cpu_start = time.perf_counter(), time.process_time()
+        yield
+        self.seconds[stage] += time.perf_counter() - start
+        self.cpu_seconds[stage] += time.process_time() - cpu_start
+        self.items[stage] += items
+        self.bytes[stage] += nbytes
+
+    def finish(self, stage: str):
+        """Record the peak memory of the process so far, once the stage is over"""
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 2**10
+        self.peak_rss[stage] = (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+        )
+
+    def results(self) -> dict:
+        return {
+            stage: {
+                "seconds": self.seconds[stage],
+                "cpu_seconds": self.cpu_seconds[stage],
+                "items": self.items[stage],
+                "items_per_second": (
+                    self.items[stage] / self.seconds[stage]
+                    if self.seconds[stage]
+                    else None
+                ),
+                "mb_per_second": (
+                    self.bytes[stage] / 2**20 / self.seconds[stage]
+                    if self.seconds[stage] and self.bytes[stage]
+                    else None
+                ),
+                "peak_rss_mb": self.peak_rss.get(stage),
+            }
+            for stage in STAGES
+        }
+
+
+def read(filepath: str) -> str:
+    with open(filepath, "r") as f:
+        return f.read()
+
+
+def run_stages(corpus: str, word_limit: int, limit: int, example_limit: int) -> dict:
+    """
+    Run every stage over the corpus the way the CLI does, timing only the stage's own work
+
+    Args:
+        corpus: directory of documents
+        word_limit: keywords extracted per document
+        limit: words kept in the aggregate
+        example_limit: sample sentences per document and word
+
+    Returns: Mapping of stage to its timings
+    """
+    timings = StageTimings()
+
+    with timings.time("discovery"):
+        filepaths = list(iter_filepaths(corpus))
+    timings.items["discovery"] = len(filepaths)
+    timings.finish("discovery")
+
+    keywords = []
+    for filepath in filepaths:
+        text = read(filepath)
+        with timings.time("extract_keywords", nbytes=len(text)):
+            keywords.append(extract_keywords(text, word_limit))
+    timings.finish("extract_keywords")
+
+    collection = []
+    for filepath, words in zip(filepaths, keywords):
+        text = read(filepath)
+        with timings.time("build_word_occurance_dict", nbytes=len(text)):
+            frequencies = build_word_occurance_dict(text, words)
+        collection.append(
+            {word: {filepath: frequency} for word, frequency in frequencies.items()}
+        )
+    del keywords
+    timings.finish("build_word_occurance_dict")
+
+    with timings.time("aggregate_words_with_frequency", items=len(collection)):
+        result = aggregate_words_with_frequency(collection, limit)
+    del collection
+    timings.finish("aggregate_words_with_frequency")
+
+    words_per_path = defaultdict(list)
+    for word, v in result.items():
+        for filepath in v:
+            words_per_path[filepath].append(word)
+    sentences = defaultdict(list)
+    for filepath in filepaths:
+        if filepath not in words_per_path:
+            continue
+        text = read(filepath)
+        with timings.time("extract_sample_sentences", nbytes=len(text)):
+            document_sentences = extract_sample_sentences_for_keywords(
+                words_per_path[filepath], text, example_limit
+            )
+        for word, word_sentences in document_sentences.items():
+            sentences[word] += word_sentences
+    timings.finish("extract_sample_sentences")
+
+    with timings.time("render", items=len(result)):
+        table = format_output_table(result, sentences).dumps()
+    timings.bytes["render"] = len(table)
+    timings.finish("render")
+
+    return timings.results()
+
+
+def fastest(runs: list[dict]) -> dict:
+    """Keep the fastest run of each stage, the least disturbed by noise"""
+    return {
+        stage: min((run[stage] for run in runs), key=lambda timing: timing["seconds"])
+        for stage in STAGES
+    }
+
+
+def find_regressions(
+    results: dict, baseline: dict, threshold: float, min_seconds: float
+) -> list[str]:
+    """
+    Compare stage timings with a baseline
+
+    Args:
+        results: the stages of the current results
+        baseline: the stages of the baseline results
+        threshold: fraction a stage may slow down by before it counts as a regression
+        min_seconds: stages faster than this in the baseline are too noisy to compare
+
+    Returns: A description of each regressed stage
+    """
+    regressions = []
+    for stage, timing in results.items():
+        before = baseline.get(stage, {}).get("seconds")
+        if not before or before < min_seconds:
+            continue
+        change = timing["seconds"] / before - 1
+        if change > threshold:
+            regressions.append(
+                f"{stage}: {before:.3f}s -> {timing['seconds']:.3f}s (+{change:.0%})"
+            )
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@click.command()
+@click.argument("source", type=click.Path("r"))
+@click.option(
+    "--documents",
+    type=int,
+    default=100,
+    show_default=True,
+    help="Documents to generate",
+)
+@click.option(
+    "--document-size",
+    type=SizeType(),
+    default="4KB",
+    show_default=True,
+    help="Approximate size of each generated document, such as 1KB, 10MB or 1GB",
+)
+@click.option(
+    "--corpus",
+    type=click.Path(file_okay=False),
+    help="Keep the generated corpus in this directory, reusing it if it already exists",
+)
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option("--interesting-words-per-document", "word_limit", type=int, default=50)
+@click.option("--interesting-words-limit", "limit", type=int, default=10)
+@click.option(
+    "--example-limit",
+    type=int,
+    default=1,
+    help="Sample sentences per document and word, 0 means unlimited",
+)
+@click.option(
+    "--repeat",
+    type=int,
+    default=1,
+    help="Runs of the stages, the fastest of each is kept",
+)
+@click.option(
+    "--output", type=click.Path(dir_okay=False), help="Write the results as JSON"
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Results JSON from an earlier commit to compare against",
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=0.2,
+    show_default=True,
+    help="Fail when a stage is this fraction slower than in the baseline",
+)
+@click.option(
+    "--min-seconds",
+    type=float,
+    default=0.05,
+    show_default=True,
+    help="Ignore stages that took less than this in the baseline",
+)
+def stages(
+    source,
+    documents,
+    document_size,
+    corpus,
+    seed,
+    word_limit,
+    limit,
+    example_limit,
+    repeat,
+    output,
+    baseline,
+    threshold,
+    min_seconds,
+):
+    """Time each pipeline stage on a synthetic corpus sampled from the documents in SOURCE"""
+    with tempfile.TemporaryDirectory() as td:
+        corpus = corpus or os.path.join(td, "corpus")
+        if os.path.isdir(corpus):
+            existing = list(iter_filepaths(corpus))
+            documents = len(existing)
+            corpus_bytes = sum(os.path.getsize(filepath) for filepath in existing)
+        else:
+            corpus_bytes = generate_corpus(
+                source, corpus, documents, document_size, seed
+            )
+        runs = [
+            run_stages(corpus, word_limit, limit, example_limit) for _ in range(repeat)
+        ]
+
+    results = {
+        "version": RESULTS_VERSION,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {
+            "documents": documents,
+            "document_size": document_size,
+            "bytes": corpus_bytes,
+            "seed": seed,
+        },
+        "parameters": {
+            "word_limit": word_limit,
+            "limit": limit,
+            "example_limit": example_limit,
+        },
+        "stages": fastest(runs),
+    }
+
+    click.echo("|stage|seconds|cpu seconds|items/s|MB/s|peak RSS MB|")
+    click.echo("|-----|-------|-----------|-------|----|-----------|")
+    for stage, timing in results["stages"].items():
+        click.echo(
+            f"|{stage}|{timing['seconds']:.3f}|{timing['cpu_seconds']:.3f}|"
+            f"{timing['items_per_second'] or 0:.1f}|{timing['mb_per_second'] or 0:.2f}|"
+            f"{timing['peak_rss_mb']:.0f}|"
+        )
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline:
+        with open(baseline) as f:
+            baseline_results = json.load(f)
+        if baseline_results.get("corpus") != results["corpus"]:
+            click.echo(
+                "Warning: the baseline was measured on a different corpus", err=True
+            )
+        regressions = find_regressions(
+            results["stages"], baseline_results["stages"], threshold, min_seconds
+        )
+        for regression in regressions:
+            click.echo(f"Regression {regression}", err=True)
+        if regressions:
+            sys.exit(1)
+        click.echo(f"No stage regressed by more than {threshold:.0%}", err=True)
+
+
+if __name__ == "__main__":
+    stages()
@@ -0,0 +1,148 @@
+"""
+Time how long the CLI takes to start and finish on tiny inputs, where startup dominates
+
+Each invocation runs in a fresh interpreter, the way cron jobs and shell pipelines call
+the CLI, and the slowest imports of the command can be listed with --import-time.
+
+Usage:
+    python benchmarks/startup.py --repeat 10
+    python benchmarks/startup.py --import-time 5
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+INVOKE = "from frequent_interesting_words.cli import main; main()"
+DOCUMENT = "The cat sat on the mat. The dog chewed a bone on the mat. The cat watched the dog.\n"
+
+
+def scenarios(td: str) -> dict[str, list[str]]:
+    """The CLI arguments timed, by scenario name"""
+    document = os.path.join(td, "document.txt")
+    with open(document, "w") as f:
+        f.write(DOCUMENT)
+    target = os.path.join(td, "output.md")
+    cache_dir = os.path.join(td, "cache")
+    return {
+        "help": ["--help"],
+        "run": ["run", document, "--target", target, "--no-cache", "--jobs", "1"],
+        "run_cached": [
+            "run",
+            document,
+            "--target",
+            target,
+            "--cache-dir",
+            cache_dir,
+            "--jobs",
+            "1",
+        ],
+        "run_jsonl": [
+            "run",
+            document,
+            "--target",
+            os.path.join(td, "output.jsonl"),
+            "--no-cache",
+            "--jobs",
+            "1",
+        ],
+    }
+
+
+def time_invocation(args: list[str]) -> float:
+    """Wall time of one invocation of the CLI in a new interpreter"""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", INVOKE, *args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def slowest_imports(args: list[str], count: int) -> list[tuple[str, float]]:
+    """
+    The modules with the largest cumulative import time during one invocation
+
+    Args:
+        args: CLI arguments to invoke with
+        count: how many modules to return
+
+    Returns: (module, seconds) pairs, slowest first
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", INVOKE, *args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        # only top level imports, nested ones are counted in their parent
+        if not module.startswith("  "):
+            imports.append((module.strip(), int(cumulative) / 1e6))
+    return sorted(imports, key=lambda item: -item[1])[:count]
+
+
+@click.command()
+@click.option(
+    "--repeat",
+    type=int,
+    default=5,
+    show_default=True,
+    help="Invocations per scenario",
+)
+@click.option(
+    "--import-time",
+    "import_time",
+    type=int,
+    default=0,
+    help="Also list this many of the slowest top level imports of each scenario",
+)
+@click.option(
+    "--output", type=click.Path(dir_okay=False), help="Write the results as JSON"
+)
+def startup(repeat, import_time, output):
+    """Time the CLI end to end on a tiny document, in a fresh interpreter per invocation"""
+    results = {}
+    with tempfile.TemporaryDirectory() as td:
+        click.echo("|scenario|min seconds|median seconds|")
+        click.echo("|--------|-----------|--------------|")
+        for scenario, args in scenarios(td).items():
+            timings = [time_invocation(args) for _ in range(repeat)]
+            results[scenario] = {
+                "min_seconds": min(timings),
+                "median_seconds": statistics.median(timings),
+            }
+            click.echo(
+                f"|{scenario}|{min(timings):.3f}|{statistics.median(timings):.3f}|"
+            )
+            if import_time:
+                results[scenario]["slowest_imports"] = slowest_imports(
+                    args, import_time
+                )
+
+    if import_time:
+        for scenario, result in results.items():
+            click.echo(f"\nSlowest imports of {scenario}")
+            for module, seconds in result["slowest_imports"]:
+                click.echo(f"{seconds:>8.3f}s  {module}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({"python": sys.version, "scenarios": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    startup()
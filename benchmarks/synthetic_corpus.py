@@ -0,0 +1,122 @@
+"""
+Generate a synthetic corpus of any size by sampling sentences from real documents
+
+Usage:
+    python benchmarks/synthetic_corpus.py sample_docs/ /tmp/corpus --documents 10000 --document-size 4KB
+"""
+
+import os
+import random
+import re
+
+import click
+import nltk
+
+from frequent_interesting_words.discovery import iter_filepaths
+
+# Documents per subdirectory, keeps directories small for corpora of millions of documents
+DOCUMENTS_PER_DIRECTORY = 1000
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 2**10, "MB": 2**20, "GB": 2**30}
+
+
+def parse_size(size: str) -> int:
+    """Turn a size such as 512, 4KB, 1.5MB or 1GB into a number of bytes"""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", size.upper())
+    if not match:
+        raise ValueError("Invalid Parameter")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+class SizeType(click.ParamType):
+    """Click parameter type for sizes accepted by parse_size"""
+
+    name = "size"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int):
+            return value
+        try:
+            return parse_size(value)
+        except ValueError:
+            self.fail(
+                f"{value!r} is not a size such as 512, 4KB, 1MB or 1GB", param, ctx
+            )
+
+
+def load_sentences(source: str) -> list[str]:
+    """The sentences of every document under source, the pool synthetic documents are drawn from"""
+    sentences = []
+    for filepath in iter_filepaths(source):
+        with open(filepath, "r") as f:
+            sentences.extend(
+                " ".join(sentence.split())
+                for sentence in nltk.tokenize.sent_tokenize(f.read())
+            )
+    if not sentences:
+        raise ValueError("Invalid Parameter")
+    return sentences
+
+
+def document_path(target: str, index: int) -> str:
+    """Where the document with the given index is written, sharded into subdirectories"""
+    return os.path.join(
+        target, f"{index // DOCUMENTS_PER_DIRECTORY:04d}", f"doc{index:07d}.txt"
+    )
+
+
+def generate_corpus(
+    source: str, target: str, documents: int, document_size: int, seed: int = 0
+) -> int:
+    """
+    Write documents made of sentences sampled at random from the documents in source
+
+    Documents are written a sentence at a time, so memory stays flat whatever the
+    document size, and the same seed always produces the same corpus.
+
+    Args:
+        source: file or directory of real documents to sample sentences from
+        target: directory to write the corpus into
+        documents: how many documents to write
+        document_size: approximate size of each document in bytes, each is at least one sentence
+        seed: seed for the random sampling
+
+    Returns: The total size of the corpus in bytes
+    """
+    sentences = load_sentences(source)
+    rng = random.Random(seed)
+    total = 0
+    for index in range(documents):
+        filepath = document_path(target, index)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "w") as f:
+            size = 0
+            while size < document_size:
+                sentence = rng.choice(sentences) + " "
+                f.write(sentence)
+                size += len(sentence.encode("utf-8"))
+        total += size
+    return total
+
+
+@click.command()
+@click.argument("source", type=click.Path("r"))
+@click.argument("target", type=click.Path(file_okay=False))
+@click.option(
+    "--documents", type=int, default=100, show_default=True, help="Documents to write"
+)
+@click.option(
+    "--document-size",
+    type=SizeType(),
+    default="4KB",
+    show_default=True,
+    help="Approximate size of each document, such as 1KB, 10MB or 1GB",
+)
+@click.option("--seed", type=int, default=0, show_default=True)
+def synthetic_corpus(source, target, documents, document_size, seed):
+    """Write a synthetic corpus to TARGET made of sentences sampled from the documents in SOURCE"""
+    total = generate_corpus(source, target, documents, document_size, seed)
+    click.echo(f"Wrote {documents} documents, {total / 2**20:.1f}MB, to {target}")
+
+
+if __name__ == "__main__":
+    synthetic_corpus()
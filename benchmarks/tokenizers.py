@@ -0,0 +1,145 @@
+"""
+Compare the speed and accuracy of the tokenizers against the nltk tokenizer
+
+Usage:
+    python benchmarks/tokenizers.py sample_docs/
+"""
+
+import time
+
+import click
+
+from frequent_interesting_words.discovery import iter_filepaths
+from frequent_interesting_words.document import DocumentAnalysis
+from frequent_interesting_words.pipeline import (
+    aggregate_words_with_frequency,
+    build_word_occurance_dict,
+    extract_keywords,
+    flatten_and_sort_words_with_frequency,
+)
+from frequent_interesting_words.tokenizers import (
+    DEFAULT_TOKENIZER,
+    TOKENIZERS,
+    get_tokenizer,
+)
+
+
+def tokenize_seconds(texts: list[str], tokenizer: str, repeat: int) -> float:
+    """Fastest time to split every text into sentences and tokens"""
+    DocumentAnalysis("Warm up.", tokenizer)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            DocumentAnalysis(text, tokenizer)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def sentence_agreement(texts: list[str], tokenizer: str) -> float:
+    """Share of the reference sentences the tokenizer finds exactly"""
+    reference = get_tokenizer(DEFAULT_TOKENIZER)
+    found = total = 0
+    for text in texts:
+        sentences = {sentence.strip() for sentence in reference.sent_tokenize(text)}
+        found += len(
+            sentences
+            & {
+                sentence.strip()
+                for sentence in get_tokenizer(tokenizer).sent_tokenize(text)
+            }
+        )
+        total += len(sentences)
+    return found / total
+
+
+def keyword_counts(
+    filepaths: list[str], texts: list[str], keywords: list[list[str]], tokenizer: str
+) -> list[dict]:
+    """Each document's WordsWithFrequencyDict, counted with the tokenizer"""
+    return [
+        {
+            word: {filepath: frequency}
+            for word, frequency in build_word_occurance_dict(
+                text, words, tokenizer
+            ).items()
+        }
+        for filepath, text, words in zip(filepaths, texts, keywords)
+    ]
+
+
+def count_agreement(reference: list[dict], counts: list[dict]) -> tuple[float, float]:
+    """
+    Compare keyword counts with the reference counts
+
+    Returns: Tuple of the share of counts that are identical and the mean relative error
+    """
+    same = total = 0
+    error = 0.0
+    for expected, actual in zip(reference, counts):
+        for word, v in expected.items():
+            (frequency,) = v.values()
+            counted = sum(actual.get(word, {}).values())
+            same += counted == frequency
+            error += abs(counted - frequency) / frequency
+            total += 1
+    return same / total, error / total
+
+
+@click.command()
+@click.argument("path", type=click.Path("r"))
+@click.option("--interesting-words-per-document", "word_limit", type=int, default=50)
+@click.option("--interesting-words-limit", "limit", type=int, default=10)
+@click.option(
+    "--repeat",
+    type=int,
+    default=3,
+    help="Runs of the tokenization timing, the fastest is kept",
+)
+def tokenizers(path, word_limit, limit, repeat):
+    """Time each tokenizer on the documents in PATH and measure how far its results drift from nltk's"""
+    filepaths = list(iter_filepaths(path))
+    texts = []
+    for filepath in filepaths:
+        with open(filepath, "r") as f:
+            texts.append(f.read())
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 2**20
+    keywords = [extract_keywords(text, word_limit) for text in texts]
+
+    reference_counts = keyword_counts(filepaths, texts, keywords, DEFAULT_TOKENIZER)
+    reference_top = [
+        word
+        for word, _ in flatten_and_sort_words_with_frequency(
+            aggregate_words_with_frequency(reference_counts, limit)
+        )
+    ]
+    reference_seconds = tokenize_seconds(texts, DEFAULT_TOKENIZER, repeat)
+
+    click.echo(
+        "|tokenizer|seconds|MB/s|speedup|sentences agreeing|keyword counts agreeing|"
+        "mean count error|top words agreeing|"
+    )
+    click.echo(
+        "|---------|-------|----|-------|------------------|-----------------------|"
+        "----------------|------------------|"
+    )
+    for tokenizer in TOKENIZERS:
+        seconds = tokenize_seconds(texts, tokenizer, repeat)
+        counts = keyword_counts(filepaths, texts, keywords, tokenizer)
+        same, error = count_agreement(reference_counts, counts)
+        top = [
+            word
+            for word, _ in flatten_and_sort_words_with_frequency(
+                aggregate_words_with_frequency(counts, limit)
+            )
+        ]
+        click.echo(
+            f"|{tokenizer}|{seconds:.3f}|{megabytes / seconds:.2f}|"
+            f"{reference_seconds / seconds:.1f}x|"
+            f"{sentence_agreement(texts, tokenizer):.1%}|{same:.1%}|{error:.2%}|"
+            f"{len(set(top) & set(reference_top))}/{len(reference_top)}|"
+        )
+
+
+if __name__ == "__main__":
+    tokenizers()
@@ -0,0 +1,10 @@
+__all__ = ["Analyzer"]
+
+
+def __getattr__(name: str):
+    # imported on first use, so the command line does not load the pipeline for --help
+    if name == "Analyzer":
+        from frequent_interesting_words.analyzer import Analyzer
+
+        return Analyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,325 @@
+import heapq
+from array import array
+from collections.abc import ItemsView, Mapping, ValuesView
+from typing import Iterable, Iterator, Union
+
+
+def frequency_order(word_with_frequency: tuple[str, int]) -> tuple[int, str]:
+    """Sort key ordering (word, frequency) pairs by frequency, followed by alphabetical"""
+    word, frequency = word_with_frequency
+    return -frequency, word
+
+
+# Posting lists pack a document id and a frequency into one unsigned 64 bit integer
+_FREQUENCY_BITS = 32
+_FREQUENCY_MASK = (1 << _FREQUENCY_BITS) - 1
+
+
+class Postings(Mapping):
+    """
+    A read only mapping of document path to frequency over a word's posting list, the
+    dict-like face of the packed array WordFrequencyAggregator stores
+
+    Looking a single document up scans the list, iterating over items does not.
+
+    Args:
+        postings: array of packed (document id, frequency) pairs, or a single packed pair
+        documents: the path table, document id to path
+    """
+
+    __slots__ = ("_postings", "_documents")
+
+    def __init__(self, postings: Union[array, int], documents: list[str]):
+        self._postings = (postings,) if type(postings) is int else postings
+        self._documents = documents
+
+    def __getitem__(self, document: str) -> int:
+        for path, frequency in self._iter_items():
+            if path == document:
+                return frequency
+        raise KeyError(document)
+
+    def __iter__(self) -> Iterator[str]:
+        documents = self._documents
+        return (documents[packed >> _FREQUENCY_BITS] for packed in self._postings)
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def __repr__(self) -> str:
+        return repr(dict(self._iter_items()))
+
+    def _iter_items(self) -> Iterator[tuple[str, int]]:
+        documents = self._documents
+        return (
+            (documents[packed >> _FREQUENCY_BITS], packed & _FREQUENCY_MASK)
+            for packed in self._postings
+        )
+
+    def items(self) -> ItemsView:
+        return _PostingsItems(self)
+
+    def values(self) -> ValuesView:
+        return _PostingsValues(self)
+
+
+class _PostingsItems(ItemsView):
+    def __iter__(self) -> Iterator[tuple[str, int]]:
+        return self._mapping._iter_items()
+
+
+class _PostingsValues(ValuesView):
+    def __iter__(self) -> Iterator[int]:
+        return (packed & _FREQUENCY_MASK for packed in self._mapping._postings)
+
+
+class WordsView(Mapping):
+    """A read only WordsWithFrequencyDict over the posting lists of a WordFrequencyAggregator, words in the order first seen"""
+
+    __slots__ = ("_postings", "_documents")
+
+    def __init__(self, postings: dict[str, Union[array, int]], documents: list[str]):
+        self._postings = postings
+        self._documents = documents
+
+    def __getitem__(self, word: str) -> Postings:
+        return Postings(self._postings[word], self._documents)
+
+    def __contains__(self, word: object) -> bool:
+        return word in self._postings
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def __repr__(self) -> str:
+        return repr({word: dict(v.items()) for word, v in self.items()})
+
+
+class WordFrequencyAggregator:
+    """
+    Deep merges WordsWithFrequencyDicts while keeping a running total per word, so the
+    most frequent words can be selected without re-summing or sorting the vocabulary
+
+    Rather than a dict of dicts repeating the paths of every word's documents, each
+    document path is stored once and given an integer id, each word once as the key of
+    its posting list, and a word's documents are an array of (document id, frequency)
+    pairs packed into 8 bytes. Most words of a corpus are only found in one document,
+    their single pair is kept as a plain integer until a second document is seen, see
+    benchmarks/memory.py. Frequencies and document ids must fit in 32 bits.
+
+    Attributes:
+        words: the merged WordsWithFrequencyDict as a read only view, words in the order first seen
+        totals: mapping of word to its frequency summed across documents
+        documents: the path table, document id to path
+    """
+
+    def __init__(self):
+        self.documents = []
+        self.totals = {}
+        self._document_ids = {}
+        self._postings = {}
+        self.words = WordsView(self._postings, self.documents)
+
+    def _document_id(self, document: str, added: set[int]) -> int:
+        document_id = self._document_ids.get(document)
+        if document_id is None:
+            document_id = len(self.documents)
+            self.documents.append(document)
+            self._document_ids[document] = document_id
+            added.add(document_id)
+        return document_id
+
+    def add(self, words_with_frequency: Mapping[str, Mapping[str, int]]):
+        """
+        Merge a WordsWithFrequencyDict in, a document seen before replaces its earlier frequency
+
+        Args:
+            words_with_frequency: WordsWithFrequencyDict to merge
+        """
+        # documents first seen in this call cannot be in any posting list yet
+        added = set()
+        totals, all_postings = self.totals, self._postings
+        for word, v in words_with_frequency.items():
+            postings = all_postings.get(word)
+            total = 0 if postings is None else totals[word]
+            for document, frequency in v.items():
+                document_id = self._document_id(document, added)
+                packed = document_id << _FREQUENCY_BITS | frequency
+                total += frequency
+                if postings is None:
+                    postings = packed
+                elif type(postings) is int:
+                    if postings >> _FREQUENCY_BITS == document_id:
+                        total -= postings & _FREQUENCY_MASK
+                        postings = packed
+                    else:
+                        postings = array("Q", (postings, packed))
+                elif document_id in added:
+                    postings.append(packed)
+                else:
+                    for i, existing in enumerate(postings):
+                        if existing >> _FREQUENCY_BITS == document_id:
+                            total -= existing & _FREQUENCY_MASK
+                            postings[i] = packed
+                            break
+                    else:
+                        postings.append(packed)
+            all_postings[word] = array("Q") if postings is None else postings
+            totals[word] = total
+
+    def remove(self, document: str, words: Iterable[str] = None):
+        """
+        Drop a document's frequencies from the aggregate, words left without any document
+        are dropped too, so adding the document again replaces everything it contributed
+
+        Args:
+            document: path of the document to drop
+            words: the words the document was added with when known, otherwise every
+                word's posting list is scanned for it
+        """
+        document_id = self._document_ids.get(document)
+        if document_id is None:
+            return
+        totals, all_postings = self.totals, self._postings
+        for word in list(all_postings if words is None else words):
+            postings = all_postings.get(word)
+            if postings is None:
+                continue
+            if type(postings) is int:
+                if postings >> _FREQUENCY_BITS == document_id:
+                    del all_postings[word], totals[word]
+                continue
+            for i, packed in enumerate(postings):
+                if packed >> _FREQUENCY_BITS == document_id:
+                    totals[word] -= packed & _FREQUENCY_MASK
+                    del postings[i]
+                    if not postings:
+                        del all_postings[word], totals[word]
+                    break
+
+    def top(self, k: int) -> list[tuple[str, int]]:
+        """
+        Select the k most frequent words in O(V log k)
+
+        Args:
+            k: how many words to select
+
+        Returns: list of (word, frequency) ordered by frequency, followed by alphabetical
+        """
+        return heapq.nsmallest(k, self.totals.items(), key=frequency_order)
+
+    def result(self, limit: int = None) -> Mapping[str, Postings]:
+        """
+        The merged WordsWithFrequencyDict
+
+        Args:
+            limit: An upper limit in the total number of words, the most frequent are kept
+
+        Returns: The WordsWithFrequencyDict, words in the order first seen
+        """
+        if not limit:
+            return self.words
+        keep = {word for word, _ in self.top(limit)}
+        return {word: v for word, v in self.words.items() if word in keep}
+
+    def copy(self, limit: int = None) -> "WordFrequencyAggregator":
+        """
+        An independent copy, unaffected by documents added to this aggregator afterwards
+
+        Args:
+            limit: only copy this many of the most frequent words, falsy copies every word
+
+        Returns: The copied WordFrequencyAggregator
+        """
+        words = self._postings
+        if limit:
+            keep = {word for word, _ in self.top(limit)}
+            words = {word: v for word, v in words.items() if word in keep}
+        copied = WordFrequencyAggregator()
+        copied.documents.extend(self.documents)
+        copied._document_ids.update(self._document_ids)
+        for word, postings in words.items():
+            if type(postings) is not int:
+                postings = array("Q", postings)
+            copied._postings[word] = postings
+            copied.totals[word] = self.totals[word]
+        return copied
+
+
+class SpaceSavingSketch:
+    """
+    Space-Saving heavy hitter sketch, approximate word totals in a fixed number of counters
+
+    Once every counter is in use a new word takes over the counter with the smallest
+    count, inheriting that count as its error. Counts are therefore never underestimated
+    and overestimated by at most error_bound, and any word whose total exceeds
+    error_bound is guaranteed to hold a counter.
+
+    Args:
+        capacity: the number of counters, memory use is proportional to it
+
+    Attributes:
+        counts: mapping of word to its approximate total
+        errors: mapping of word to how much its count may be overestimated by
+        total: the sum of every weight added
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("Invalid Parameter")
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        # (count, word) entries, stale ones are skipped when popped
+        self._heap = []
+
+    def add(self, word: str, weight: int = 1):
+        """Count weight more occurrences of the word"""
+        self.total += weight
+        if word not in self.counts and len(self.counts) >= self.capacity:
+            minimum, evicted = heapq.heappop(self._heap)
+            while self.counts.get(evicted) != minimum:
+                minimum, evicted = heapq.heappop(self._heap)
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[word] = minimum
+            self.errors[word] = minimum
+        self.counts[word] = self.counts.get(word, 0) + weight
+        self.errors.setdefault(word, 0)
+        heapq.heappush(self._heap, (self.counts[word], word))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, word) for word, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def add_words(self, words_with_frequency: dict[str, dict[str, int]]):
+        """Count the word totals of a WordsWithFrequencyDict"""
+        for word, v in words_with_frequency.items():
+            self.add(word, sum(v.values()))
+
+    @property
+    def error_bound(self) -> int:
+        """The most any word's count can be overestimated by, also the most a word without a counter can have"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def candidates(self, k: int) -> set[str]:
+        """
+        The words that could be among the k most frequent, every word whose possible total
+        reaches the k-th largest guaranteed total
+
+        Args:
+            k: how many of the most frequent words are wanted
+
+        Returns: Set of candidate words
+        """
+        guaranteed = heapq.nlargest(
+            k, (self.counts[word] - self.errors[word] for word in self.counts)
+        )
+        if len(guaranteed) < k:
+            return set(self.counts)
+        return {word for word, count in self.counts.items() if count >= guaranteed[-1]}
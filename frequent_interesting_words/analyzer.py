@@ -0,0 +1,377 @@
+import threading
+from typing import Iterable, Iterator, Optional
+
+from frequent_interesting_words import profiling
+from frequent_interesting_words.aggregation import WordFrequencyAggregator
+from frequent_interesting_words.cache import KeywordCache
+from frequent_interesting_words.counting import token_counter
+from frequent_interesting_words.engines import DEFAULT_ENGINE, get_engine
+from frequent_interesting_words.pipeline import (
+    ApproximationReport,
+    WordsWithFrequencyDict,
+    aggregate_documents,
+    aggregate_documents_approximately,
+    gather_sample_sentences,
+    map_document,
+    map_documents,
+    process_document,
+    process_documents,
+    write_summary,
+)
+from frequent_interesting_words.prefetch import Prefetcher
+from frequent_interesting_words.tokenizers import DEFAULT_TOKENIZER, get_tokenizer
+
+
+class Analyzer:
+    """
+    Finds the most frequent interesting words of a growing set of documents, keeping the
+    keyword engine, tokenizer, stopwords and settings warm between calls
+
+    Documents can be added one at a time or in batches, and the most frequent words,
+    their sample sentences and the summary table can be asked for at any point. Keywords
+    are extracted outside of the lock guarding the aggregate, so one Analyzer can be
+    shared by the threads of a pool, each adding documents.
+
+    Documents are named by their filepath, or by any unique name when their text is
+    given. Of a text that is given only the sample sentences of its keywords are kept,
+    rather than the whole text, while documents added by filepath are read again when
+    sentences are asked for. Adding a document again replaces everything it contributed
+    before, words it no longer holds included.
+
+    Args:
+        word_limit: the upper limit of keywords to extract per document
+        example_limit: upper bound on the sample sentences per document and word, None means unlimited
+        engine: name of the keyword engine to use, see engines.ENGINES
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        chunk_size: documents larger than this many bytes are read in windows, 0 means never
+        cache: KeywordCache to reuse results for unchanged documents from, None disables caching
+        prefetcher: Prefetcher reading batches of documents ahead of the workers, None
+            leaves each worker to read its own documents
+    """
+
+    def __init__(
+        self,
+        word_limit: int = 50,
+        example_limit: int = 1,
+        engine: str = DEFAULT_ENGINE,
+        tokenizer: str = DEFAULT_TOKENIZER,
+        chunk_size: int = 0,
+        cache: KeywordCache = None,
+        prefetcher: Prefetcher = None,
+    ):
+        if word_limit < 1:
+            raise ValueError("Invalid Parameter")
+        self.word_limit = word_limit
+        self.example_limit = example_limit
+        self.engine = engine
+        self.tokenizer = tokenizer
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.prefetcher = prefetcher
+        self._aggregator = WordFrequencyAggregator()
+        # document names in the order added, the order sample sentences are gathered in
+        self._documents = {}
+        # document name -> sample sentences of its keywords, for documents given as text
+        self._sentences = {}
+        self._lock = threading.Lock()
+
+        # built once up front rather than by the first document added
+        get_engine(engine)
+        get_tokenizer(tokenizer).preload()
+        token_counter()
+
+    @property
+    def documents(self) -> list[str]:
+        """The names of the documents added, in the order they were added"""
+        with self._lock:
+            return list(self._documents)
+
+    def _forget(self, name: str):
+        # called with the lock held, before a document added again is counted anew
+        if name in self._documents:
+            self._aggregator.remove(name)
+            self._sentences.pop(name, None)
+
+    def _named(self, names: Iterable[str]) -> Iterator[str]:
+        for name in names:
+            with self._lock:
+                self._forget(name)
+                self._documents[name] = None
+            yield name
+
+    def _forgotten(self, names: Iterable[str]) -> Iterator[str]:
+        for name in names:
+            with self._lock:
+                if name in self._documents:
+                    self._forget(name)
+                    del self._documents[name]
+            yield name
+
+    def _add(self, words_with_frequency: WordsWithFrequencyDict):
+        with self._lock, profiling.stage("aggregate"):
+            self._aggregator.add(words_with_frequency)
+
+    def add_document(self, name: str, text: str = None) -> WordsWithFrequencyDict:
+        """
+        Extract a document's keywords and count them into the aggregate
+
+        Args:
+            name: filepath of the document, or any unique name when text is given
+            text: the document's text, None reads it from the filepath
+
+        Returns: The document's WordsWithFrequencyDict
+        """
+        # a corpus level engine scores documents against each other, see add_documents
+        if get_engine(self.engine).corpus_level:
+            raise ValueError("Invalid Parameter")
+
+        sentences = None
+        if text is None:
+            words_with_frequency = process_document(
+                name,
+                self.word_limit,
+                self.cache,
+                self.chunk_size,
+                self.engine,
+                self.tokenizer,
+            )
+        else:
+            words_with_frequency, sentences = map_document(
+                name,
+                self.word_limit,
+                self.example_limit,
+                self.cache,
+                self.chunk_size,
+                self.engine,
+                self.tokenizer,
+                text,
+            )
+        with self._lock:
+            self._forget(name)
+            self._documents[name] = None
+            if sentences is not None:
+                self._sentences[name] = sentences
+            self._aggregator.add(words_with_frequency)
+        return words_with_frequency
+
+    def add_documents(
+        self,
+        filepaths: Iterable[str],
+        executor_map=map,
+        approximate_counters: int = 0,
+        limit: int = None,
+    ) -> Optional[ApproximationReport]:
+        """
+        Extract the keywords of a batch of documents and count them into the aggregate,
+        a corpus level engine scoring the documents of the batch against each other
+
+        With approximate_counters the documents are iterated twice, so filepaths must be
+        a collection or a discovery.Rediscovery, and the keyword cache is required. Only
+        the documents holding one of the words counted are then kept as documents added.
+
+        Args:
+            filepaths: the documents to add, consumed lazily as they are discovered
+            executor_map: map function used to spread the documents across workers, see
+                parallel.document_executor
+            approximate_counters: counters in the sketch used for approximate aggregation,
+                0 means exact, see pipeline.aggregate_documents_approximately
+            limit: with approximate_counters, the number of the batch's most frequent
+                words that are counted, the rest are left out of the aggregate
+
+        Returns: How far the counts can be trusted with approximate_counters, None otherwise
+        """
+        if approximate_counters:
+            # an iterator would be exhausted by the first pass
+            if isinstance(filepaths, Iterator):
+                raise ValueError("Invalid Parameter")
+            result, documents, report = aggregate_documents_approximately(
+                lambda: self._forgotten(filepaths),
+                self.word_limit,
+                limit,
+                approximate_counters,
+                self.cache,
+                executor_map,
+                self.chunk_size,
+                self.engine,
+                self.tokenizer,
+                self.prefetcher,
+            )
+            with self._lock, profiling.stage("aggregate"):
+                self._documents.update(dict.fromkeys(documents))
+                self._aggregator.add(result)
+            return report
+        filepaths = self._named(filepaths)
+        if get_engine(self.engine).corpus_level:
+            self._add(
+                aggregate_documents(
+                    filepaths,
+                    self.word_limit,
+                    limit,
+                    self.cache,
+                    executor_map,
+                    self.chunk_size,
+                    self.engine,
+                    self.tokenizer,
+                    self.prefetcher,
+                )
+            )
+            return None
+
+        for words_with_frequency in self.process_documents(filepaths, executor_map):
+            self._add(words_with_frequency)
+        return None
+
+    def process_documents(
+        self, filepaths: Iterable[str], executor_map=map
+    ) -> Iterator[WordsWithFrequencyDict]:
+        """
+        Extract the keywords of a batch of documents without counting them into the
+        aggregate, for callers keeping track of each document's words, see merge
+
+        Args:
+            filepaths: the documents to process, consumed lazily
+            executor_map: map function used to spread the documents across workers
+
+        Returns: Iterator of each document's WordsWithFrequencyDict, in the order of filepaths
+        """
+        return process_documents(
+            filepaths,
+            self.word_limit,
+            self.cache,
+            executor_map,
+            self.chunk_size,
+            self.engine,
+            self.tokenizer,
+            self.prefetcher,
+            keep=True,
+        )
+
+    def map_documents(
+        self, filepaths: Iterable[str], executor_map=map
+    ) -> Iterator[tuple[WordsWithFrequencyDict, dict[str, list[str]]]]:
+        """
+        Like process_documents, along with the sample sentences of every keyword of each
+        document, found while it is read for its keywords, see map_document
+
+        Args:
+            filepaths: the documents to process, consumed lazily
+            executor_map: map function used to spread the documents across workers
+
+        Returns: Iterator of (WordsWithFrequencyDict, sample sentences) in the order of filepaths
+        """
+        return map_documents(
+            filepaths,
+            self.word_limit,
+            self.example_limit,
+            self.cache,
+            executor_map,
+            self.chunk_size,
+            self.engine,
+            self.tokenizer,
+            self.prefetcher,
+        )
+
+    def merge(
+        self,
+        words_with_frequency: WordsWithFrequencyDict,
+        documents: Iterable[str],
+    ):
+        """
+        Count a WordsWithFrequencyDict built elsewhere, such as by an earlier run, into
+        the aggregate, replacing whatever documents it shares with the aggregate contributed
+
+        Args:
+            words_with_frequency: the WordsWithFrequencyDict to merge
+            documents: filepaths of its documents, in the order sample sentences are
+                gathered in
+        """
+        with self._lock:
+            for document in documents:
+                self._forget(document)
+                self._documents[document] = None
+            self._aggregator.add(words_with_frequency)
+
+    def top_words(self, k: int = None) -> list[tuple[str, int]]:
+        """
+        The most frequent words so far
+
+        Args:
+            k: how many words to return, None returns every word
+
+        Returns: list of (word, frequency) ordered by frequency, followed by alphabetical
+        """
+        with self._lock:
+            return self._aggregator.top(k or len(self._aggregator.totals))
+
+    def result(self, limit: int = None) -> WordsWithFrequencyDict:
+        """
+        A snapshot of the aggregated WordsWithFrequencyDict
+
+        Args:
+            limit: An upper limit in the total number of words, the most frequent are kept
+
+        Returns: The WordsWithFrequencyDict, safe to use while documents are added
+        """
+        with self._lock, profiling.stage("aggregate"):
+            return self._aggregator.copy(limit).words
+
+    def _sample_sentences(
+        self, result: WordsWithFrequencyDict, executor_map=map
+    ) -> dict[str, list[str]]:
+        with self._lock:
+            documents = list(self._documents)
+            found = {
+                document: self._sentences[document]
+                for document in {document for v in result.values() for document in v}
+                if document in self._sentences
+            }
+        return gather_sample_sentences(
+            result,
+            documents,
+            self.example_limit,
+            executor_map,
+            self.chunk_size,
+            self.tokenizer,
+            self.prefetcher,
+            found,
+        )
+
+    def sample_sentences(self, word: str) -> list[str]:
+        """
+        Sample sentences for a word from the documents it was found in
+
+        Args:
+            word: lower case word, as returned by top_words
+
+        Returns: The sentences in the order their documents were added, empty for a word that was not found
+        """
+        with self._lock:
+            if word not in self._aggregator.words:
+                return []
+            result = {word: dict(self._aggregator.words[word])}
+        return self._sample_sentences(result)[word]
+
+    def render(
+        self,
+        target: str,
+        limit: int = 10,
+        output_format: str = None,
+        executor_map=map,
+    ):
+        """
+        Write the summary table of the most frequent words and their sample sentences
+
+        Args:
+            target: filepath for the output table
+            limit: An upper limit in the number of words in the table, falsy means no limit
+            output_format: one of output.OUTPUT_FORMATS, None infers it from the target's extension
+            executor_map: map function used to spread the documents across workers while
+                sample sentences are gathered
+        """
+        result = self.result(limit)
+        write_summary(
+            result,
+            self._sample_sentences(result, executor_map),
+            target,
+            output_format,
+        )
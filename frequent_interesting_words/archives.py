@@ -0,0 +1,395 @@
+"""
+Reading documents straight from compressed files and archives, without extracting them
+
+A compressed file, .gz, .bz2, .xz or .zst, is a single document decompressed as it is read.
+An archive, .zip or a tar compressed or not, holds a document per regular file, identified
+by the archive's path followed by the member's name, such as corpus.tar.gz/docs/a.txt, so
+members are named in tables and partials like files below a directory.
+
+Tar archives have no index, reaching a member means decompressing everything before it. The
+stream discovery decompresses to list an archive's members is also the one their texts are
+read from, members passed over before they were read are held until they are, so discovering
+and reading a tar decompresses it once. Members asked for later, by another process or a
+second pass, are read from a stream of their own that carries on forwards while they are
+asked for in archive order.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import threading
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterator, Optional, TextIO
+
+# tarfile and zipfile are imported once an archive is met, to keep startup fast
+if TYPE_CHECKING:
+    import tarfile
+    import zipfile
+
+COMPRESSION_EXTENSIONS = (".gz", ".bz2", ".xz", ".zst")
+# tar extension -> the compression of the whole archive
+TAR_EXTENSIONS = {
+    ".tar": None,
+    ".tar.gz": ".gz",
+    ".tgz": ".gz",
+    ".tar.bz2": ".bz2",
+    ".tbz2": ".bz2",
+    ".tar.xz": ".xz",
+    ".txz": ".xz",
+    ".tar.zst": ".zst",
+    ".tzst": ".zst",
+}
+ZIP_EXTENSIONS = (".zip",)
+# Upper bound on the data of tar members passed over by discovery before being read,
+# those beyond it are read again later from a stream of their own
+MAX_PENDING_BYTES = 64 * 2**20
+_OPEN_ZIP_FILES = 8
+
+
+def zstandard_available() -> bool:
+    """Whether zstandard, which .zst files need, is installed, without importing it"""
+    return find_spec("zstandard") is not None
+
+
+def _tar_extension(name: str) -> Optional[str]:
+    name = name.lower()
+    return next((ext for ext in TAR_EXTENSIONS if name.endswith(ext)), None)
+
+
+def is_archive(path: str) -> bool:
+    """Whether the file at path is read as an archive of documents, judged by its name"""
+    return path.lower().endswith(ZIP_EXTENSIONS) or _tar_extension(path) is not None
+
+
+def compression_of(path: str) -> Optional[str]:
+    """The compression extension of a compressed document, None for plain documents and archives"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in COMPRESSION_EXTENSIONS or is_archive(path):
+        return None
+    return extension
+
+
+def strip_compression(path: str) -> str:
+    """The path of a document without its compression extension, doc.txt.gz becomes doc.txt"""
+    if compression_of(path):
+        return os.path.splitext(path)[0]
+    return path
+
+
+def split_member(path: str) -> Optional[tuple[str, str]]:
+    """
+    Split an archive member's identifier into the archive's path and the member's name
+
+    Args:
+        path: a document identifier
+
+    Returns: Tuple of (archive path, member name), None when path is not inside an archive
+    """
+    end = path.find("/")
+    while end != -1:
+        archive = path[:end]
+        if is_archive(archive) and os.path.isfile(archive):
+            return archive, path[end + 1 :]
+        end = path.find("/", end + 1)
+    return None
+
+
+def is_tar_member(path: str) -> bool:
+    """Whether path is a member of a tar archive, which are best read in archive order by a single reader"""
+    member = split_member(path)
+    return member is not None and _tar_extension(member[0]) is not None
+
+
+_DECOMPRESSORS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def _zstandard():
+    if not zstandard_available():
+        raise RuntimeError("Reading .zst files needs zstandard, pip install zstandard")
+    import zstandard
+
+    return zstandard
+
+
+def _open_compressed(path: str, extension: Optional[str]) -> BinaryIO:
+    """Open a file for reading, decompressing it as it is read when extension is given"""
+    if extension is None:
+        return open(path, "rb")
+    if extension == ".zst":
+        return (
+            _zstandard()
+            .ZstdDecompressor()
+            .stream_reader(open(path, "rb"), closefd=True)
+        )
+    return _DECOMPRESSORS[extension](path, "rb")
+
+
+def _decompress(binary: BinaryIO, extension: Optional[str]) -> BinaryIO:
+    """Wrap a stream that is not a file of its own, such as an archive member, in a decompressor"""
+    if extension is None:
+        return binary
+    if extension == ".zst":
+        return _zstandard().ZstdDecompressor().stream_reader(binary)
+    return _DECOMPRESSORS[extension](binary, "rb")
+
+
+class _TarStream:
+    """
+    A tar archive decompressed front to back, handing out the data of each regular file
+    member as the stream passes it
+
+    Args:
+        archive: path of the tar archive
+        keep: hold the data of members passed over unread, up to MAX_PENDING_BYTES
+    """
+
+    def __init__(self, archive: str, keep: bool):
+        import tarfile
+
+        self.archive = archive
+        self.keep = keep
+        self.lock = threading.RLock()
+        self.sizes = {}
+        self._pending = {}
+        self._pending_bytes = 0
+        self._current = None
+        self._current_read = False
+        self._finished = False
+        self._file = _open_compressed(archive, TAR_EXTENSIONS[_tar_extension(archive)])
+        self._tar = tarfile.open(fileobj=self._file, mode="r|")
+
+    def members(self) -> Iterator["tarfile.TarInfo"]:
+        """Step through the regular file members, the stream moves on when the next one is asked for"""
+        while not self._finished:
+            with self.lock:
+                current = self._current
+                if (
+                    self.keep
+                    and current is not None
+                    and not self._current_read
+                    and self._pending_bytes + current.size <= MAX_PENDING_BYTES
+                ):
+                    self._pending[current.name] = self._tar.extractfile(current).read()
+                    self._pending_bytes += current.size
+                info = self._tar.next()
+                while info is not None and not info.isfile():
+                    info = self._tar.next()
+                self._current, self._current_read = info, False
+                if info is None:
+                    self._finished = True
+                    self._tar.close()
+                    self._file.close()
+                    return
+                self.sizes[info.name] = info.size
+            yield info
+
+    def read(self, name: str) -> Optional[bytes]:
+        """The data of a member when the stream is at it or holds it, None otherwise"""
+        with self.lock:
+            data = self._pending.pop(name, None)
+            if data is not None:
+                self._pending_bytes -= len(data)
+                return data
+            if (
+                self._current is not None
+                and self._current.name == name
+                and not self._current_read
+            ):
+                self._current_read = True
+                return self._tar.extractfile(self._current).read()
+        return None
+
+    def skip(self):
+        """Pass over the member the stream is at without holding it, it is not wanted"""
+        with self.lock:
+            self._current_read = True
+
+    @property
+    def drained(self) -> bool:
+        """Whether the stream reached the end with nothing left held"""
+        return self._current is None and not self._pending
+
+
+# archive path -> the stream discovery lists it from, in this process
+_discovered = {}
+# archive path -> the stream members asked for outside of discovery are read from
+_readers = {}
+_streams_lock = threading.Lock()
+
+
+def _read_tar_member(archive: str, name: str) -> bytes:
+    with _streams_lock:
+        stream = _discovered.get(archive)
+    if stream is not None:
+        data = stream.read(name)
+        if data is not None:
+            with _streams_lock:
+                if stream.drained and _discovered.get(archive) is stream:
+                    del _discovered[archive]
+            return data
+
+    with _streams_lock:
+        stream = _readers.get(archive)
+    for _ in range(2):
+        if stream is None:
+            stream = _TarStream(archive, keep=False)
+            with _streams_lock:
+                _readers[archive] = stream
+        with stream.lock:
+            for info in stream.members():
+                if info.name == name:
+                    return stream.read(name)
+        # the member is behind the stream, start again from the top
+        stream = None
+    raise FileNotFoundError(f"No member {name} in {archive}")
+
+
+@lru_cache(maxsize=_OPEN_ZIP_FILES)
+def _zip_file(archive: str, mtime_ns: int, size: int) -> "zipfile.ZipFile":
+    import zipfile
+
+    # kept open, so the central directory is read once rather than per member
+    return zipfile.ZipFile(archive)
+
+
+def _open_zip(archive: str) -> "zipfile.ZipFile":
+    stat = os.stat(archive)
+    return _zip_file(archive, stat.st_mtime_ns, stat.st_size)
+
+
+def iter_archive_members(
+    archive: str, wanted: Callable[[str, int], bool] = None
+) -> Iterator[tuple[str, int]]:
+    """
+    List the documents of an archive, regular files other than nested archives, in archive
+    order, for tar archives the texts of the members listed are then read from the same stream
+
+    Args:
+        archive: path of the archive
+        wanted: called with each member's name and size, members it returns False for
+            are left out, rather than held by the stream for a read that never comes
+
+    Returns: Iterator of (member name, uncompressed size)
+    """
+    if _tar_extension(archive) is None:
+        for info in _open_zip(archive).infolist():
+            if (
+                not info.is_dir()
+                and not is_archive(info.filename)
+                and (wanted is None or wanted(info.filename, info.file_size))
+            ):
+                yield info.filename, info.file_size
+        return
+
+    stream = _TarStream(archive, keep=True)
+    with _streams_lock:
+        _discovered[archive] = stream
+    try:
+        for info in stream.members():
+            if is_archive(info.name) or (
+                wanted is not None and not wanted(info.name, info.size)
+            ):
+                stream.skip()
+                continue
+            yield info.name, info.size
+    finally:
+        with _streams_lock:
+            if stream.drained and _discovered.get(archive) is stream:
+                del _discovered[archive]
+
+
+def open_document_binary(path: str) -> BinaryIO:
+    """
+    Open a document for reading its bytes, decompressing it when it is compressed
+
+    Args:
+        path: a document identifier, a file, compressed file or archive member
+
+    Returns: A binary file object of the document's uncompressed contents
+    """
+    member = split_member(path)
+    if member is None:
+        return _open_compressed(path, compression_of(path))
+    archive, name = member
+    if _tar_extension(archive) is not None:
+        binary = io.BytesIO(_read_tar_member(archive, name))
+    else:
+        binary = _open_zip(archive).open(name)
+    return _decompress(binary, compression_of(name))
+
+
+def open_document(path: str) -> TextIO:
+    """
+    Open a document for reading its text, as open(path, "r") would a plain file
+
+    Args:
+        path: a document identifier, a file, compressed file or archive member
+
+    Returns: A text file object, decoding and decompressing as it is read
+    """
+    if compression_of(path) is None and split_member(path) is None:
+        return open(path, "r")
+    return io.TextIOWrapper(open_document_binary(path))
+
+
+def read_text(path: str) -> str:
+    """Read the whole text of a document, see open_document"""
+    with open_document(path) as f:
+        return f.read()
+
+
+@lru_cache(maxsize=4)
+def _tar_member_sizes(archive: str, mtime_ns: int, size: int) -> dict[str, int]:
+    stream = _TarStream(archive, keep=False)
+    for _ in stream.members():
+        pass
+    return stream.sizes
+
+
+def document_size(path: str) -> int:
+    """
+    The size of a document in bytes, uncompressed when the format records it cheaply
+
+    Members of zip archives and gzip files, below 4GB, report their uncompressed size, as
+    do tar members while their archive is being discovered. Other compressed files report
+    their compressed size.
+
+    Args:
+        path: a document identifier
+
+    Returns: The size in bytes
+    """
+    member = split_member(path)
+    if member is None:
+        size = os.path.getsize(path)
+        if compression_of(path) == ".gz" and size >= 4:
+            # the trailer holds the uncompressed size modulo 4GB
+            with open(path, "rb") as f:
+                f.seek(-4, os.SEEK_END)
+                size = max(size, int.from_bytes(f.read(4), "little"))
+        return size
+    archive, name = member
+    if _tar_extension(archive) is None:
+        return _open_zip(archive).getinfo(name).file_size
+    with _streams_lock:
+        stream = _discovered.get(archive)
+    if stream is not None and name in stream.sizes:
+        return stream.sizes[name]
+    stat = os.stat(archive)
+    return _tar_member_sizes(archive, stat.st_mtime_ns, stat.st_size)[name]
+
+
+def document_stat(path: str) -> os.stat_result:
+    """
+    The stat of a document, for telling whether it changed, archive members share their archive's
+
+    Args:
+        path: a document identifier
+
+    Returns: The os.stat_result of the document, or of the archive holding it
+    """
+    member = split_member(path)
+    return os.stat(member[0] if member else path)
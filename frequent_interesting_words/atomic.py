@@ -0,0 +1,61 @@
+"""
+Replacing files so that readers see either the old or the new contents, never a partly
+written file
+
+A file is written under a temporary name beside its target, then renamed over it once
+complete. Temporary files are created readable by their owner alone, so before the rename
+they are given the mode open() would have created the target with.
+"""
+
+import os
+import tempfile
+from typing import Union
+
+_TEMP_PREFIX = ".tmp-"
+
+
+def _umask() -> int:
+    # /proc reports the umask without changing it, changing it would affect every thread
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0o077)
+    os.umask(umask)
+    return umask
+
+
+def move_into_place(temp_path: str, path: str):
+    """
+    Rename a completed temporary file over path, giving it the mode open() would have
+
+    Args:
+        temp_path: the temporary file, in the same directory as path
+        path: the file to replace
+    """
+    os.chmod(temp_path, 0o666 & ~_umask())
+    os.replace(temp_path, path)
+
+
+def atomic_write(path: str, data: Union[str, bytes], prefix: str = _TEMP_PREFIX):
+    """
+    Write a file in one go, text is encoded as UTF-8
+
+    Args:
+        path: the file to write, replaced once the data is written
+        data: the whole contents of the file
+        prefix: name prefix of the temporary file, so readers of the directory can skip it
+    """
+    fd, temp_path = tempfile.mkstemp(
+        prefix=prefix, dir=os.path.dirname(os.path.abspath(path))
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        move_into_place(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
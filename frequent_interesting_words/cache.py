@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+from typing import Iterable, Optional
+
+from frequent_interesting_words.atomic import atomic_write
+
+# Bump when the layout or meaning of cached entries changes, invalidating old entries
+CACHE_VERSION = 1
+DEFAULT_MAX_SIZE_MB = 256
+_TEMP_PREFIX = ".tmp-"
+
+
+def default_cache_dir() -> str:
+    """The per user cache directory, honouring XDG_CACHE_HOME"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "frequent_interesting_words")
+
+
+class KeywordCache:
+    """
+    Content addressed on disk cache of the keyword frequencies found in a document
+
+    Entries are keyed by a hash of the document text and the extraction parameters, so
+    renamed or copied documents still hit the cache. Writes go to a temporary file that
+    is atomically renamed into place, so concurrent processes never see partial entries,
+    and reads refresh the entry's mtime so eviction can drop the least recently used.
+
+    Args:
+        directory: where the cache entries are stored, created on first write
+        max_size: upper bound on the total size of the entries in bytes, enforced by evict
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE_MB * 2**20):
+        self.directory = directory
+        self.max_size = max_size
+
+    @staticmethod
+    def key(text: str, **params) -> str:
+        """
+        Build the cache key for a document
+
+        Args:
+            text: the document's text
+            params: the parameters the cached result depends on
+
+        Returns: hex digest identifying the text and parameters
+        """
+        return KeywordCache.key_from_chunks([text], **params)
+
+    @staticmethod
+    def key_from_chunks(chunks: Iterable[str], **params) -> str:
+        """
+        Build the cache key for a document read a chunk at a time, the key is the same as
+        KeywordCache.key of the chunks joined together
+
+        Args:
+            chunks: the document's text in consecutive pieces
+            params: the parameters the cached result depends on
+
+        Returns: hex digest identifying the text and parameters
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(
+            json.dumps([CACHE_VERSION, params], sort_keys=True).encode("utf-8")
+        )
+        for chunk in chunks:
+            digest.update(chunk.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict[str, int]]:
+        """
+        Fetch the keyword frequencies stored under the key
+
+        Args:
+            key: cache key from KeywordCache.key
+
+        Returns: Mapping of keyword to frequency, or None when the entry is missing
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                frequencies = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            # missing, evicted mid read or left corrupt by a crash, all just a miss
+            return None
+        return frequencies
+
+    def put(self, key: str, frequencies: dict[str, int]):
+        """
+        Store the keyword frequencies under the key
+
+        Args:
+            key: cache key from KeywordCache.key
+            frequencies: mapping of keyword to frequency, its order is preserved
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, json.dumps(frequencies), _TEMP_PREFIX)
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits within max_size"""
+        entries = []
+        total_size = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.startswith(_TEMP_PREFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # another process got there first
+                pass
+            total_size -= size
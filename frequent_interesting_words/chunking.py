@@ -0,0 +1,87 @@
+from itertools import chain
+from typing import Iterable, Iterator, TextIO
+
+from frequent_interesting_words.document import iter_sentence_spans, iter_sentences
+from frequent_interesting_words.tokenizers import DEFAULT_TOKENIZER, get_tokenizer
+
+
+def iter_text_windows(
+    f: TextIO, window_size: int, tokenizer: str = DEFAULT_TOKENIZER
+) -> Iterator[str]:
+    """
+    Read a text file in windows of roughly window_size characters that end on a sentence
+    boundary, so no sentence is split across windows and only one window is held at a time
+
+    The last, possibly incomplete, sentence of each read is carried over to the next
+    window. A single sentence longer than the window is cut at its last whitespace.
+
+    Args:
+        f: text file object to read from
+        window_size: number of characters to read at a time
+        tokenizer: name of the tokenizer finding sentence boundaries, see tokenizers.TOKENIZERS
+
+    Returns: Iterator of windows, concatenated they are the file's full text
+    """
+    tokenizer = get_tokenizer(tokenizer)
+    carry = ""
+    while True:
+        block = f.read(window_size)
+        if not block:
+            if carry:
+                yield carry
+            return
+
+        buffer = carry + block
+        cut = 0
+        for start, _ in tokenizer.span_tokenize(buffer):
+            cut = start
+        if not cut:
+            cut = max(buffer.rfind(" "), buffer.rfind("\n")) + 1
+        if not cut:
+            cut = len(buffer)
+        yield buffer[:cut]
+        carry = buffer[cut:]
+
+
+def iter_window_sentences(
+    windows: Iterable[str], tokenizer: str = DEFAULT_TOKENIZER
+) -> Iterator[tuple[str, list[str]]]:
+    """Yield each sentence of the windows along with its lower case tokens, see iter_sentences"""
+    return chain.from_iterable(
+        iter_sentences(window, tokenizer) for window in windows if window
+    )
+
+
+def iter_window_sentence_spans(
+    windows: Iterable[str], tokenizer: str = DEFAULT_TOKENIZER
+) -> Iterator[tuple[int, int, list[str]]]:
+    """Yield the offsets of each sentence of the windows within their concatenated text, along with its lower case tokens, see iter_sentence_spans"""
+    offset = 0
+    for window in windows:
+        for start, end, lower_tokens in iter_sentence_spans(window, tokenizer):
+            yield offset + start, offset + end, lower_tokens
+        offset += len(window)
+
+
+def merge_keyword_scores(
+    window_scores: Iterable[list[tuple[str, float]]], word_limit: int
+) -> list[str]:
+    """
+    Merge the YAKE candidates of every window into the keywords of the whole document
+
+    A keyword's score is the best, lowest, score it reached in any window, so a word that
+    is important to one part of a long document is not drowned out by the rest of it
+
+    Args:
+        window_scores: (keyword, score) candidates for each window
+        word_limit: limits the keywords returned to the x most important
+
+    Returns: list of lower case keywords sorted in importance order
+    """
+    best = {}
+    for scores in window_scores:
+        for keyword, score in scores:
+            keyword = keyword.lower()
+            if keyword not in best or score < best[keyword]:
+                best[keyword] = score
+    return sorted(best, key=lambda keyword: (best[keyword], keyword))[:word_limit]
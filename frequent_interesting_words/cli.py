@@ -1,254 +1,717 @@
+import cProfile
+import importlib
+import json
 import os
-import re
-from collections import defaultdict
-from pathlib import Path
-from typing import Iterable, Type, TypedDict
+from contextlib import contextmanager
+from functools import wraps
+from typing import TYPE_CHECKING, Iterator, Optional
 
 import click
-import nltk
-import yake
-from pytablewriter import MarkdownTableWriter
-from yake.highlight import TextHighlighter
 
+from frequent_interesting_words import profiling
+from frequent_interesting_words.archives import is_archive
+from frequent_interesting_words.cache import (
+    DEFAULT_MAX_SIZE_MB,
+    KeywordCache,
+    default_cache_dir,
+)
+from frequent_interesting_words.discovery import (
+    SYMLINK_POLICIES,
+    Rediscovery,
+    iter_filepaths,
+)
+from frequent_interesting_words.engines import (
+    DEFAULT_ENGINE,
+    ENGINES,
+    get_engine,
+)
+from frequent_interesting_words.output import (
+    OUTPUT_FORMATS,
+    output_format_for,
+    parquet_available,
+)
+from frequent_interesting_words.partials import PARTIAL_EXTENSION
+from frequent_interesting_words.tokenizers import DEFAULT_TOKENIZER, TOKENIZERS
 
-class WordsWithFrequencyDict(TypedDict):
-    word: str
-    doc_path_to_frequency_map: dict[str, int]
+if TYPE_CHECKING:
+    from frequent_interesting_words.index import CorpusIndex
+    from frequent_interesting_words.pipeline import ApproximationReport
+    from frequent_interesting_words.prefetch import Prefetcher
 
+# Imported by the stages on first use, see profiled_run
+LAZY_DEPENDENCIES = ("numpy", "nltk", "yake", "pytablewriter")
+# The defaults of prefetch, server and index, written out so --help imports none of them
+DEFAULT_READERS = 4
+DEFAULT_PREFETCH_MB = 64
+DEFAULT_REUSE_MB = 64
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_INDEX = "corpus_index.db"
 
-def extract_keywords(text: str, word_limit: int) -> list[str]:
-    """
-    Build a list of important words from a given piece of text
 
-    Args:
-        text: text to extract keywords from
-        word_limit: limits the keywords extracted to the x most important
+def resolve_output_format(target: str, output_format: str = None) -> str:
+    """Settle the output format described by the --target and --format options, checking it can be written"""
+    output_format = output_format or output_format_for(target)
+    if output_format == "parquet" and not parquet_available():
+        raise click.UsageError("Parquet output needs pyarrow, pip install pyarrow")
+    return output_format
 
-    Returns: list of lower case keywords in the text sorted in frequency order
-    """
-    kw_extractor = yake.KeywordExtractor(
-        lan="en", n=1, dedupLim=0.9, top=word_limit, features=None
+
+def keyword_cache(no_cache: bool, cache_dir: str, cache_size: int) -> KeywordCache:
+    """Build the KeywordCache described by the cache options, None when caching is off"""
+    if no_cache:
+        return None
+    return KeywordCache(cache_dir or default_cache_dir(), cache_size * 2**20)
+
+
+def approximation_summary(report: "ApproximationReport") -> str:
+    """Describe how far the result of an aggregation with --approximate-counters can be trusted"""
+    return (
+        f"Approximate aggregation of {report['occurrences']} occurrences in "
+        f"{report['counters']} counters, counts overestimated by at most "
+        f"{report['error_bound']}, {report['candidates']} candidates recounted exactly, "
+        + (
+            "the top words are exact"
+            if report["exact"]
+            else f"words occurring at most {report['error_bound']} times may be missing"
+        )
     )
-    keywords = kw_extractor.extract_keywords(text)
 
-    return [k[0].lower() for k in sorted(keywords, key=lambda x: x[1])]
 
+def document_prefetcher(
+    prefetch: int, prefetch_buffer: int, reuse_budget: int
+) -> "Prefetcher":
+    """Build the Prefetcher described by the prefetch options, None when prefetching is off"""
+    if prefetch <= 0:
+        return None
 
-def build_word_occurance_dict(text: str, words: Iterable[str]) -> dict[str, int]:
-    """
-    Build a dictionary of the frequency of words contained within a body of text
+    from frequent_interesting_words.prefetch import Prefetcher
+
+    return Prefetcher(prefetch, prefetch_buffer * 2**20, reuse_budget * 2**20)
 
-    Args:
-        text: text in which the frequency of words will be checked
-        words: words to check the frequency of
 
-    Returns: Dict mapping words to its frequency in the text
+class DefaultCommandGroup(click.Group):
+    """
+    A click Group that falls back to a default command when its first argument is not
+    the name of a subcommand, so `frequent-interesting-words PATH` keeps working
     """
-    all_words = nltk.tokenize.word_tokenize(text)
-    stopwords = nltk.corpus.stopwords.words("english")
-    lower_case_words = [k.lower() for k in words]
-    filtered_words = nltk.FreqDist(
-        w.lower()
-        for w in all_words
-        if w not in stopwords and w.lower() in lower_case_words
+
+    def __init__(self, *args, default_command: str = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if (
+            args
+            and args[0] not in self.commands
+            and args[0] not in ctx.help_option_names
+        ):
+            args.insert(0, self.default_command)
+        return super().parse_args(ctx, args)
+
+
+def add_options(command, options: list):
+    """Apply click option decorators to a command, listed in the order --help shows them"""
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def keyword_options(command):
+    """Add the options controlling how keywords are extracted from each document"""
+    return add_options(
+        command,
+        [
+            click.option(
+                "--interesting-words-per-document",
+                "per_doc_word_count",
+                type=int,
+                default=50,
+                help="How many interesting words to discover per document, reducing improves performance but decreases validity",
+            ),
+            click.option(
+                "--tokenizer",
+                type=click.Choice(list(TOKENIZERS)),
+                default=DEFAULT_TOKENIZER,
+                show_default=True,
+                help="How documents are split into sentences and words, fast uses regular expressions that are many times quicker than nltk at a small cost in accuracy",
+            ),
+        ],
     )
 
-    return filtered_words
 
+def worker_options(command):
+    """Add the options controlling how documents are read and spread over worker processes"""
+    return add_options(
+        command,
+        [
+            click.option(
+                "--jobs",
+                type=int,
+                default=0,
+                help="Number of worker processes used to process documents in parallel, 0 means one per CPU core",
+            ),
+            click.option(
+                "--chunk-size",
+                type=float,
+                default=0,
+                help="Read documents larger than this many MB in sentence aligned windows of that size, so memory depends on the window rather than the document, 0 means never",
+            ),
+            click.option(
+                "--prefetch",
+                type=int,
+                default=DEFAULT_READERS,
+                show_default=True,
+                help="Number of documents read ahead in background threads while others are processed, 0 leaves each worker to read its own",
+            ),
+            click.option(
+                "--prefetch-buffer",
+                type=int,
+                default=DEFAULT_PREFETCH_MB,
+                show_default=True,
+                help="Upper bound on the size of the documents read ahead in MB",
+            ),
+        ],
+    )
 
-def build_interesting_word_frequency_dict(
-    text: str, path: str, word_limit: int
-) -> WordsWithFrequencyDict:
-    """
-    Build a WordsWithFrequencyDict from a piece of text
 
-    Args:
-        text: the text to build the WordsWithFrequencyDict from
-        path: the filepath to the doc which contains the text
-        word_limit: the upper limit of keywords to extract from the text
+def cache_options(command):
+    """Add the options of the keyword cache, see keyword_cache"""
+    return add_options(
+        command,
+        [
+            click.option(
+                "--no-cache",
+                is_flag=True,
+                help="Extract keywords from every document rather than reusing cached results for unchanged documents",
+            ),
+            click.option(
+                "--cache-dir",
+                type=click.Path(file_okay=False),
+                envvar="FREQUENT_INTERESTING_WORDS_CACHE_DIR",
+                help="Directory for the keyword cache, defaults to frequent_interesting_words in the user cache directory",
+            ),
+            click.option(
+                "--cache-size",
+                type=int,
+                default=DEFAULT_MAX_SIZE_MB,
+                help="Upper bound on the size of the keyword cache in MB, least recently used entries are evicted",
+            ),
+        ],
+    )
 
-    Returns:
-        A WordsWithFrequencyDict
-    """
-    if not path or not text:
-        return {}
-
-    return {
-        word: {path: frequency}
-        for word, frequency in build_word_occurance_dict(
-            text, extract_keywords(text, word_limit)
-        ).items()
-    }
 
+def per_document_engine_option(command):
+    """Add --engine offering only the engines that score each document on its own"""
+    return click.option(
+        "--engine",
+        type=click.Choice(
+            [name for name, engine in ENGINES.items() if not engine.corpus_level]
+        ),
+        default=DEFAULT_ENGINE,
+        show_default=True,
+        help="Keyword extraction engine, corpus level engines score each document against the rest so are not offered",
+    )(command)
 
-def flatten_and_sort_words_with_frequency(
-    words_with_frequency: WordsWithFrequencyDict,
-) -> list[tuple[str, int]]:
-    """
-    Flattens a WordsWithFrequencyDict into a list of tuples, these being
-    pairs of (word, frequency), also sorts them
 
-    Args:
-        words_with_frequency: WordsWithFrequencyDict to flatten and sort
+def processing_options(command):
+    """Add the options shared by every command that processes documents into a table"""
+    return add_options(
+        command,
+        [
+            click.option(
+                "--target",
+                type=str,
+                default="output.md",
+                help="Filepath for the output table",
+            ),
+            click.option(
+                "--format",
+                "output_format",
+                type=click.Choice(list(OUTPUT_FORMATS)),
+                help="Format of the output table, by default inferred from the --target extension, otherwise markdown",
+            ),
+            click.option(
+                "--unlimit-example-sentences",
+                "example_limit",
+                is_flag=True,
+                help="Remove the one per document limit on example sentences in the table output",
+            ),
+            click.option(
+                "--interesting-words-limit",
+                "word_count",
+                type=int,
+                default=10,
+                help="An upper bound on the number of interesting words in the output table, ranked by frequency, 0 means no limit",
+            ),
+            keyword_options,
+            worker_options,
+            click.option(
+                "--reuse-budget",
+                type=int,
+                default=DEFAULT_REUSE_MB,
+                show_default=True,
+                help="Upper bound in MB on the texts kept from keyword extraction so sample sentences are found without reading them again, 0 keeps none",
+            ),
+            cache_options,
+        ],
+    )
 
-    Returns:
-        list of tuples of (word, frequency)
-    """
-    flattened_words = [
-        (k, sum(frequency for _, frequency in v.items()))
-        for k, v in words_with_frequency.items()
-    ]
-    # ordered by frequency, followed by alphabetical
-    return sorted(flattened_words, key=lambda x: (-x[1], x[0]))
 
+def discovery_options(command):
+    """Add the options controlling which files under PATH are processed, named after iter_filepaths' arguments"""
+    return add_options(
+        command,
+        [
+            click.option(
+                "--include",
+                multiple=True,
+                help="Only process files whose name or path relative to PATH matches this glob, can be repeated",
+            ),
+            click.option(
+                "--exclude",
+                multiple=True,
+                help="Skip files and directories whose name or path relative to PATH matches this glob, can be repeated",
+            ),
+            click.option(
+                "--min-size", type=int, help="Skip files smaller than this many bytes"
+            ),
+            click.option(
+                "--max-size", type=int, help="Skip files larger than this many bytes"
+            ),
+            click.option(
+                "--symlinks",
+                type=click.Choice(SYMLINK_POLICIES),
+                default="files",
+                show_default=True,
+                help="Ignore symlinks, follow those to files, or follow those to directories too",
+            ),
+            click.option(
+                "--recursive/--no-recursive",
+                default=True,
+                help="Descend into subdirectories of PATH",
+            ),
+        ],
+    )
 
-def aggregate_words_with_frequency(
-    interesting_word_frequency_collection: Iterable[WordsWithFrequencyDict],
-    limit: int = None,
-) -> WordsWithFrequencyDict:
-    """
-    Do a deep merge on a collecion of WordsWithFrequencyDicts to combine them into a single one
 
-    Args:
-        interesting_word_frequency_collection: Iterable of WordWithFrequencyDicts to merge
-        limit: An upper limit in the total number of words in the final WordsWithFrequencyDict
+def document_options(command):
+    """Add the options of commands that keep each document's keywords rather than a table, where corpus level engines cannot be used"""
+    return add_options(
+        command,
+        [keyword_options, per_document_engine_option, worker_options, cache_options],
+    )
 
-    Returns: A WordsWithFrequencyDict that is the aggregation of those in the collection
-    """
-    result = defaultdict(dict)
-    for interesting_word_frequency_dict in interesting_word_frequency_collection:
-        for word, v in interesting_word_frequency_dict.items():
-            for document, frequency in v.items():
-                result[word][document] = frequency
-
-    if limit:
-        result = {
-            k: v
-            for k, v in result.items()
-            if k
-            in [x for x, _ in flatten_and_sort_words_with_frequency(result)[:limit]]
-        }
-    return result
-
-
-def extract_sample_sentences_from_text(
-    keyword: str, text: str, limit: int = None
-) -> list[str]:
+
+@contextmanager
+def profiled_run(
+    profile: bool, profile_slowest: int, profile_json: str, profile_pstats: str
+) -> Iterator[None]:
     """
-    Pulls a number of sample sentences from the text based on the keyword
+    Profile the run described by the profiling options, printing a summary of each
+    stage to stderr and writing the JSON and pstats outputs asked for
 
     Args:
-        keyword: Sentences are pulled fro the text if they contain this word
-        text: text to pull sentences from
-        limit: upper bound on the number of sentences to extract, falsy means unlimited
-
-    Returns: List of sentences extracted from the text
+        profile: print the summary
+        profile_slowest: how many of the slowest documents to list
+        profile_json: filepath to write the metrics to as JSON, implies profile
+        profile_pstats: filepath to write cProfile statistics of this process to, implies profile
     """
-    if not keyword or not text:
-        return []
-
-    sentences = nltk.tokenize.sent_tokenize(text)
-    sample_sentences = [
-        sentence
-        for sentence in sentences
-        if keyword.lower() in nltk.tokenize.word_tokenize(sentence.lower())
-    ]
-    if limit:
-        sample_sentences = sample_sentences[:limit]
-    return sample_sentences
+    if not (profile or profile_json or profile_pstats):
+        yield
+        return
 
+    # tracemalloc slows imports down enormously, pytablewriter's takes over a minute, so
+    # the dependencies are imported before tracing starts and left out of the profile
+    for module in LAZY_DEPENDENCIES:
+        importlib.import_module(module)
 
-def highlight_text(text: str, word: str) -> str:
-    """Highlight the given word within the text using md bold syntax"""
-    return TextHighlighter(
-        max_ngram_size=1, highlight_pre="**", highlight_post="**"
-    ).highlight(text, [word, f"{word}’s", f"{word}'s", f"{word}`s"])
+    profiler = profiling.Profiler(profile_slowest)
+    python_profile = cProfile.Profile() if profile_pstats else None
+    profiler.start()
+    if python_profile is not None:
+        python_profile.enable()
+    try:
+        yield
+    finally:
+        if python_profile is not None:
+            python_profile.disable()
+        profiler.stop()
 
+    click.echo(profiler.summary(), err=True)
+    if profile_json:
+        with open(profile_json, "w") as f:
+            json.dump(
+                {"wall_seconds": profiler.wall_seconds, **profiler.snapshot()},
+                f,
+                indent=2,
+            )
+    if python_profile is not None:
+        python_profile.dump_stats(profile_pstats)
 
-def format_output_table(
-    words_with_frequency: WordsWithFrequencyDict, word_to_sentences_map: dict[str, str]
-) -> Type[MarkdownTableWriter]:
-    """
-    Build a pytablewriter MarkdownTableWriter from data in a WordsWithFrequencyDict and a mapping
-    between words and sample sentences,
-    Format is 3 columns of word, documents containing the word and sample sentences with that word in from those documents
 
-    Args:
-        words_with_frequency: WordsWithFrequencyDict to build the table from
-        word_to_sentences_map: mapping from words to sample sentences to build that c
+def profiling_options(command):
+    """Add the --profile options, running the command within profiled_run"""
 
-    Returns: MarkdownTableWriter populated with the parameter data
-    """
-    if (
-        not words_with_frequency
-        or not all(v for v in words_with_frequency.values())
-        or not word_to_sentences_map
+    @wraps(command)
+    def profiled_command(
+        *args, profile, profile_slowest, profile_json, profile_pstats, **kwargs
     ):
-        raise ValueError("Invalid Parameter")
-
-    flattened_words = flatten_and_sort_words_with_frequency(words_with_frequency)
-
-    value_matrix = []
-    for word, frequency in flattened_words:
-        # split('.')[0] is for removing the .txt from the filename
-        docs = ", ".join(sorted(Path(path).stem for path in words_with_frequency[word]))
-        value_matrix.append(
-            [
-                f"{word} ({frequency})",
-                docs,
-                "<br/><br/>".join(
-                    highlight_text(sentence, word)
-                    for sentence in word_to_sentences_map[word]
-                ),
-            ]
-        )
+        with profiled_run(profile, profile_slowest, profile_json, profile_pstats):
+            return command(*args, **kwargs)
 
-    writer = MarkdownTableWriter(
-        table_name="Interesting Words Summary",
-        headers=[
-            "Word (Total Occurances)",
-            "Documents",
-            "Sentences Containing The Word",
-        ],
-        value_matrix=value_matrix,
-    )
+    options = [
+        click.option(
+            "--profile",
+            is_flag=True,
+            help="Print the wall time, CPU time, documents, bytes read and peak traced memory of each stage, and the slowest documents, to stderr",
+        ),
+        click.option(
+            "--profile-slowest",
+            type=int,
+            default=10,
+            help="How many of the slowest documents --profile lists",
+        ),
+        click.option(
+            "--profile-json",
+            type=click.Path(dir_okay=False),
+            help="Also write the --profile metrics to this file as JSON",
+        ),
+        click.option(
+            "--profile-pstats",
+            type=click.Path(dir_okay=False),
+            help="Also write cProfile statistics of the main process to this file, for pstats or snakeviz",
+        ),
+    ]
+    for option in reversed(options):
+        profiled_command = option(profiled_command)
+    return profiled_command
 
-    return writer
 
+@click.group(cls=DefaultCommandGroup, default_command="run")
+def main():
+    """
+    Extract the most frequent interesting words from a set of documents, then generate a table summarizing the results
 
-def build_filepaths_to_process(path: str) -> list[str]:
+    PATH on its own is short for `run PATH`
     """
-    If path is a file then return that, if its a directory then add all the files inside
 
-    Args:
-        path: filepath, can be a file or directory
 
-    Returns: List of filepaths
-    """
-    filepaths_to_process = []
-    if os.path.isdir(path):
-        directory_contents = os.listdir(path)
-        filepaths_to_process = []
-        for file in directory_contents:
-            filename = os.path.join(path, file)
-            if os.path.isfile(filename):
-                filepaths_to_process.append(filename)
-    else:
-        filepaths_to_process.append(path)
+@main.command("run")
+@click.argument("path", type=click.Path("r"))
+@processing_options
+@discovery_options
+@click.option(
+    "--approximate-counters",
+    type=int,
+    default=0,
+    help="Aggregate in fixed memory with this many heavy hitter counters, then recount the top candidates exactly, 0 means exact aggregation",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(list(ENGINES)),
+    default=DEFAULT_ENGINE,
+    show_default=True,
+    help="Keyword extraction engine, tfidf scores each document against the rest of the corpus rather than on its own",
+)
+@profiling_options
+def frequent_interesting_words(
+    path,
+    target,
+    output_format,
+    example_limit,
+    word_count,
+    per_doc_word_count,
+    jobs,
+    chunk_size,
+    tokenizer,
+    prefetch,
+    prefetch_buffer,
+    reuse_budget,
+    no_cache,
+    cache_dir,
+    cache_size,
+    approximate_counters,
+    engine,
+    **discovery,
+):
+    """Extract the most frequent interesting words from a set of documents, then generate a table summarizing the results"""
+
+    if approximate_counters and not word_count:
+        raise click.UsageError(
+            "--approximate-counters needs a limit on the number of interesting words"
+        )
+    if approximate_counters and get_engine(engine).corpus_level:
+        raise click.UsageError(
+            f"--approximate-counters cannot be used with the {engine} engine"
+        )
+    if approximate_counters and no_cache:
+        raise click.UsageError(
+            "--approximate-counters recounts from the keyword cache so cannot be used with --no-cache"
+        )
 
-    return filepaths_to_process
+    from frequent_interesting_words.analyzer import Analyzer
+    from frequent_interesting_words.parallel import document_executor
 
+    output_format = resolve_output_format(target, output_format)
+    cache = keyword_cache(no_cache, cache_dir, cache_size)
+    analyzer = Analyzer(
+        per_doc_word_count,
+        None if example_limit else 1,
+        engine,
+        tokenizer,
+        int(chunk_size * 2**20),
+        cache,
+        document_prefetcher(prefetch, prefetch_buffer, reuse_budget),
+    )
 
-@click.command()
+    with document_executor(
+        jobs, None if os.path.isdir(path) or is_archive(path) else 1
+    ) as executor_map:
+        report = analyzer.add_documents(
+            # walked again for the second pass of --approximate-counters
+            Rediscovery(
+                lambda: profiling.timed_iter(
+                    "discovery", iter_filepaths(path, **discovery)
+                )
+            ),
+            executor_map,
+            approximate_counters,
+            word_count,
+        )
+        if report is not None:
+            click.echo(approximation_summary(report), err=True)
+        click.echo([word for word, _ in analyzer.top_words(word_count)])
+        analyzer.render(target, word_count, output_format, executor_map)
+
+    if cache is not None:
+        cache.evict()
+
+
+@main.command()
 @click.argument("path", type=click.Path("r"))
 @click.option(
-    "--target", type=str, default="output.md", help="Filepath for the output table"
+    "--manifest",
+    type=click.Path(dir_okay=False),
+    default="corpus_manifest.db",
+    help="Filepath of the SQLite manifest holding the keywords and file states from previous runs",
+)
+@processing_options
+@discovery_options
+@profiling_options
+def update(
+    path,
+    manifest,
+    target,
+    output_format,
+    example_limit,
+    word_count,
+    per_doc_word_count,
+    jobs,
+    chunk_size,
+    tokenizer,
+    prefetch,
+    prefetch_buffer,
+    reuse_budget,
+    no_cache,
+    cache_dir,
+    cache_size,
+    **discovery,
+):
+    """Like run, but only processes the documents added or modified since the last update, removing deleted ones"""
+
+    from frequent_interesting_words.analyzer import Analyzer
+    from frequent_interesting_words.incremental import CorpusManifest
+    from frequent_interesting_words.parallel import document_executor
+    from frequent_interesting_words.pipeline import (
+        build_filepaths_to_process,
+        write_summary,
+    )
+
+    output_format = resolve_output_format(target, output_format)
+    with profiling.stage("discovery"):
+        filepaths_to_process = build_filepaths_to_process(path, **discovery)
+    cache = keyword_cache(no_cache, cache_dir, cache_size)
+    analyzer = Analyzer(
+        per_doc_word_count,
+        None if example_limit else 1,
+        tokenizer=tokenizer,
+        chunk_size=int(chunk_size * 2**20),
+        cache=cache,
+        prefetcher=document_prefetcher(prefetch, prefetch_buffer, reuse_budget),
+    )
+
+    try:
+        corpus = CorpusManifest(
+            manifest,
+            per_doc_word_count,
+            tokenizer,
+            analyzer.chunk_size,
+            analyzer.example_limit,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    with corpus:
+        with profiling.stage("manifest"):
+            changed, deleted = corpus.plan(filepaths_to_process)
+            for filepath in deleted:
+                corpus.remove(filepath)
+
+        with document_executor(jobs, len(changed)) as executor_map:
+            for (filepath, state), (words_with_frequency, sentences) in zip(
+                changed.items(), analyzer.map_documents(changed, executor_map)
+            ):
+                with profiling.stage("manifest"):
+                    corpus.record(filepath, state, words_with_frequency, sentences)
+        with profiling.stage("manifest"):
+            corpus.save()
+        click.echo(
+            f"{len(changed)} documents added or modified, {len(deleted)} removed",
+            err=True,
+        )
+
+        # the totals and every document's sentences are in the manifest, nothing is
+        # aggregated or read again for the table
+        click.echo([word for word, _ in corpus.top(word_count)])
+        result = corpus.result(word_count)
+        write_summary(
+            result,
+            corpus.sample_sentences(result, filepaths_to_process),
+            target,
+            output_format,
+        )
+
+    if cache is not None:
+        cache.evict()
+
+
+def parse_shard(ctx, param, value: str) -> Optional[tuple[int, int]]:
+    """Parse the --shard option, I/N, into (index, count)"""
+    if value is None:
+        return None
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise click.BadParameter("expected I/N, such as 0/4")
+    if not 0 <= index < count:
+        raise click.BadParameter("I must be at least 0 and less than N")
+    return index, count
+
+
+@main.command("map")
+@click.argument("path", type=click.Path("r"), required=False)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=f"partial{PARTIAL_EXTENSION}",
+    show_default=True,
+    help="Filepath to write the partial result to",
+)
+@click.option(
+    "--shard",
+    callback=parse_shard,
+    help="Only process the documents of hash partition I of N, written I/N, every node must list the same corpus",
+)
+@click.option(
+    "--files-from",
+    type=click.File("r"),
+    help="Process the filepaths listed in this file, one per line, rather than the files under PATH, - reads stdin",
 )
 @click.option(
     "--unlimit-example-sentences",
     "example_limit",
     is_flag=True,
-    help="Remove the one per document limit on example sentences in the table output",
+    help="Remove the one per document limit on example sentences",
+)
+@document_options
+@discovery_options
+@profiling_options
+def map_shard(
+    path,
+    output,
+    shard,
+    files_from,
+    example_limit,
+    per_doc_word_count,
+    engine,
+    jobs,
+    chunk_size,
+    tokenizer,
+    prefetch,
+    prefetch_buffer,
+    no_cache,
+    cache_dir,
+    cache_size,
+    **discovery,
+):
+    """Process a shard of a corpus into a partial result for merge, the keyword frequencies and candidate sample sentences of each document"""
+    from frequent_interesting_words.parallel import document_executor
+    from frequent_interesting_words.partials import PartialSettings, PartialWriter
+    from frequent_interesting_words.pipeline import map_documents, shard_filepaths
+
+    if (path is None) == (files_from is None):
+        raise click.UsageError("Give either PATH or --files-from")
+
+    if files_from is not None:
+        root = None
+        filepaths = (line.rstrip("\r\n") for line in files_from if line.strip())
+    else:
+        root = path if os.path.isdir(path) else os.path.dirname(path)
+        filepaths = profiling.timed_iter("discovery", iter_filepaths(path, **discovery))
+    documents = list(shard_filepaths(filepaths, root, shard))
+
+    cache = keyword_cache(no_cache, cache_dir, cache_size)
+    settings = PartialSettings(
+        word_limit=per_doc_word_count,
+        example_limit=None if example_limit else 1,
+        engine=engine,
+        tokenizer=tokenizer,
+    )
+    with document_executor(jobs, len(documents)) as executor_map, PartialWriter(
+        output, settings, shard
+    ) as writer:
+        results = map_documents(
+            (filepath for _, filepath in documents),
+            per_doc_word_count,
+            settings["example_limit"],
+            cache,
+            executor_map,
+            int(chunk_size * 2**20),
+            engine,
+            tokenizer,
+            # every text is searched for sentences as soon as its keywords are found
+            document_prefetcher(prefetch, prefetch_buffer, 0),
+        )
+        for (position, filepath), (words_with_frequency, sentences) in zip(
+            documents, results
+        ):
+            writer.write(
+                position,
+                filepath,
+                {word: v[filepath] for word, v in words_with_frequency.items()},
+                sentences,
+            )
+    click.echo(f"{len(documents)} documents written to {output}", err=True)
+
+    if cache is not None:
+        cache.evict()
+
+
+@main.command()
+@click.argument(
+    "partials", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--target",
+    type=str,
+    default="output.md",
+    help="Filepath for the output table",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(list(OUTPUT_FORMATS)),
+    help="Format of the output table, by default inferred from the --target extension, otherwise markdown",
 )
 @click.option(
     "--interesting-words-limit",
@@ -257,49 +720,307 @@ def build_filepaths_to_process(path: str) -> list[str]:
     default=10,
     help="An upper bound on the number of interesting words in the output table, ranked by frequency, 0 means no limit",
 )
+@profiling_options
+def merge(partials, target, output_format, word_count):
+    """Combine the partial results written by map into the summary table, as if their documents had been processed in one run"""
+    from frequent_interesting_words.partials import PartialReader
+    from frequent_interesting_words.pipeline import (
+        flatten_and_sort_words_with_frequency,
+        merge_partials,
+        write_summary,
+    )
+
+    output_format = resolve_output_format(target, output_format)
+    try:
+        partials = [PartialReader(partial) for partial in partials]
+    except ValueError as error:
+        raise click.UsageError(str(error))
+    for partial in partials[1:]:
+        if partial.settings != partials[0].settings:
+            raise click.UsageError(
+                f"{partial.path} was mapped with {partial.settings}, "
+                f"{partials[0].path} with {partials[0].settings}"
+            )
+
+    result, sentences = merge_partials(partials, word_count)
+    click.echo([word for word, _ in flatten_and_sort_words_with_frequency(result)])
+    write_summary(result, sentences, target, output_format)
+
+
+@main.command("index")
+@click.argument("path", type=click.Path("r"))
 @click.option(
-    "--interesting-words-per-document",
-    "per_doc_word_count",
-    type=int,
-    default=50,
-    help="How many interesting words to discover per document, reducing improves performance but decreases validity",
+    "--database",
+    type=click.Path(dir_okay=False),
+    default=DEFAULT_INDEX,
+    show_default=True,
+    help="Filepath of the SQLite database to build, replacing any previous index once complete",
 )
-def frequent_interesting_words(
-    path, target, example_limit, word_count, per_doc_word_count
+@document_options
+@discovery_options
+@profiling_options
+def index_corpus(
+    path,
+    database,
+    per_doc_word_count,
+    engine,
+    jobs,
+    chunk_size,
+    tokenizer,
+    prefetch,
+    prefetch_buffer,
+    no_cache,
+    cache_dir,
+    cache_size,
+    **discovery,
 ):
-    """Extract the most frequent interesting words from a set of documents, then generate a table summarizing the results"""
-
-    filepaths_to_process = build_filepaths_to_process(path)
+    """Process a corpus into a SQLite index of each document's keyword frequencies and sentence offsets, for query"""
+    from frequent_interesting_words.index import IndexWriter
+    from frequent_interesting_words.parallel import document_executor
+    from frequent_interesting_words.pipeline import index_documents
 
-    interesting_word_frequency_collection = []
-    for filepath in filepaths_to_process:
-        with open(filepath, "r") as f:
-            text = f.read()
-        interesting_word_frequency_collection.append(
-            build_interesting_word_frequency_dict(
-                text, filepath, word_limit=per_doc_word_count
-            )
+    cache = keyword_cache(no_cache, cache_dir, cache_size)
+    settings = {
+        "word_limit": per_doc_word_count,
+        "engine": engine,
+        "tokenizer": tokenizer,
+    }
+    count = 0
+    with document_executor(
+        jobs, None if os.path.isdir(path) or is_archive(path) else 1
+    ) as executor_map, IndexWriter(database, settings) as writer:
+        documents = index_documents(
+            profiling.timed_iter("discovery", iter_filepaths(path, **discovery)),
+            per_doc_word_count,
+            cache,
+            executor_map,
+            int(chunk_size * 2**20),
+            engine,
+            tokenizer,
+            document_prefetcher(prefetch, prefetch_buffer, 0),
         )
+        for document in documents:
+            with profiling.stage("index"):
+                writer.write(document)
+            count += 1
+    click.echo(f"{count} documents indexed into {database}", err=True)
+
+    if cache is not None:
+        cache.evict()
+
+
+@main.group()
+@click.option(
+    "--database",
+    type=click.Path(dir_okay=False),
+    default=DEFAULT_INDEX,
+    show_default=True,
+    help="Filepath of the index built by the index command",
+)
+@click.pass_context
+def query(ctx, database):
+    """Answer questions about a corpus from its index, without processing it again"""
+    ctx.obj = database
+
+
+def open_index(database: str) -> "CorpusIndex":
+    """Open the CorpusIndex of the query --database option, failing the command when there is none"""
+    from frequent_interesting_words.index import CorpusIndex
+
+    try:
+        return CorpusIndex(database)
+    except ValueError as error:
+        raise click.ClickException(str(error))
+
+
+@query.command("top")
+@click.option(
+    "-k",
+    "--limit",
+    type=int,
+    default=10,
+    show_default=True,
+    help="How many words to list, 0 lists every word",
+)
+@click.pass_obj
+def query_top(database, limit):
+    """List the most frequent words of the corpus with their frequencies"""
+    with open_index(database) as index:
+        for word, frequency in index.top(limit):
+            click.echo(f"{word}\t{frequency}")
+
 
-    result = aggregate_words_with_frequency(
-        interesting_word_frequency_collection, word_count
+@query.command("word")
+@click.argument("word")
+@click.pass_obj
+def query_word(database, word):
+    """List the documents WORD was found in with its frequency in each"""
+    with open_index(database) as index:
+        documents = index.word_documents(word.lower())
+    if not documents:
+        raise click.ClickException(f"{word} is not a keyword of any document")
+    for path, frequency in documents:
+        click.echo(f"{path}\t{frequency}")
+
+
+@query.command("document")
+@click.argument("path")
+@click.pass_obj
+def query_document(database, path):
+    """List the keywords of the document at PATH, as it was indexed, with their frequencies"""
+    with open_index(database) as index:
+        words = index.document_words(path)
+    if words is None:
+        raise click.ClickException(f"{path} is not in the index")
+    for word, frequency in words:
+        click.echo(f"{word}\t{frequency}")
+
+
+@query.command("sentences")
+@click.argument("word")
+@click.option(
+    "--per-document",
+    type=int,
+    default=1,
+    show_default=True,
+    help="How many sentences to read from each document, 0 means every one",
+)
+@click.pass_obj
+def query_sentences(database, word, per_document):
+    """Print the sentences holding WORD, read back from the documents it was found in"""
+    with open_index(database) as index:
+        try:
+            sentences = index.sample_sentences([word.lower()], per_document)
+        except ValueError as error:
+            raise click.ClickException(str(error))
+    for sentence in sentences[word.lower()]:
+        click.echo(sentence)
+
+
+@query.command("table")
+@click.option(
+    "--target",
+    type=str,
+    default="output.md",
+    help="Filepath for the output table",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(list(OUTPUT_FORMATS)),
+    help="Format of the output table, by default inferred from the --target extension, otherwise markdown",
+)
+@click.option(
+    "--interesting-words-limit",
+    "word_count",
+    type=int,
+    default=10,
+    help="An upper bound on the number of interesting words in the output table, ranked by frequency, 0 means no limit",
+)
+@click.option(
+    "--unlimit-example-sentences",
+    "example_limit",
+    is_flag=True,
+    help="Remove the one per document limit on example sentences",
+)
+@click.pass_obj
+def query_table(database, target, output_format, word_count, example_limit):
+    """Write the summary table of the indexed corpus, as run would have"""
+    from frequent_interesting_words.pipeline import (
+        flatten_and_sort_words_with_frequency,
+        write_summary,
     )
 
-    click.echo([k for k, _ in flatten_and_sort_words_with_frequency(result)])
-
-    paths_to_word_map = defaultdict(list)
-    for word, v in result.items():
-        for path, _ in v.items():
-            paths_to_word_map[path].append(word)
-
-    # Second iteration to make sure one text file is kept in memory
-    sentences = defaultdict(list)
-    for filepath in filepaths_to_process:
-        with open(filepath, "r") as f:
-            text = f.read()
-        for word in paths_to_word_map[filepath]:
-            sentences[word] += extract_sample_sentences_from_text(
-                word, text, None if example_limit else 1
-            )
+    output_format = resolve_output_format(target, output_format)
+    with open_index(database) as index:
+        result = index.result(word_count)
+        try:
+            sentences = index.sample_sentences(result, None if example_limit else 1)
+        except ValueError as error:
+            raise click.ClickException(str(error))
+    click.echo([word for word, _ in flatten_and_sort_words_with_frequency(result)])
+    write_summary(result, sentences, target, output_format)
 
-    format_output_table(result, sentences).dump(target)
+
+@main.command()
+@click.option(
+    "--host",
+    default=DEFAULT_HOST,
+    show_default=True,
+    help="Interface to listen on",
+)
+@click.option(
+    "--port",
+    type=int,
+    default=DEFAULT_PORT,
+    show_default=True,
+    help="TCP port to listen on, 0 picks a free one",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Listen on this Unix socket rather than TCP",
+)
+@click.option(
+    "--root",
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory documents can be added from by path, without it only posted texts are accepted",
+)
+@click.option(
+    "--unlimit-example-sentences",
+    "example_limit",
+    is_flag=True,
+    help="Remove the one per document limit on example sentences",
+)
+@keyword_options
+@per_document_engine_option
+@cache_options
+@click.option("--quiet", is_flag=True, help="Do not log each request to stderr")
+def serve(
+    host,
+    port,
+    socket_path,
+    root,
+    example_limit,
+    per_doc_word_count,
+    engine,
+    tokenizer,
+    no_cache,
+    cache_dir,
+    cache_size,
+    quiet,
+):
+    """Keep the models loaded and a running aggregate in memory, adding documents and answering queries over local HTTP"""
+    from frequent_interesting_words.analyzer import Analyzer
+    from frequent_interesting_words.server import make_server
+
+    cache = keyword_cache(no_cache, cache_dir, cache_size)
+    analyzer = Analyzer(
+        per_doc_word_count,
+        None if example_limit else 1,
+        engine,
+        tokenizer,
+        cache=cache,
+    )
+    try:
+        server = make_server(analyzer, host, port, socket_path, root, quiet)
+    except ValueError as error:
+        raise click.ClickException(str(error))
+    if socket_path:
+        click.echo(f"Serving on {socket_path}", err=True)
+    else:
+        click.echo(
+            f"Serving on http://{server.server_address[0]}:{server.server_address[1]}",
+            err=True,
+        )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        if cache is not None:
+            cache.evict()
@@ -0,0 +1,149 @@
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable
+
+from frequent_interesting_words.resources import stopwords
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_INITIAL_CAPACITY = 1024
+# Distinct tokens held before the vocabulary is dropped and built afresh, roughly 50MB,
+# so a long running process such as serve does not grow with every new token it meets
+MAX_VOCABULARY = 2**19
+
+
+class _Vocabulary:
+    """Token ids along with the id of each token's lower case form and whether it is a stopword"""
+
+    __slots__ = ("ids", "lower_ids", "is_stopword")
+
+    def __init__(self):
+        import numpy as np
+
+        self.ids = {}
+        self.lower_ids = np.empty(_INITIAL_CAPACITY, dtype=np.int64)
+        self.is_stopword = np.empty(_INITIAL_CAPACITY, dtype=bool)
+
+
+class TokenCounter:
+    """
+    Counts the lower case words of documents using integer token ids
+
+    Every distinct token is given an id the first time it is seen, along with the id of
+    its lower case form and whether it is a stopword, so the vocabulary is built once and
+    shared by every document. Counting a document is then one dictionary lookup per token
+    followed by array operations, independent of how many words are asked for. Once the
+    vocabulary holds more than max_vocabulary tokens it is dropped before the next
+    document, documents being counted meanwhile finish with the one they started with.
+
+    Args:
+        stopwords: tokens that are never counted, matched case sensitively
+        max_vocabulary: distinct tokens held before the vocabulary is built afresh
+
+    Attributes:
+        stopwords: the stopwords as a frozenset
+    """
+
+    def __init__(self, stopwords: Iterable[str], max_vocabulary: int = MAX_VOCABULARY):
+        self.stopwords = frozenset(stopwords)
+        self.max_vocabulary = max_vocabulary
+        self._vocabulary = _Vocabulary()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._vocabulary.ids)
+
+    def _current_vocabulary(self) -> _Vocabulary:
+        vocabulary = self._vocabulary
+        if len(vocabulary.ids) > self.max_vocabulary:
+            with self._lock:
+                if self._vocabulary is vocabulary:
+                    self._vocabulary = _Vocabulary()
+                vocabulary = self._vocabulary
+        return vocabulary
+
+    def _append(self, vocabulary: _Vocabulary, token: str, lower_id: int = None) -> int:
+        import numpy as np
+
+        token_id = len(vocabulary.ids)
+        if token_id == len(vocabulary.lower_ids):
+            vocabulary.lower_ids = np.resize(vocabulary.lower_ids, 2 * token_id)
+            vocabulary.is_stopword = np.resize(vocabulary.is_stopword, 2 * token_id)
+        vocabulary.lower_ids[token_id] = token_id if lower_id is None else lower_id
+        vocabulary.is_stopword[token_id] = token in self.stopwords
+        vocabulary.ids[token] = token_id
+        return token_id
+
+    def _add(self, vocabulary: _Vocabulary, token: str) -> int:
+        with self._lock:
+            token_id = vocabulary.ids.get(token)
+            if token_id is not None:
+                return token_id
+            lower = token.lower()
+            lower_id = vocabulary.ids.get(lower)
+            if lower_id is None:
+                lower_id = self._append(vocabulary, lower)
+            if lower == token:
+                return lower_id
+            return self._append(vocabulary, token, lower_id)
+
+    def _token_ids(self, vocabulary: _Vocabulary, tokens: list[str]) -> "np.ndarray":
+        import numpy as np
+
+        ids = vocabulary.ids
+        return np.fromiter(
+            (
+                ids[token] if token in ids else self._add(vocabulary, token)
+                for token in tokens
+            ),
+            dtype=np.int64,
+            count=len(tokens),
+        )
+
+    def token_ids(self, tokens: list[str]) -> "np.ndarray":
+        """
+        Map tokens to their integer ids, adding any not seen before to the vocabulary
+
+        Args:
+            tokens: the tokens to map
+
+        Returns: Array of token ids, in the same order as the tokens
+        """
+        return self._token_ids(self._current_vocabulary(), tokens)
+
+    def count(self, tokens: list[str], words: Iterable[str]) -> dict[str, int]:
+        """
+        Count how often each of the words occurs, case insensitively, among the tokens
+        that are not stopwords
+
+        Args:
+            tokens: the document's tokens, as produced by the word tokenizer
+            words: words to count
+
+        Returns: Mapping from each lower case word that occurs to its count, in the order the words were given
+        """
+        import numpy as np
+
+        vocabulary = self._current_vocabulary()
+        ids = self._token_ids(vocabulary, tokens)
+        lower_ids = vocabulary.lower_ids[ids[~vocabulary.is_stopword[ids]]]
+        present, counts = np.unique(lower_ids, return_counts=True)
+
+        frequencies = {}
+        for word in words:
+            word = word.lower()
+            word_id = vocabulary.ids.get(word)
+            if word_id is None or word in frequencies:
+                continue
+            lower_id = vocabulary.lower_ids[word_id]
+            index = np.searchsorted(present, lower_id)
+            if index < len(present) and present[index] == lower_id:
+                frequencies[word] = int(counts[index])
+        return frequencies
+
+
+@lru_cache(maxsize=None)
+def token_counter() -> TokenCounter:
+    """The process wide TokenCounter, using the English NLTK stopwords"""
+    return TokenCounter(stopwords())
@@ -0,0 +1,183 @@
+import os
+from fnmatch import fnmatchcase
+from typing import Callable, Iterable, Iterator
+
+from frequent_interesting_words.archives import is_archive, iter_archive_members
+
+SYMLINK_POLICIES = ("skip", "files", "follow")
+
+
+def _matches(name: str, relative_path: str, patterns: Iterable[str]) -> bool:
+    return any(
+        fnmatchcase(name, pattern) or fnmatchcase(relative_path, pattern)
+        for pattern in patterns
+    )
+
+
+def _sorted_entries(path: str) -> list[os.DirEntry]:
+    try:
+        with os.scandir(path) as entries:
+            return sorted(entries, key=lambda entry: entry.name)
+    except OSError:
+        # unreadable directories are skipped, as os.walk does
+        return []
+
+
+def _iter_members(
+    archive: str,
+    prefix: str,
+    include: list[str],
+    exclude: list[str],
+    min_size: int,
+    max_size: int,
+    recursive: bool,
+) -> Iterator[str]:
+    def wanted(name: str, size: int) -> bool:
+        # members are filtered like files below a directory, the archive standing for it
+        parts = name.split("/")
+        if not recursive and len(parts) > 1:
+            return False
+        if exclude and any(
+            _matches(part, prefix + "/".join(parts[: i + 1]), exclude)
+            for i, part in enumerate(parts)
+        ):
+            return False
+        if include and not _matches(parts[-1], prefix + name, include):
+            return False
+        return (min_size is None or size >= min_size) and (
+            max_size is None or size <= max_size
+        )
+
+    for name, _ in iter_archive_members(archive, wanted):
+        yield f"{archive}/{name}"
+
+
+def iter_filepaths(
+    path: str,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    min_size: int = None,
+    max_size: int = None,
+    symlinks: str = "files",
+    recursive: bool = True,
+) -> Iterator[str]:
+    """
+    Lazily discover the files to process, if path is a file then yield that, if its a
+    directory then walk it and yield the files inside in a stable, sorted order
+
+    Archives, whether path or found in the walk, are treated as directories, their
+    members are yielded in archive order as archive/member, see archives.
+    Directories are read with os.scandir so the file type cached on each DirEntry saves a
+    stat per entry, files are only stat'ed when a size limit needs checking. Files are
+    yielded as soon as they are found, so processing can start before the walk finishes.
+
+    Args:
+        path: filepath, can be a file or directory
+        include: glob patterns, when given only files whose name or relative path matches one are yielded
+        exclude: glob patterns for files and directories to skip, matched against the name or relative path
+        min_size: skip files smaller than this many bytes
+        max_size: skip files larger than this many bytes
+        symlinks: "skip" ignores symlinks, "files" follows symlinks to files only, "follow" follows
+            symlinks to directories too, each directory being visited once
+        recursive: descend into subdirectories
+
+    Returns: Iterator of filepaths
+    """
+    if symlinks not in SYMLINK_POLICIES:
+        raise ValueError("Invalid Parameter")
+    include = list(include)
+    exclude = list(exclude)
+    if not os.path.isdir(path):
+        if is_archive(path):
+            yield from _iter_members(
+                path, "", include, exclude, min_size, max_size, recursive
+            )
+        else:
+            yield path
+        return
+
+    check_size = min_size is not None or max_size is not None
+    if symlinks == "follow":
+        stat = os.stat(path)
+        visited = {(stat.st_dev, stat.st_ino)}
+    else:
+        visited = None
+
+    stack = [("", iter(_sorted_entries(path)))]
+    while stack:
+        prefix, entries = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+
+        relative_path = prefix + entry.name
+        if exclude and _matches(entry.name, relative_path, exclude):
+            continue
+        archive = False
+        try:
+            if symlinks == "skip" and entry.is_symlink():
+                continue
+            if entry.is_dir(follow_symlinks=symlinks == "follow"):
+                if not recursive:
+                    continue
+                if visited is not None:
+                    stat = entry.stat()
+                    if (stat.st_dev, stat.st_ino) in visited:
+                        continue
+                    visited.add((stat.st_dev, stat.st_ino))
+                stack.append((relative_path + "/", iter(_sorted_entries(entry.path))))
+                continue
+            if not entry.is_file():
+                continue
+            if is_archive(entry.name):
+                archive = True
+            elif include and not _matches(entry.name, relative_path, include):
+                continue
+            if archive:
+                if not recursive:
+                    continue
+            elif check_size:
+                size = entry.stat().st_size
+                if (min_size is not None and size < min_size) or (
+                    max_size is not None and size > max_size
+                ):
+                    continue
+        except OSError:
+            # broken symlinks and entries removed mid walk
+            continue
+        if archive:
+            yield from _iter_members(
+                entry.path,
+                relative_path + "/",
+                include,
+                exclude,
+                min_size,
+                max_size,
+                recursive,
+            )
+        else:
+            yield entry.path
+
+
+class Rediscovery:
+    """
+    Filepaths found afresh each time they are iterated, such as by a walk of the corpus per
+    pass over it, so a second pass does not need every filepath held from the first
+
+    Args:
+        discover: called for each iteration, returning the filepaths in the same order every time
+    """
+
+    def __init__(self, discover: Callable[[], Iterable[str]]):
+        self.discover = discover
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.discover())
+
+
+def collect(filepaths: Iterable[str], into: list[str]) -> Iterator[str]:
+    """Pass filepaths through lazily while remembering them in the given list for a later pass"""
+    for filepath in filepaths:
+        into.append(filepath)
+        yield filepath
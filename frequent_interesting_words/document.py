@@ -0,0 +1,97 @@
+from typing import Iterator, Union
+
+from frequent_interesting_words import profiling
+from frequent_interesting_words.tokenizers import DEFAULT_TOKENIZER, get_tokenizer
+
+
+class DocumentAnalysis:
+    """
+    The tokens, lower case tokens and sentence boundaries of a document, built once so
+    that counting words and looking up sample sentences can share them
+
+    With the default nltk tokenizer, tokens are produced exactly as
+    nltk.tokenize.word_tokenize would, that being punkt sentence splitting followed by
+    treebank word tokenization of each sentence.
+
+    Args:
+        text: the text of the document
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+
+    Attributes:
+        text: the original text of the document
+        sentences: the sentences of the document as found by the tokenizer
+        tokens: every token in the document, in order
+        lower_tokens: the lower case form of each token in tokens
+        sentence_bounds: (start, end) slice into tokens for each sentence
+    """
+
+    def __init__(self, text: str, tokenizer: str = DEFAULT_TOKENIZER):
+        self.text = text
+        tokenizer = get_tokenizer(tokenizer)
+        with profiling.stage("tokenize"):
+            self.sentences = tokenizer.sent_tokenize(text) if text else []
+            self.tokens = []
+            self.sentence_bounds = []
+            for sentence in self.sentences:
+                start = len(self.tokens)
+                self.tokens.extend(tokenizer.word_tokenize(sentence))
+                self.sentence_bounds.append((start, len(self.tokens)))
+            self.lower_tokens = [token.lower() for token in self.tokens]
+
+    def sentence_lower_tokens(self, index: int) -> list[str]:
+        """The lower case tokens of the sentence at the given index"""
+        start, end = self.sentence_bounds[index]
+        return self.lower_tokens[start:end]
+
+
+def analyse(
+    text: Union[str, DocumentAnalysis], tokenizer: str = DEFAULT_TOKENIZER
+) -> DocumentAnalysis:
+    """Build a DocumentAnalysis for the text with the named tokenizer, reusing it if it is one already"""
+    if isinstance(text, DocumentAnalysis):
+        return text
+    return DocumentAnalysis(text, tokenizer)
+
+
+def iter_sentences(
+    text: Union[str, DocumentAnalysis], tokenizer: str = DEFAULT_TOKENIZER
+) -> Iterator[tuple[str, list[str]]]:
+    """
+    Yield each sentence of the text along with its lower case tokens
+
+    Raw text is split and tokenized lazily, one sentence at a time, so a caller that
+    stops early never pays for the rest of the document
+
+    Args:
+        text: text, or its DocumentAnalysis, to iterate the sentences of
+        tokenizer: name of the tokenizer to split raw text with, see tokenizers.TOKENIZERS
+
+    Returns: Iterator of (sentence, lower case tokens) pairs
+    """
+    if isinstance(text, DocumentAnalysis):
+        for index, sentence in enumerate(text.sentences):
+            yield sentence, text.sentence_lower_tokens(index)
+        return
+
+    for start, end, lower_tokens in iter_sentence_spans(text, tokenizer):
+        yield text[start:end], lower_tokens
+
+
+def iter_sentence_spans(
+    text: str, tokenizer: str = DEFAULT_TOKENIZER
+) -> Iterator[tuple[int, int, list[str]]]:
+    """
+    Like iter_sentences, yielding the offsets of each sentence within the text rather
+    than the sentence itself
+
+    Args:
+        text: text to iterate the sentences of
+        tokenizer: name of the tokenizer to split the text with, see tokenizers.TOKENIZERS
+
+    Returns: Iterator of (start, end, lower case tokens), text[start:end] being the sentence
+    """
+    tokenizer = get_tokenizer(tokenizer)
+    for start, end in tokenizer.span_tokenize(text):
+        yield start, end, [
+            token.lower() for token in tokenizer.word_tokenize(text[start:end])
+        ]
@@ -0,0 +1,241 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from frequent_interesting_words.counting import token_counter
+from frequent_interesting_words.document import DocumentAnalysis
+from frequent_interesting_words.tokenizers import DEFAULT_TOKENIZER
+
+if TYPE_CHECKING:
+    import yake
+
+KEYWORD_LANGUAGE = "en"
+KEYWORD_DEDUP_LIMIT = 0.9
+DEFAULT_ENGINE = "yake"
+# YAKE treats words shorter than this as stopwords, TF-IDF candidates follow suit
+MIN_KEYWORD_LENGTH = 3
+
+
+class KeywordEngine:
+    """
+    A keyword extraction backend, built once per process by get_engine and reused for
+    every document, so any setup cost is paid once rather than per document
+
+    Subclasses implement extract, and may override extract_many when they can process a
+    batch of texts more efficiently than one at a time.
+
+    Attributes:
+        name: the name the engine is registered under in ENGINES
+        corpus_level: whether a text's scores depend on the other texts it is extracted
+            with, such engines need every document of a run passed to extract_many at once
+    """
+
+    name = None
+    corpus_level = False
+
+    @property
+    def params(self) -> dict:
+        """The settings the engine's results depend on, part of the keyword cache key"""
+        return {}
+
+    def extract(self, text: str, word_limit: int) -> list[tuple[str, float]]:
+        """
+        Score the most important words in a given piece of text
+
+        Args:
+            text: text to extract keywords from
+            word_limit: limits the keywords extracted to the x most important
+
+        Returns: list of (keyword, score) pairs, a lower score being more important
+        """
+        raise NotImplementedError
+
+    def extract_many(
+        self, texts: Iterable[str], word_limit: int
+    ) -> Iterator[list[tuple[str, float]]]:
+        """
+        Score the most important words in each of many texts, see extract
+
+        Args:
+            texts: texts to extract keywords from, consumed lazily
+            word_limit: limits the keywords extracted per text to the x most important
+
+        Returns: Iterator of the (keyword, score) pairs of each text, in the same order
+        """
+        for text in texts:
+            yield self.extract(text, word_limit)
+
+
+class YakeEngine(KeywordEngine):
+    """
+    Extracts single word keywords with YAKE, reusing one yake.KeywordExtractor per word
+    limit instead of reloading its stopword list and configuration for every text
+
+    Args:
+        language: language of the YAKE stopword list
+        dedup_limit: similarity above which YAKE drops a candidate as a duplicate
+    """
+
+    name = "yake"
+
+    def __init__(
+        self, language: str = KEYWORD_LANGUAGE, dedup_limit: float = KEYWORD_DEDUP_LIMIT
+    ):
+        self.language = language
+        self.dedup_limit = dedup_limit
+        self._extractors = {}
+
+    @property
+    def params(self) -> dict:
+        return dict(language=self.language, dedup_limit=self.dedup_limit)
+
+    def _extractor(self, word_limit: int) -> "yake.KeywordExtractor":
+        extractor = self._extractors.get(word_limit)
+        if extractor is None:
+            import yake
+
+            extractor = self._extractors.setdefault(
+                word_limit,
+                yake.KeywordExtractor(
+                    lan=self.language,
+                    n=1,
+                    dedupLim=self.dedup_limit,
+                    top=word_limit,
+                    features=None,
+                ),
+            )
+        return extractor
+
+    def extract(self, text: str, word_limit: int) -> list[tuple[str, float]]:
+        return self._extractor(word_limit).extract_keywords(text)
+
+
+class TfidfEngine(KeywordEngine):
+    """
+    Scores words by TF-IDF, the texts extracted together acting as the reference corpus
+
+    Every text's words are mapped to integer ids, then the document-term counts of the
+    whole batch are built and scored with vectorised NumPy operations rather than per
+    document. Candidates are lower case alphabetic words of at least MIN_KEYWORD_LENGTH
+    characters that are not stopwords, their score is tf * idf with the smoothed
+    idf = ln((1 + documents) / (1 + document frequency)) + 1.
+    """
+
+    name = "tfidf"
+    corpus_level = True
+
+    def __init__(self):
+        self._stopwords = token_counter().stopwords
+
+    def _candidates(self, pieces: Iterable[str], tokenizer: str) -> Iterator[str]:
+        for piece in pieces:
+            for token in DocumentAnalysis(piece, tokenizer).lower_tokens:
+                if (
+                    len(token) >= MIN_KEYWORD_LENGTH
+                    and token.isalpha()
+                    and token not in self._stopwords
+                ):
+                    yield token
+
+    def score_many(
+        self,
+        documents: Iterable[Iterable[str]],
+        word_limit: int,
+        tokenizer: str = DEFAULT_TOKENIZER,
+    ) -> list[list[tuple[str, float, int]]]:
+        """
+        Score the most important words of each document against the others
+
+        Args:
+            documents: each document's text, possibly in consecutive pieces such as the
+                windows of iter_text_windows, every piece is read once
+            word_limit: limits the keywords per document to the x most important, falsy means unlimited
+            tokenizer: name of the tokenizer splitting the documents into words, see tokenizers.TOKENIZERS
+
+        Returns: for each document, (keyword, score, frequency) triples ordered by importance,
+            a lower score being more important
+        """
+        import numpy as np
+
+        vocabulary = {}
+        term_ids = []
+        for pieces in documents:
+            term_ids.append(
+                np.fromiter(
+                    (
+                        vocabulary.setdefault(token, len(vocabulary))
+                        for token in self._candidates(pieces, tokenizer)
+                    ),
+                    dtype=np.int64,
+                )
+            )
+        if not vocabulary:
+            return [[] for _ in term_ids]
+
+        document_count = len(term_ids)
+        vocabulary_size = len(vocabulary)
+        lengths = np.array([len(ids) for ids in term_ids])
+
+        # sparse document-term matrix as (document, term) cells with their counts,
+        # sorted by document then term
+        cells, counts = np.unique(
+            np.repeat(np.arange(document_count), lengths) * vocabulary_size
+            + np.concatenate(term_ids),
+            return_counts=True,
+        )
+        cell_documents, cell_terms = np.divmod(cells, vocabulary_size)
+
+        document_frequency = np.bincount(cell_terms, minlength=vocabulary_size)
+        idf = np.log((1 + document_count) / (1 + document_frequency)) + 1
+        scores = counts / lengths[cell_documents] * idf[cell_terms]
+
+        words = np.array(list(vocabulary))
+        alphabetical_rank = np.empty(vocabulary_size, dtype=np.int64)
+        alphabetical_rank[np.argsort(words)] = np.arange(vocabulary_size)
+        # by document, then highest score, then alphabetical
+        order = np.lexsort((alphabetical_rank[cell_terms], -scores, cell_documents))
+        starts = np.searchsorted(cell_documents, np.arange(document_count + 1))
+
+        results = []
+        for document in range(document_count):
+            end = starts[document + 1]
+            if word_limit:
+                end = min(end, starts[document] + word_limit)
+            picked = order[starts[document] : end]
+            results.append(
+                list(
+                    zip(
+                        words[cell_terms[picked]].tolist(),
+                        (-scores[picked]).tolist(),
+                        counts[picked].tolist(),
+                    )
+                )
+            )
+        return results
+
+    def extract(self, text: str, word_limit: int) -> list[tuple[str, float]]:
+        return next(self.extract_many([text], word_limit))
+
+    def extract_many(
+        self, texts: Iterable[str], word_limit: int
+    ) -> Iterator[list[tuple[str, float]]]:
+        for scored in self.score_many(([text] for text in texts), word_limit):
+            yield [(word, score) for word, score, _ in scored]
+
+
+# Engines selectable by name, add a KeywordEngine subclass here to make it available
+ENGINES = {YakeEngine.name: YakeEngine, TfidfEngine.name: TfidfEngine}
+
+
+@lru_cache(maxsize=None)
+def get_engine(name: str) -> KeywordEngine:
+    """
+    The process wide instance of the named keyword engine, built on first use
+
+    Args:
+        name: name of the engine in ENGINES
+
+    Returns: The KeywordEngine
+    """
+    if name not in ENGINES:
+        raise ValueError("Invalid Parameter")
+    return ENGINES[name]()
@@ -0,0 +1,80 @@
+import re
+from functools import lru_cache
+from typing import Iterable
+
+# What yake's TextHighlighter strips from a token before comparing it with the keywords
+_TOKEN_PUNCTUATION = re.compile(r'[!",:.;?()]$|^[!",:.;?()]|\W["!,:.;?()]')
+POSSESSIVE_SUFFIXES = ("’s", "'s", "`s")
+HIGHLIGHT_MARKUP = "**"
+# Upper bound on the tokens whose outcome is remembered, over every highlighter
+TOKEN_CACHE_SIZE = 2**16
+
+
+class KeywordHighlighter:
+    """
+    Highlights a keyword and its possessive forms within sentences using md bold syntax
+
+    The output is exactly that of yake's TextHighlighter with max_ngram_size=1, which
+    splits the text on spaces and wraps every token matching the keyword once its
+    punctuation is stripped. Stripping only removes non word characters, so a token can
+    only match if it holds the keyword's word characters in order, a single compiled
+    pattern finds those tokens and only they are checked, the outcomes of the most
+    recent being remembered.
+
+    Args:
+        word: the keyword to highlight, matched case insensitively
+    """
+
+    def __init__(self, word: str):
+        self.word = word
+        self._forms = frozenset(
+            form.lower()
+            for form in [word, *(word + suffix for suffix in POSSESSIVE_SUFFIXES)]
+        )
+
+        letters = [re.escape(letter) for letter in re.findall(r"\w", word)]
+        if letters:
+            self._candidates = re.compile(r"[^\w ]*".join(letters), re.IGNORECASE)
+        else:
+            self._candidates = None
+
+    @lru_cache(maxsize=TOKEN_CACHE_SIZE)
+    def _highlight_token(self, token: str) -> str:
+        stripped = _TOKEN_PUNCTUATION.sub("", token)
+        if stripped.lower() in self._forms:
+            return token.replace(
+                stripped, HIGHLIGHT_MARKUP + stripped + HIGHLIGHT_MARKUP
+            )
+        return token
+
+    def highlight(self, sentence: str) -> str:
+        """Highlight the keyword within the sentence"""
+        text = sentence.strip().replace("\n", " ")
+        if self._candidates is None:
+            return " ".join(self._highlight_token(token) for token in text.split(" "))
+
+        pieces = []
+        end = 0
+        for match in self._candidates.finditer(text):
+            start = text.rfind(" ", 0, match.start()) + 1
+            if start < end:
+                # another candidate within the token already handled
+                continue
+            stop = text.find(" ", match.end())
+            if stop == -1:
+                stop = len(text)
+            pieces.append(text[end:start])
+            pieces.append(self._highlight_token(text[start:stop]))
+            end = stop
+        pieces.append(text[end:])
+        return "".join(pieces)
+
+    def highlight_many(self, sentences: Iterable[str]) -> list[str]:
+        """Highlight the keyword within each of the sentences, see highlight"""
+        return [self.highlight(sentence) for sentence in sentences]
+
+
+@lru_cache(maxsize=1024)
+def keyword_highlighter(word: str) -> KeywordHighlighter:
+    """The KeywordHighlighter for a word, built once and reused for every sentence"""
+    return KeywordHighlighter(word)
@@ -0,0 +1,338 @@
+"""
+A SQLite database of the keywords, candidate sample sentences and state of every file of a
+corpus as it was last processed, so a later run only has to process the files that changed
+
+Each file has a row of its own and a row per keyword, and each word's total over the corpus is
+kept up to date as files are recorded and removed. Recording a changed file touches its own rows
+only, and the most frequent words are read from the totals without aggregating the corpus again.
+Like partials, a file's sentences are stored once and its keywords refer to them by position.
+"""
+
+import hashlib
+import json
+import sqlite3
+from collections import defaultdict
+from typing import Iterable, Optional, TypedDict
+
+from frequent_interesting_words.archives import document_stat, open_document_binary
+from frequent_interesting_words.tokenizers import DEFAULT_TOKENIZER
+
+# Bump when the schema or meaning of the manifest changes, older ones are then started afresh
+MANIFEST_VERSION = 3
+_HASH_BLOCK_SIZE = 2**20
+
+_SCHEMA = """
+CREATE TABLE settings (name TEXT PRIMARY KEY, value);
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    -- the candidate sample sentences of the file's keywords, each once, as a JSON list
+    sentences TEXT NOT NULL
+);
+CREATE TABLE postings (
+    word TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    frequency INTEGER NOT NULL,
+    -- positions in the file's sentences of those holding the word, as a JSON list
+    sentence_ids TEXT NOT NULL,
+    PRIMARY KEY (word, file_id)
+) WITHOUT ROWID;
+CREATE INDEX postings_by_file ON postings (file_id, word);
+CREATE TABLE totals (word TEXT PRIMARY KEY, total INTEGER NOT NULL) WITHOUT ROWID;
+CREATE INDEX totals_by_total ON totals (total DESC, word);
+"""
+
+
+class FileState(TypedDict):
+    mtime_ns: int
+    size: int
+    hash: str
+
+
+def hash_file(filepath: str) -> str:
+    """Hash the uncompressed contents of a file or archive member without holding it all in memory"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open_document_binary(filepath) as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CorpusManifest:
+    """
+    The manifest of a corpus, created when missing and emptied when it was built with
+    different settings, use as a context manager so changes are saved and it is closed
+
+    Args:
+        path: filepath of the manifest
+        word_limit: the keywords per document this run uses
+        tokenizer: name of the tokenizer this run uses
+        chunk_size: the window size in bytes this run reads documents in, 0 means never
+        example_limit: the sentences per file and keyword this run keeps, None means unlimited
+    """
+
+    def __init__(
+        self,
+        path: str,
+        word_limit: int,
+        tokenizer: str = DEFAULT_TOKENIZER,
+        chunk_size: int = 0,
+        example_limit: Optional[int] = 1,
+    ):
+        self.path = path
+        self.settings = {
+            "version": MANIFEST_VERSION,
+            "word_limit": word_limit,
+            "tokenizer": tokenizer,
+            "chunk_size": chunk_size,
+            "example_limit": example_limit,
+        }
+        self._connection = sqlite3.connect(path)
+        try:
+            tables = [
+                name
+                for (name,) in self._connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            ]
+            settings = (
+                dict(self._connection.execute("SELECT name, value FROM settings"))
+                if "settings" in tables
+                else None
+            )
+        except sqlite3.DatabaseError:
+            settings = None
+            tables = None
+        # refuse anything else rather than emptying it
+        if tables is None or (tables and settings is None):
+            self.close()
+            raise ValueError(f"{path} is not a corpus manifest")
+        if settings != self.settings:
+            for table in tables:
+                self._connection.execute(f'DROP TABLE "{table}"')
+            self._connection.executescript(_SCHEMA)
+            self._connection.executemany(
+                "INSERT INTO settings VALUES (?, ?)", self.settings.items()
+            )
+            self._connection.commit()
+
+    def save(self):
+        """Commit the files recorded and removed since the manifest was opened or last saved"""
+        self._connection.commit()
+
+    def close(self):
+        """Close the manifest, dropping anything not saved"""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.save()
+        self.close()
+
+    def plan(self, filepaths: Iterable[str]) -> tuple[dict[str, FileState], list[str]]:
+        """
+        Compare the files on disk with the manifest
+
+        Files whose mtime and size are unchanged are trusted without being read, the others
+        are hashed so a touched but otherwise unchanged file is not processed again, only its
+        new mtime recorded. The state of changed files is captured before they are processed,
+        so an edit made while the run is in progress is picked up by the next one.
+
+        Args:
+            filepaths: every file currently in the corpus
+
+        Returns: Tuple of (added or modified filepaths mapped to their state, deleted filepaths)
+        """
+        # filepath -> (id, mtime_ns, size, hash), files left in it once the corpus is
+        # listed were deleted
+        recorded = {
+            path: state
+            for path, *state in self._connection.execute(
+                "SELECT path, id, mtime_ns, size, hash FROM files"
+            )
+        }
+        changed = {}
+        for filepath in filepaths:
+            file_id, mtime_ns, size, file_hash = recorded.pop(filepath, (None,) * 4)
+            stat = document_stat(filepath)
+            if (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            state = FileState(
+                mtime_ns=stat.st_mtime_ns, size=stat.st_size, hash=hash_file(filepath)
+            )
+            if file_hash == state["hash"]:
+                self._connection.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                    (state["mtime_ns"], state["size"], file_id),
+                )
+                continue
+            changed[filepath] = state
+        return changed, list(recorded)
+
+    def files(self) -> dict[str, FileState]:
+        """The state of every file recorded, in the order recorded"""
+        return {
+            path: FileState(mtime_ns=mtime_ns, size=size, hash=file_hash)
+            for path, mtime_ns, size, file_hash in self._connection.execute(
+                "SELECT path, mtime_ns, size, hash FROM files ORDER BY id"
+            )
+        }
+
+    def remove(self, filepath: str):
+        """Drop a file's contributions from the manifest"""
+        row = self._connection.execute(
+            "SELECT id FROM files WHERE path = ?", (filepath,)
+        ).fetchone()
+        if row is None:
+            return
+        (file_id,) = row
+        self._connection.execute(
+            """
+            UPDATE totals SET total = total - (
+                SELECT frequency FROM postings
+                WHERE postings.word = totals.word AND postings.file_id = ?
+            )
+            WHERE word IN (SELECT word FROM postings WHERE file_id = ?)
+            """,
+            (file_id, file_id),
+        )
+        self._connection.execute(
+            """
+            DELETE FROM totals
+            WHERE word IN (SELECT word FROM postings WHERE file_id = ?) AND total <= 0
+            """,
+            (file_id,),
+        )
+        self._connection.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        self._connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def record(
+        self,
+        filepath: str,
+        state: FileState,
+        words_with_frequency: dict[str, dict[str, int]],
+        sentences: dict[str, list[str]],
+    ):
+        """
+        Record a freshly processed file, replacing anything it previously contributed
+
+        Args:
+            filepath: the processed file
+            state: the file's state from plan
+            words_with_frequency: the file's WordsWithFrequencyDict
+            sentences: the sample sentences of the file's keywords, see map_document
+        """
+        self.remove(filepath)
+        sentence_ids = {}
+        for word in words_with_frequency:
+            for sentence in sentences.get(word, ()):
+                sentence_ids.setdefault(sentence, len(sentence_ids))
+        file_id = self._connection.execute(
+            "INSERT INTO files (path, mtime_ns, size, hash, sentences) VALUES (?, ?, ?, ?, ?)",
+            (
+                filepath,
+                state["mtime_ns"],
+                state["size"],
+                state["hash"],
+                json.dumps(list(sentence_ids), ensure_ascii=False),
+            ),
+        ).lastrowid
+        frequencies = [(word, v[filepath]) for word, v in words_with_frequency.items()]
+        self._connection.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?, ?)",
+            (
+                (
+                    word,
+                    file_id,
+                    frequency,
+                    json.dumps([sentence_ids[s] for s in sentences.get(word, ())]),
+                )
+                for word, frequency in frequencies
+            ),
+        )
+        self._connection.executemany(
+            """
+            INSERT INTO totals VALUES (?, ?)
+            ON CONFLICT (word) DO UPDATE SET total = total + excluded.total
+            """,
+            frequencies,
+        )
+
+    def top(self, k: int = None) -> list[tuple[str, int]]:
+        """
+        The most frequent words of the corpus
+
+        Args:
+            k: how many words to return, falsy returns every word
+
+        Returns: list of (word, frequency) ordered by frequency, followed by alphabetical
+        """
+        return self._connection.execute(
+            "SELECT word, total FROM totals ORDER BY total DESC, word LIMIT ?",
+            (k or -1,),
+        ).fetchall()
+
+    def result(self, limit: int = None) -> dict[str, dict[str, int]]:
+        """
+        The aggregated WordsWithFrequencyDict of the corpus
+
+        Args:
+            limit: An upper limit in the total number of words, the most frequent are kept
+
+        Returns: The WordsWithFrequencyDict, words ordered by frequency
+        """
+        return {
+            word: dict(
+                self._connection.execute(
+                    """
+                    SELECT files.path, postings.frequency
+                    FROM postings JOIN files ON files.id = postings.file_id
+                    WHERE postings.word = ?
+                    ORDER BY postings.file_id
+                    """,
+                    (word,),
+                )
+            )
+            for word, _ in self.top(limit)
+        }
+
+    def sample_sentences(
+        self, result: dict[str, dict[str, int]], filepaths: Iterable[str]
+    ) -> dict[str, list[str]]:
+        """
+        The sample sentences recorded for the words of a WordsWithFrequencyDict, without
+        reading any file
+
+        Args:
+            result: the WordsWithFrequencyDict to find sentences for, see result
+            filepaths: every file of the corpus, sentences are gathered in this order
+
+        Returns: Mapping from each word to its sample sentences
+        """
+        paths_to_word_map = defaultdict(list)
+        for word, v in result.items():
+            for path in v:
+                paths_to_word_map[path].append(word)
+
+        sentences = defaultdict(list)
+        for filepath in filepaths:
+            words = paths_to_word_map.get(filepath)
+            if not words:
+                continue
+            file_id, file_sentences = self._connection.execute(
+                "SELECT id, sentences FROM files WHERE path = ?", (filepath,)
+            ).fetchone()
+            file_sentences = json.loads(file_sentences)
+            for word in words:
+                (sentence_ids,) = self._connection.execute(
+                    "SELECT sentence_ids FROM postings WHERE word = ? AND file_id = ?",
+                    (word, file_id),
+                ).fetchone()
+                sentences[word] += [file_sentences[i] for i in json.loads(sentence_ids)]
+        return sentences
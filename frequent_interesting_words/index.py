@@ -0,0 +1,356 @@
+"""
+A SQLite database of a processed corpus, the keyword frequencies of every document and the
+offsets of the sentences holding each keyword, so follow up questions such as more words,
+another word's sentences or one document's keywords are answered without processing the
+corpus again
+
+Sentences are not copied into the database, they are read back from the documents by
+offset, so a document that changed since it was indexed is refused rather than misquoted.
+"""
+
+import os
+import sqlite3
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TypedDict
+
+from frequent_interesting_words.archives import document_stat, open_document
+from frequent_interesting_words.atomic import move_into_place
+
+# Bump when the schema or meaning of the database changes, older ones are then refused
+INDEX_VERSION = 1
+DEFAULT_INDEX = "corpus_index.db"
+# Documents whose rows are inserted together, in one transaction
+INSERT_BATCH_SIZE = 1000
+_TEMP_PREFIX = ".index-"
+_READ_BLOCK_SIZE = 2**20
+
+_SCHEMA = """
+CREATE TABLE settings (name TEXT PRIMARY KEY, value);
+-- the id of a document is its position in the corpus
+CREATE TABLE documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE words (id INTEGER PRIMARY KEY, word TEXT NOT NULL UNIQUE, total INTEGER NOT NULL);
+CREATE TABLE postings (
+    word_id INTEGER NOT NULL,
+    document_id INTEGER NOT NULL,
+    frequency INTEGER NOT NULL,
+    PRIMARY KEY (word_id, document_id)
+) WITHOUT ROWID;
+-- character offsets of each sentence holding the word, in the text as read by open_document()
+CREATE TABLE sentences (
+    word_id INTEGER NOT NULL,
+    document_id INTEGER NOT NULL,
+    start_offset INTEGER NOT NULL,
+    end_offset INTEGER NOT NULL,
+    PRIMARY KEY (word_id, document_id, start_offset)
+) WITHOUT ROWID;
+"""
+# Built once every row is in, cheaper than keeping them up to date row by row
+_INDEXES = """
+CREATE INDEX postings_by_document ON postings (document_id, word_id);
+CREATE INDEX words_by_total ON words (total DESC, word);
+"""
+
+
+class IndexedDocument(TypedDict):
+    path: str
+    mtime_ns: int
+    size: int
+    words: dict[str, int]
+    spans: dict[str, list[tuple[int, int]]]
+
+
+class IndexWriter:
+    """
+    Builds a corpus index a document at a time, inserting the rows of INSERT_BATCH_SIZE
+    documents per transaction, use as a context manager
+
+    The database is built next to the target under a temporary name and only replaces
+    it once complete, so an interrupted build leaves any previous index in place.
+
+    Args:
+        path: filepath of the database
+        settings: the settings the documents were processed with
+    """
+
+    def __init__(self, path: str, settings: dict):
+        self.path = path
+        fd, self._temp_path = tempfile.mkstemp(
+            prefix=_TEMP_PREFIX,
+            suffix=".db",
+            dir=os.path.dirname(os.path.abspath(path)),
+        )
+        os.close(fd)
+        self._connection = sqlite3.connect(self._temp_path)
+        # the file is thrown away rather than recovered should the build fail
+        self._connection.execute("PRAGMA journal_mode = OFF")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._connection.executescript(_SCHEMA)
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO settings VALUES (?, ?)",
+                [("version", INDEX_VERSION), *settings.items()],
+            )
+        # word -> [id, total], the words table is written last, totals and all
+        self._words = {}
+        self._documents = 0
+        self._rows = defaultdict(list)
+
+    def write(self, document: IndexedDocument):
+        """Add a document's keyword frequencies and sentence offsets, documents are numbered in the order written"""
+        document_id = self._documents
+        self._documents += 1
+        self._rows["documents"].append(
+            (document_id, document["path"], document["mtime_ns"], document["size"])
+        )
+        for word, frequency in document["words"].items():
+            entry = self._words.get(word)
+            if entry is None:
+                entry = self._words[word] = [len(self._words), 0]
+            entry[1] += frequency
+            self._rows["postings"].append((entry[0], document_id, frequency))
+            self._rows["sentences"].extend(
+                (entry[0], document_id, start, end)
+                for start, end in document["spans"].get(word, ())
+            )
+        if self._documents % INSERT_BATCH_SIZE == 0:
+            self._flush()
+
+    def _flush(self):
+        with self._connection:
+            for table, rows in self._rows.items():
+                if not rows:
+                    continue
+                placeholders = ", ".join("?" * len(rows[0]))
+                self._connection.executemany(
+                    f"INSERT INTO {table} VALUES ({placeholders})", rows
+                )
+        self._rows.clear()
+
+    def close(self):
+        """Finish the index and move it into place"""
+        self._rows["words"] = [
+            (word_id, word, total) for word, (word_id, total) in self._words.items()
+        ]
+        self._flush()
+        self._connection.executescript(_INDEXES)
+        self._connection.close()
+        move_into_place(self._temp_path, self.path)
+
+    def abort(self):
+        """Throw the partly built index away, leaving any previous one in place"""
+        self._connection.close()
+        os.unlink(self._temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def read_spans(path: str, spans: Iterable[tuple[int, int]]) -> Iterator[str]:
+    """
+    Read slices of a text file in a single forward pass, without holding the whole text
+
+    Args:
+        path: filepath of the text
+        spans: (start, end) character offsets in ascending order, not overlapping
+
+    Returns: Iterator of the text of each span
+    """
+    with open_document(path) as f:
+        position = 0
+        for start, end in spans:
+            while position < start:
+                skipped = len(f.read(min(_READ_BLOCK_SIZE, start - position)))
+                if not skipped:
+                    break
+                position += skipped
+            text = f.read(end - start)
+            position += len(text)
+            yield text
+
+
+class CorpusIndex:
+    """
+    Answers queries from a corpus index built by IndexWriter
+
+    Args:
+        path: filepath of the database
+
+    Attributes:
+        settings: mapping of setting name to the value the corpus was indexed with
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if not os.path.isfile(path):
+            raise ValueError(f"No corpus index at {path}, build one with index")
+        self._connection = sqlite3.connect(
+            f"{Path(path).absolute().as_uri()}?mode=ro", uri=True
+        )
+        try:
+            self.settings = dict(
+                self._connection.execute("SELECT name, value FROM settings")
+            )
+        except sqlite3.DatabaseError:
+            self.settings = {}
+        if self.settings.get("version") != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {INDEX_VERSION} corpus index")
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def top(self, k: int = None) -> list[tuple[str, int]]:
+        """
+        The most frequent words of the corpus
+
+        Args:
+            k: how many words to return, falsy returns every word
+
+        Returns: list of (word, frequency) ordered by frequency, followed by alphabetical
+        """
+        return self._connection.execute(
+            "SELECT word, total FROM words ORDER BY total DESC, word LIMIT ?",
+            (k or -1,),
+        ).fetchall()
+
+    def word_documents(self, word: str) -> list[tuple[str, int]]:
+        """
+        The documents a word was found in
+
+        Args:
+            word: the lower case word
+
+        Returns: list of (document path, frequency) ordered by frequency, followed by corpus order
+        """
+        return self._connection.execute(
+            """
+            SELECT documents.path, postings.frequency
+            FROM words
+            JOIN postings ON postings.word_id = words.id
+            JOIN documents ON documents.id = postings.document_id
+            WHERE words.word = ?
+            ORDER BY postings.frequency DESC, postings.document_id
+            """,
+            (word,),
+        ).fetchall()
+
+    def document_words(self, path: str) -> Optional[list[tuple[str, int]]]:
+        """
+        The keywords of a document
+
+        Args:
+            path: the document's path as it was indexed
+
+        Returns: list of (word, frequency) ordered by frequency, followed by alphabetical, None when the document was not indexed
+        """
+        row = self._connection.execute(
+            "SELECT id FROM documents WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return None
+        return self._connection.execute(
+            """
+            SELECT words.word, postings.frequency
+            FROM postings
+            JOIN words ON words.id = postings.word_id
+            WHERE postings.document_id = ?
+            ORDER BY postings.frequency DESC, words.word
+            """,
+            row,
+        ).fetchall()
+
+    def result(self, limit: int = None) -> dict[str, dict[str, int]]:
+        """
+        The WordsWithFrequencyDict of the most frequent words, as aggregated by a run
+
+        Args:
+            limit: An upper limit in the total number of words, falsy means every word
+
+        Returns: The WordsWithFrequencyDict, documents in corpus order
+        """
+        result = {word: {} for word, _ in self.top(limit)}
+        rows = self._connection.execute(
+            """
+            SELECT words.word, documents.path, postings.frequency
+            FROM (SELECT id, word FROM words ORDER BY total DESC, word LIMIT ?) AS words
+            JOIN postings ON postings.word_id = words.id
+            JOIN documents ON documents.id = postings.document_id
+            ORDER BY postings.document_id
+            """,
+            (limit or -1,),
+        )
+        for word, path, frequency in rows:
+            result[word][path] = frequency
+        return result
+
+    def sample_sentences(
+        self, words: Iterable[str], limit: int = 1
+    ) -> dict[str, list[str]]:
+        """
+        Sample sentences for words, read from the documents they were found in
+
+        Args:
+            words: the lower case words to find sentences for
+            limit: upper bound on the number of sentences per document and word, falsy means unlimited
+
+        Returns: Mapping from each word to its sentences in corpus order, then text order
+        """
+        sentences = {word: [] for word in words}
+        # document id -> (path, mtime_ns, size, {span: words whose sentence it is})
+        documents = {}
+        for word in sentences:
+            taken = defaultdict(int)
+            rows = self._connection.execute(
+                """
+                SELECT documents.id, documents.path, documents.mtime_ns, documents.size,
+                    sentences.start_offset, sentences.end_offset
+                FROM words
+                JOIN sentences ON sentences.word_id = words.id
+                JOIN documents ON documents.id = sentences.document_id
+                WHERE words.word = ?
+                ORDER BY sentences.document_id, sentences.start_offset
+                """,
+                (word,),
+            )
+            for document_id, path, mtime_ns, size, start, end in rows:
+                if limit and taken[document_id] >= limit:
+                    continue
+                taken[document_id] += 1
+                if document_id not in documents:
+                    documents[document_id] = (path, mtime_ns, size, defaultdict(list))
+                documents[document_id][3][(start, end)].append(word)
+
+        for document_id in sorted(documents):
+            path, mtime_ns, size, spans = documents[document_id]
+            try:
+                stat = document_stat(path)
+            except FileNotFoundError:
+                stat = None
+            if stat is None or (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+                raise ValueError(
+                    f"{path} changed since it was indexed, index the corpus again"
+                )
+            ordered = sorted(spans)
+            for span, text in zip(ordered, read_spans(path, ordered)):
+                for word in spans[span]:
+                    sentences[word].append(text)
+        return sentences
@@ -0,0 +1,227 @@
+import csv
+import json
+import os
+from importlib.util import find_spec
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Type, TypedDict
+
+from frequent_interesting_words.archives import strip_compression
+from frequent_interesting_words.highlight import keyword_highlighter
+
+if TYPE_CHECKING:
+    from pytablewriter import MarkdownTableWriter
+
+# Output format -> file extension, the format of a target is inferred from its extension
+OUTPUT_FORMATS = {
+    "markdown": ".md",
+    "jsonl": ".jsonl",
+    "csv": ".csv",
+    "parquet": ".parquet",
+}
+DEFAULT_OUTPUT_FORMAT = "markdown"
+# Rows per parquet row group, the most rows the parquet writer holds at once
+PARQUET_BATCH_SIZE = 1024
+
+
+class SummaryRow(TypedDict):
+    word: str
+    frequency: int
+    documents: list[str]
+    sentences: list[str]
+
+
+def parquet_available() -> bool:
+    """Whether pyarrow, which Parquet output needs, is installed, without importing it"""
+    return find_spec("pyarrow") is not None
+
+
+def markdown_table(rows: Iterable[SummaryRow]) -> Type["MarkdownTableWriter"]:
+    """
+    Build the Markdown summary table from its rows, 3 columns of word, documents
+    containing the word and sample sentences highlighting the word
+
+    Args:
+        rows: the SummaryRows in table order
+
+    Returns: MarkdownTableWriter populated with the rows
+    """
+    from pytablewriter import MarkdownTableWriter
+
+    return MarkdownTableWriter(
+        table_name="Interesting Words Summary",
+        headers=[
+            "Word (Total Occurances)",
+            "Documents",
+            "Sentences Containing The Word",
+        ],
+        value_matrix=[
+            [
+                f"{row['word']} ({row['frequency']})",
+                ", ".join(
+                    sorted(
+                        Path(strip_compression(path)).stem for path in row["documents"]
+                    )
+                ),
+                "<br/><br/>".join(
+                    keyword_highlighter(row["word"]).highlight_many(row["sentences"])
+                ),
+            ]
+            for row in rows
+        ],
+    )
+
+
+class SummaryWriter:
+    """
+    Writes the rows of the summary table to a target file as they are produced, use as
+    a context manager so the file is completed and closed
+
+    Args:
+        target: filepath to write to
+    """
+
+    def __init__(self, target: str):
+        self.target = target
+
+    def write(self, row: SummaryRow):
+        """Write a row of the summary"""
+        raise NotImplementedError
+
+    def close(self):
+        """Finish writing the target"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MarkdownSummaryWriter(SummaryWriter):
+    """
+    Writes the summary as a Markdown table
+
+    Every column is padded to its widest cell, which is only known once every row has
+    been seen, so unlike the other formats the rows are held until close.
+    """
+
+    def __init__(self, target: str):
+        super().__init__(target)
+        self._rows = []
+
+    def write(self, row: SummaryRow):
+        self._rows.append(row)
+
+    def close(self):
+        markdown_table(self._rows).dump(self.target)
+        self._rows = []
+
+
+class JsonLinesSummaryWriter(SummaryWriter):
+    """Writes the summary as JSON Lines, one object per word"""
+
+    def __init__(self, target: str):
+        super().__init__(target)
+        self._file = open(target, "w", encoding="utf-8")
+
+    def write(self, row: SummaryRow):
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class CsvSummaryWriter(SummaryWriter):
+    """Writes the summary as CSV with a header row, documents and sentences are newline separated"""
+
+    def __init__(self, target: str):
+        super().__init__(target)
+        self._file = open(target, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(SummaryRow.__annotations__)
+
+    def write(self, row: SummaryRow):
+        self._writer.writerow(
+            [
+                row["word"],
+                row["frequency"],
+                "\n".join(row["documents"]),
+                "\n".join(row["sentences"]),
+            ]
+        )
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSummaryWriter(SummaryWriter):
+    """Writes the summary as Parquet, a row group per PARQUET_BATCH_SIZE rows, needs pyarrow"""
+
+    def __init__(self, target: str):
+        if not parquet_available():
+            raise RuntimeError("Parquet output needs pyarrow, pip install pyarrow")
+        import pyarrow
+        import pyarrow.parquet
+
+        super().__init__(target)
+        self._schema = pyarrow.schema(
+            [
+                ("word", pyarrow.string()),
+                ("frequency", pyarrow.int64()),
+                ("documents", pyarrow.list_(pyarrow.string())),
+                ("sentences", pyarrow.list_(pyarrow.string())),
+            ]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(target, self._schema)
+        self._rows = []
+
+    def _flush(self):
+        import pyarrow
+
+        if self._rows:
+            self._writer.write_table(
+                pyarrow.Table.from_pylist(self._rows, schema=self._schema)
+            )
+            self._rows = []
+
+    def write(self, row: SummaryRow):
+        self._rows.append(row)
+        if len(self._rows) >= PARQUET_BATCH_SIZE:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+SUMMARY_WRITERS = {
+    "markdown": MarkdownSummaryWriter,
+    "jsonl": JsonLinesSummaryWriter,
+    "csv": CsvSummaryWriter,
+    "parquet": ParquetSummaryWriter,
+}
+
+
+def output_format_for(target: str) -> str:
+    """The output format matching the target's extension, Markdown when there is no match"""
+    extension = os.path.splitext(target)[1].lower()
+    for output_format, format_extension in OUTPUT_FORMATS.items():
+        if extension == format_extension:
+            return output_format
+    return DEFAULT_OUTPUT_FORMAT
+
+
+def summary_writer(target: str, output_format: str = None) -> SummaryWriter:
+    """
+    Open the SummaryWriter for a target
+
+    Args:
+        target: filepath to write to
+        output_format: one of OUTPUT_FORMATS, None infers it from the target's extension
+
+    Returns: The SummaryWriter
+    """
+    output_format = output_format or output_format_for(target)
+    if output_format not in SUMMARY_WRITERS:
+        raise ValueError("Invalid Parameter")
+    return SUMMARY_WRITERS[output_format](target)
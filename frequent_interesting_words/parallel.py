@@ -0,0 +1,124 @@
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Iterator
+
+from frequent_interesting_words import resources
+from frequent_interesting_words.counting import token_counter
+from frequent_interesting_words.engines import DEFAULT_ENGINE, get_engine
+from frequent_interesting_words.profiling import profiled_map
+
+# Each worker gets roughly this many chunks of work, small enough to balance uneven
+# document sizes while keeping the per-task IPC overhead low
+CHUNKS_PER_WORKER = 4
+# Results are held a chunk at a time, capping the chunk size keeps that memory bounded on huge corpora
+MAX_CHUNKSIZE = 64
+# Chunks submitted to the pool ahead of the one being consumed, per worker
+PENDING_CHUNKS_PER_WORKER = 2
+# When the number of documents is not known up front chunks start at one document and
+# double as each completes, up to this size, so a small corpus still spreads over the pool
+MAX_GROWING_CHUNKSIZE = 16
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Turn the --jobs option into a worker count, 0 or less means one per CPU core"""
+    if jobs and jobs > 0:
+        return jobs
+    return os.cpu_count() or 1
+
+
+def load_worker_resources():
+    """
+    Load the NLTK models and corpora and build the keyword engine up front so each
+    worker pays for them once, rather than on the first document it is handed
+    """
+    resources.preload()
+    token_counter()
+    get_engine(DEFAULT_ENGINE)
+
+
+def _call_chunk(fn: Callable, chunk: list[tuple]) -> list:
+    return [fn(*args) for args in chunk]
+
+
+def bounded_map(
+    executor: Executor, chunksize: int, max_pending: int, grow: bool = False
+) -> Callable:
+    """
+    A map function over an executor that reads its inputs lazily
+
+    Executor.map submits every input up front, so a generator feeding it, such as
+    prefetched document texts, would be drained into memory at once. Here inputs are
+    submitted a chunk at a time, with at most max_pending chunks outstanding, and results
+    are yielded in input order.
+
+    Args:
+        executor: executor to submit the chunks to
+        chunksize: inputs per task sent to a worker
+        max_pending: chunks submitted ahead of the one being consumed
+        grow: start with chunks of a single input and double their size each time a
+            chunk completes, up to chunksize
+
+    Returns: A map compatible callable
+    """
+
+    def mapper(fn, *iterables):
+        arguments = zip(*iterables)
+        pending = deque()
+        size = 1 if grow else chunksize
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(islice(arguments, size))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_call_chunk, fn, chunk))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+            size = min(chunksize, size * 2)
+
+    return mapper
+
+
+@contextmanager
+def document_executor(jobs: int, document_count: int = None) -> Iterator[Callable]:
+    """
+    Provide a map function that spreads per document work across a process pool
+
+    Results are yielded in the same order as the inputs, so the output is identical to
+    a serial run. When only one worker would be used the builtin map is provided
+    instead, avoiding the cost of starting a pool.
+
+    Args:
+        jobs: number of worker processes, 0 means one per CPU core
+        document_count: number of documents to be processed, used to size the pool and
+            chunks, None when they are still being discovered
+
+    Returns: A map compatible callable
+    """
+    workers = resolve_jobs(jobs)
+    if document_count is not None:
+        workers = min(workers, document_count)
+    if workers <= 1:
+        yield map
+        return
+
+    if document_count is None:
+        chunksize = MAX_GROWING_CHUNKSIZE
+    else:
+        chunksize = min(
+            MAX_CHUNKSIZE, max(1, document_count // (workers * CHUNKS_PER_WORKER))
+        )
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=load_worker_resources
+    ) as executor:
+        yield profiled_map(
+            bounded_map(
+                executor,
+                chunksize,
+                workers * PENDING_CHUNKS_PER_WORKER,
+                grow=document_count is None,
+            )
+        )
@@ -0,0 +1,180 @@
+"""
+Partial results of the map command, the keyword frequencies and candidate sample sentences
+of one shard of a corpus, for the merge command to combine into the summary table
+
+A partial is a gzip compressed stream of JSON lines, a header followed by a line per
+document, so shards of any size are written and read a document at a time. Each document
+lists its sentences once and its words refer to them by index, as one sentence often holds
+several of a document's keywords.
+"""
+
+import gzip
+import hashlib
+import json
+from typing import Iterator, Optional, TypedDict
+
+PARTIAL_FORMAT = "frequent-interesting-words-partial"
+# Bump when the layout or meaning of partials changes, older ones are then refused
+PARTIAL_VERSION = 1
+PARTIAL_EXTENSION = ".fiwp"
+_COMPRESS_LEVEL = 6
+
+
+class PartialSettings(TypedDict):
+    word_limit: int
+    example_limit: Optional[int]
+    engine: str
+    tokenizer: str
+
+
+class PartialDocument(TypedDict):
+    position: int
+    path: str
+    words: dict[str, int]
+    sentences: dict[str, list[str]]
+
+
+def shard_of(relative_path: str, shards: int) -> int:
+    """
+    The shard a document belongs to when a corpus is hash partitioned, stable across
+    machines and Python processes, unlike hash()
+
+    Args:
+        relative_path: path of the document relative to the root of the corpus
+        shards: the number of shards
+
+    Returns: The shard index, from 0 to shards - 1
+    """
+    digest = hashlib.blake2b(
+        relative_path.encode("utf-8", "surrogateescape"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+class PartialWriter:
+    """
+    Writes a partial result a document at a time, use as a context manager so the file is
+    completed and closed
+
+    Args:
+        path: filepath to write to
+        settings: the settings the documents were processed with, merged partials must agree
+        shard: (index, count) when the documents are a hash partition of a corpus, their
+            positions are then positions in the whole corpus
+    """
+
+    def __init__(
+        self, path: str, settings: PartialSettings, shard: tuple[int, int] = None
+    ):
+        self.path = path
+        self._file = gzip.open(
+            path, "wt", encoding="utf-8", compresslevel=_COMPRESS_LEVEL
+        )
+        self._write_line(
+            {
+                "format": PARTIAL_FORMAT,
+                "version": PARTIAL_VERSION,
+                "settings": settings,
+                "shard": list(shard) if shard else None,
+            }
+        )
+
+    def _write_line(self, value):
+        self._file.write(
+            json.dumps(value, ensure_ascii=False, separators=(",", ":")) + "\n"
+        )
+
+    def write(
+        self,
+        position: int,
+        path: str,
+        words: dict[str, int],
+        sentences: dict[str, list[str]],
+    ):
+        """
+        Write a document's results
+
+        Args:
+            position: the document's position in the corpus, the order its sentences are merged in
+            path: filepath of the document
+            words: mapping of keyword to its frequency in the document
+            sentences: mapping of keyword to the candidate sample sentences from the document
+        """
+        sentence_ids = {}
+        for word in words:
+            for sentence in sentences.get(word, ()):
+                sentence_ids.setdefault(sentence, len(sentence_ids))
+        self._write_line(
+            [
+                position,
+                path,
+                [
+                    [
+                        word,
+                        frequency,
+                        [
+                            sentence_ids[sentence]
+                            for sentence in sentences.get(word, ())
+                        ],
+                    ]
+                    for word, frequency in words.items()
+                ],
+                list(sentence_ids),
+            ]
+        )
+
+    def close(self):
+        """Finish writing the partial"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PartialReader:
+    """
+    Reads a partial result written by PartialWriter, iterate over it for its documents
+
+    Args:
+        path: filepath of the partial
+
+    Attributes:
+        settings: the PartialSettings its documents were processed with
+        shard: (index, count) of the hash partition it holds, None when it is not one
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+        except (OSError, EOFError, UnicodeDecodeError, ValueError):
+            header = None
+        if (
+            not isinstance(header, dict)
+            or header.get("format") != PARTIAL_FORMAT
+            or header.get("version") != PARTIAL_VERSION
+        ):
+            raise ValueError(
+                f"{path} is not a version {PARTIAL_VERSION} partial result"
+            )
+        self.settings = PartialSettings(**header["settings"])
+        self.shard = tuple(header["shard"]) if header["shard"] else None
+
+    def __iter__(self) -> Iterator[PartialDocument]:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            next(f)
+            for line in f:
+                position, path, words, sentences = json.loads(line)
+                yield PartialDocument(
+                    position=position,
+                    path=path,
+                    words={word: frequency for word, frequency, _ in words},
+                    sentences={
+                        word: [sentences[i] for i in sentence_ids]
+                        for word, _, sentence_ids in words
+                    },
+                )
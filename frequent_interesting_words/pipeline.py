@@ -0,0 +1,1169 @@
+"""
+The document processing pipeline behind the command line and the Analyzer, reading
+documents, extracting their keywords, aggregating word frequencies and gathering sample
+sentences, independent of how it is invoked
+"""
+
+import os
+from collections import Counter, defaultdict
+from functools import partial
+from itertools import repeat
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Type,
+    TypedDict,
+    Union,
+)
+
+from frequent_interesting_words import profiling
+from frequent_interesting_words.aggregation import (
+    SpaceSavingSketch,
+    WordFrequencyAggregator,
+    frequency_order,
+)
+from frequent_interesting_words.archives import (
+    document_size,
+    document_stat,
+    is_tar_member,
+    open_document,
+    read_text,
+)
+from frequent_interesting_words.cache import KeywordCache
+from frequent_interesting_words.chunking import (
+    iter_text_windows,
+    iter_window_sentence_spans,
+    iter_window_sentences,
+    merge_keyword_scores,
+)
+from frequent_interesting_words.counting import token_counter
+from frequent_interesting_words.discovery import collect, iter_filepaths
+from frequent_interesting_words.document import (
+    DocumentAnalysis,
+    analyse,
+    iter_sentence_spans,
+    iter_sentences,
+)
+from frequent_interesting_words.engines import DEFAULT_ENGINE, get_engine
+from frequent_interesting_words.highlight import keyword_highlighter
+from frequent_interesting_words.index import IndexedDocument
+from frequent_interesting_words.output import (
+    SummaryRow,
+    markdown_table,
+    summary_writer,
+)
+from frequent_interesting_words.partials import PartialReader, shard_of
+from frequent_interesting_words.prefetch import Prefetcher
+from frequent_interesting_words.tokenizers import DEFAULT_TOKENIZER
+
+if TYPE_CHECKING:
+    from pytablewriter import MarkdownTableWriter
+
+
+class WordsWithFrequencyDict(TypedDict):
+    word: str
+    doc_path_to_frequency_map: dict[str, int]
+
+
+class ApproximationReport(TypedDict):
+    occurrences: int
+    counters: int
+    error_bound: int
+    candidates: int
+    exact: bool
+
+
+def extract_keyword_scores(
+    text: str, word_limit: int, engine: str = DEFAULT_ENGINE
+) -> list[tuple[str, float]]:
+    """
+    Score the most important words in a given piece of text
+
+    Args:
+        text: text to extract keywords from
+        word_limit: limits the keywords extracted to the x most important
+        engine: name of the keyword engine to use, see engines.ENGINES
+
+    Returns: list of (keyword, score) pairs, a lower score being more important
+    """
+    with profiling.stage("extract_keywords"):
+        return get_engine(engine).extract(text, word_limit)
+
+
+def extract_keywords(
+    text: str, word_limit: int, engine: str = DEFAULT_ENGINE
+) -> list[str]:
+    """
+    Build a list of important words from a given piece of text
+
+    Args:
+        text: text to extract keywords from
+        word_limit: limits the keywords extracted to the x most important
+        engine: name of the keyword engine to use, see engines.ENGINES
+
+    Returns: list of lower case keywords in the text sorted in frequency order
+    """
+    keywords = extract_keyword_scores(text, word_limit, engine)
+
+    return [k[0].lower() for k in sorted(keywords, key=lambda x: x[1])]
+
+
+def build_word_occurance_dict(
+    text: Union[str, DocumentAnalysis],
+    words: Iterable[str],
+    tokenizer: str = DEFAULT_TOKENIZER,
+) -> dict[str, int]:
+    """
+    Build a dictionary of the frequency of words contained within a body of text
+
+    Args:
+        text: text, or its DocumentAnalysis, in which the frequency of words will be checked
+        words: words to check the frequency of
+        tokenizer: name of the tokenizer to split raw text with, see tokenizers.TOKENIZERS
+
+    Returns: Dict mapping words to its frequency in the text
+    """
+    document = analyse(text, tokenizer)
+    with profiling.stage("count"):
+        return token_counter().count(document.tokens, words)
+
+
+def build_interesting_word_frequency_dict(
+    text: Union[str, DocumentAnalysis],
+    path: str,
+    word_limit: int,
+    engine: str = DEFAULT_ENGINE,
+    tokenizer: str = DEFAULT_TOKENIZER,
+) -> WordsWithFrequencyDict:
+    """
+    Build a WordsWithFrequencyDict from a piece of text
+
+    Args:
+        text: the text, or its DocumentAnalysis, to build the WordsWithFrequencyDict from
+        path: the filepath to the doc which contains the text
+        word_limit: the upper limit of keywords to extract from the text
+        engine: name of the keyword engine to use, see engines.ENGINES
+        tokenizer: name of the tokenizer to split raw text with, see tokenizers.TOKENIZERS
+
+    Returns:
+        A WordsWithFrequencyDict
+    """
+    if not path or not text:
+        return {}
+
+    document = analyse(text, tokenizer)
+    if not document.text:
+        return {}
+
+    return {
+        word: {path: frequency}
+        for word, frequency in build_word_occurance_dict(
+            document, extract_keywords(document.text, word_limit, engine)
+        ).items()
+    }
+
+
+def build_chunked_word_frequencies(
+    windows: Callable[[], Iterable[str]],
+    word_limit: int,
+    engine: str = DEFAULT_ENGINE,
+    tokenizer: str = DEFAULT_TOKENIZER,
+) -> dict[str, int]:
+    """
+    Build the frequency of a document's keywords from its text a window at a time, so
+    memory depends on the window size rather than the document size
+
+    Keyword candidates are scored per window then merged, then a second pass over the
+    windows counts the chosen keywords alone, see build_word_occurance_dict
+
+    Args:
+        windows: called once per pass for the document's text in sentence aligned
+            windows, see iter_text_windows
+        word_limit: the upper limit of keywords to extract from the document
+        engine: name of the keyword engine to use, see engines.ENGINES
+        tokenizer: name of the tokenizer to split the windows with, see tokenizers.TOKENIZERS
+
+    Returns: Dict mapping the document's keywords to their frequency
+    """
+    with profiling.stage("extract_keywords"):
+        window_scores = get_engine(engine).extract_many(windows(), word_limit)
+        keywords = merge_keyword_scores(window_scores, word_limit)
+
+    counts = Counter()
+    for window in windows():
+        counts.update(build_word_occurance_dict(window, keywords, tokenizer))
+    return dict(counts)
+
+
+def flatten_and_sort_words_with_frequency(
+    words_with_frequency: WordsWithFrequencyDict,
+) -> list[tuple[str, int]]:
+    """
+    Flattens a WordsWithFrequencyDict into a list of tuples, these being
+    pairs of (word, frequency), also sorts them
+
+    Args:
+        words_with_frequency: WordsWithFrequencyDict to flatten and sort
+
+    Returns:
+        list of tuples of (word, frequency)
+    """
+    flattened_words = [
+        (k, sum(frequency for _, frequency in v.items()))
+        for k, v in words_with_frequency.items()
+    ]
+    # ordered by frequency, followed by alphabetical
+    return sorted(flattened_words, key=frequency_order)
+
+
+def aggregate_words_with_frequency(
+    interesting_word_frequency_collection: Iterable[WordsWithFrequencyDict],
+    limit: int = None,
+) -> WordsWithFrequencyDict:
+    """
+    Do a deep merge on a collecion of WordsWithFrequencyDicts to combine them into a single one
+
+    Args:
+        interesting_word_frequency_collection: Iterable of WordWithFrequencyDicts to merge
+        limit: An upper limit in the total number of words in the final WordsWithFrequencyDict
+
+    Returns: A WordsWithFrequencyDict that is the aggregation of those in the collection
+    """
+    aggregator = WordFrequencyAggregator()
+    for interesting_word_frequency_dict in interesting_word_frequency_collection:
+        with profiling.stage("aggregate"):
+            aggregator.add(interesting_word_frequency_dict)
+
+    with profiling.stage("aggregate"):
+        return aggregator.result(limit)
+
+
+def extract_sample_sentences_from_text(
+    keyword: str,
+    text: Union[str, DocumentAnalysis],
+    limit: int = None,
+    tokenizer: str = DEFAULT_TOKENIZER,
+) -> list[str]:
+    """
+    Pulls a number of sample sentences from the text based on the keyword
+
+    Args:
+        keyword: Sentences are pulled fro the text if they contain this word
+        text: text, or its DocumentAnalysis, to pull sentences from
+        limit: upper bound on the number of sentences to extract, falsy means unlimited
+        tokenizer: name of the tokenizer to split raw text with, see tokenizers.TOKENIZERS
+
+    Returns: List of sentences extracted from the text
+    """
+    if not keyword or not text:
+        return []
+
+    return extract_sample_sentences_for_keywords([keyword], text, limit, tokenizer)[
+        keyword
+    ]
+
+
+def extract_sample_sentences_for_keywords(
+    keywords: Iterable[str],
+    text: Union[str, DocumentAnalysis],
+    limit: int = None,
+    tokenizer: str = DEFAULT_TOKENIZER,
+) -> dict[str, list[str]]:
+    """
+    Pulls sample sentences from the text for many keywords in a single pass, stopping as
+    soon as every keyword has reached the limit
+
+    Args:
+        keywords: Sentences are pulled from the text for each of these words
+        text: text, or its DocumentAnalysis, to pull sentences from
+        limit: upper bound on the number of sentences per keyword, falsy means unlimited
+        tokenizer: name of the tokenizer to split raw text with, see tokenizers.TOKENIZERS
+
+    Returns: Mapping from each keyword to the sentences extracted for it, in text order
+    """
+    if not text:
+        return {keyword: [] for keyword in keywords}
+    return _match_sample_sentences(keywords, iter_sentences(text, tokenizer), limit)
+
+
+def extract_sample_sentences_from_windows(
+    keywords: Iterable[str],
+    windows: Iterable[str],
+    limit: int = None,
+    tokenizer: str = DEFAULT_TOKENIZER,
+) -> dict[str, list[str]]:
+    """
+    Like extract_sample_sentences_for_keywords, for text read a window at a time
+
+    Args:
+        keywords: Sentences are pulled from the text for each of these words
+        windows: the text in sentence aligned windows, see iter_text_windows
+        limit: upper bound on the number of sentences per keyword, falsy means unlimited
+        tokenizer: name of the tokenizer to split the windows with, see tokenizers.TOKENIZERS
+
+    Returns: Mapping from each keyword to the sentences extracted for it, in text order
+    """
+    return _match_sample_sentences(
+        keywords, iter_window_sentences(windows, tokenizer), limit
+    )
+
+
+def _match_sample_sentences(
+    keywords: Iterable[str],
+    sentences: Iterator[tuple[str, list[str]]],
+    limit: int = None,
+) -> dict[str, list[str]]:
+    sample_sentences = {keyword: [] for keyword in keywords}
+
+    # lower case keyword -> keywords still short of the limit
+    remaining = defaultdict(list)
+    for keyword in sample_sentences:
+        if keyword:
+            remaining[keyword.lower()].append(keyword)
+
+    if not remaining:
+        return sample_sentences
+
+    for sentence, lower_tokens in sentences:
+        for lower_keyword in remaining.keys() & set(lower_tokens):
+            matching_keywords = remaining[lower_keyword]
+            for keyword in matching_keywords:
+                sample_sentences[keyword].append(sentence)
+            if limit and len(sample_sentences[matching_keywords[0]]) >= limit:
+                del remaining[lower_keyword]
+        if not remaining:
+            break
+
+    return sample_sentences
+
+
+def highlight_text(text: str, word: str) -> str:
+    """Highlight the given word within the text using md bold syntax"""
+    return keyword_highlighter(word).highlight(text)
+
+
+def iter_summary_rows(
+    words_with_frequency: WordsWithFrequencyDict, word_to_sentences_map: dict[str, str]
+) -> Iterator[SummaryRow]:
+    """
+    Build the rows of the summary table from data in a WordsWithFrequencyDict and a mapping
+    between words and sample sentences, one row per word ordered by frequency
+
+    Args:
+        words_with_frequency: WordsWithFrequencyDict to build the rows from
+        word_to_sentences_map: mapping from words to sample sentences
+
+    Returns: Iterator of SummaryRows, built as they are consumed
+    """
+    if (
+        not words_with_frequency
+        or not all(v for v in words_with_frequency.values())
+        or not word_to_sentences_map
+    ):
+        raise ValueError("Invalid Parameter")
+
+    flattened_words = flatten_and_sort_words_with_frequency(words_with_frequency)
+    return (
+        SummaryRow(
+            word=word,
+            frequency=frequency,
+            documents=sorted(words_with_frequency[word]),
+            sentences=word_to_sentences_map[word],
+        )
+        for word, frequency in flattened_words
+    )
+
+
+def format_output_table(
+    words_with_frequency: WordsWithFrequencyDict, word_to_sentences_map: dict[str, str]
+) -> Type["MarkdownTableWriter"]:
+    """
+    Build a pytablewriter MarkdownTableWriter from data in a WordsWithFrequencyDict and a mapping
+    between words and sample sentences,
+    Format is 3 columns of word, documents containing the word and sample sentences with that word in from those documents
+
+    Args:
+        words_with_frequency: WordsWithFrequencyDict to build the table from
+        word_to_sentences_map: mapping from words to sample sentences to build that c
+
+    Returns: MarkdownTableWriter populated with the parameter data
+    """
+    return markdown_table(
+        iter_summary_rows(words_with_frequency, word_to_sentences_map)
+    )
+
+
+def build_filepaths_to_process(path: str, **discovery) -> list[str]:
+    """
+    If path is a file then return that, if its a directory then add all the files inside
+
+    Args:
+        path: filepath, can be a file or directory
+        discovery: filters passed on to iter_filepaths
+
+    Returns: List of filepaths
+    """
+    return list(iter_filepaths(path, **discovery))
+
+
+def process_document(
+    filepath: str,
+    word_limit: int,
+    cache: KeywordCache = None,
+    chunk_size: int = 0,
+    engine: str = DEFAULT_ENGINE,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    text: str = None,
+) -> WordsWithFrequencyDict:
+    """
+    Read a document and build its WordsWithFrequencyDict, the unit of work handed to each worker
+
+    Args:
+        filepath: path to the document
+        word_limit: the upper limit of keywords to extract from the document
+        cache: KeywordCache to reuse results for unchanged documents from, None disables caching
+        chunk_size: documents larger than this many bytes are read in windows of this
+            many characters, see build_chunked_word_frequencies, 0 means never
+        engine: name of the keyword engine to use, see engines.ENGINES
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        text: the document's text when it has already been read, see prefetch, it is then
+            processed whole rather than in windows
+
+    Returns: A WordsWithFrequencyDict for the document
+    """
+    with profiling.document(filepath):
+        chunked = (
+            text is None and bool(chunk_size) and document_size(filepath) > chunk_size
+        )
+        params = dict(word_limit=word_limit, engine=engine, **get_engine(engine).params)
+        if chunked:
+            params["chunk_size"] = chunk_size
+        # left out by default so entries cached before tokenizers were selectable still match
+        if tokenizer != DEFAULT_TOKENIZER:
+            params["tokenizer"] = tokenizer
+
+        key = None
+        if text is None:
+            with open_document(filepath) as f:
+                if not chunked:
+                    with profiling.stage("read", documents=1) as timer:
+                        text = f.read()
+                        timer.add(nbytes=len(text))
+                elif cache is not None:
+                    with profiling.stage("cache"):
+                        key = cache.key_from_chunks(
+                            iter(lambda: f.read(chunk_size), ""), **params
+                        )
+        if cache is not None and not chunked:
+            with profiling.stage("cache"):
+                key = cache.key_from_chunks([text], **params)
+        with profiling.stage("cache"):
+            frequencies = cache.get(key) if key else None
+
+        if frequencies is None:
+            if chunked:
+                frequencies = build_chunked_word_frequencies(
+                    partial(_read_document, filepath, chunk_size, tokenizer),
+                    word_limit,
+                    engine,
+                    tokenizer,
+                )
+            else:
+                frequencies = {
+                    word: v[filepath]
+                    for word, v in build_interesting_word_frequency_dict(
+                        text,
+                        filepath,
+                        word_limit=word_limit,
+                        engine=engine,
+                        tokenizer=tokenizer,
+                    ).items()
+                }
+            if cache is not None:
+                with profiling.stage("cache"):
+                    cache.put(key, frequencies)
+
+        return {word: {filepath: frequency} for word, frequency in frequencies.items()}
+
+
+def _process_prefetched(process: Callable, document: tuple[str, Optional[str]]):
+    filepath, text = document
+    return process(filepath, text=text)
+
+
+def _map_over_documents(
+    process: Callable,
+    filepaths: Iterable[str],
+    executor_map=map,
+    chunk_size: int = 0,
+    prefetcher: Prefetcher = None,
+    keep: bool = False,
+) -> Iterator:
+    if prefetcher is None:
+        # tar members are read here in archive order, rather than by every worker
+        # decompressing the archive up to its own members
+        return executor_map(
+            partial(_process_prefetched, process),
+            (
+                (filepath, read_text(filepath) if is_tar_member(filepath) else None)
+                for filepath in filepaths
+            ),
+        )
+    return executor_map(
+        partial(_process_prefetched, process),
+        prefetcher.documents(filepaths, chunk_size, keep=keep),
+    )
+
+
+def extract_document_sentences(
+    filepath: str,
+    words: list[str],
+    limit: int = None,
+    chunk_size: int = 0,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    text: str = None,
+) -> dict[str, list[str]]:
+    """
+    Read a document and pull sample sentences from it for each of the given words
+
+    Args:
+        filepath: path to the document
+        words: words to find sample sentences for
+        limit: upper bound on the number of sentences per word, falsy means unlimited
+        chunk_size: documents larger than this many bytes are read in windows of this
+            many characters, 0 means never
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        text: the document's text when it has already been read, see prefetch
+
+    Returns: Mapping from each word to the sentences extracted for it
+    """
+    if not words:
+        return {}
+    if text is not None:
+        with profiling.stage("sample_sentences", documents=1):
+            return extract_sample_sentences_for_keywords(words, text, limit, tokenizer)
+    with open_document(filepath) as f:
+        if chunk_size and document_size(filepath) > chunk_size:
+            with profiling.stage("sample_sentences", documents=1):
+                return extract_sample_sentences_from_windows(
+                    words, iter_text_windows(f, chunk_size, tokenizer), limit, tokenizer
+                )
+        with profiling.stage("read", documents=1) as timer:
+            text = f.read()
+            timer.add(nbytes=len(text))
+    with profiling.stage("sample_sentences", documents=1):
+        return extract_sample_sentences_for_keywords(words, text, limit, tokenizer)
+
+
+def map_document(
+    filepath: str,
+    word_limit: int,
+    example_limit: int = 1,
+    cache: KeywordCache = None,
+    chunk_size: int = 0,
+    engine: str = DEFAULT_ENGINE,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    text: str = None,
+) -> tuple[WordsWithFrequencyDict, dict[str, list[str]]]:
+    """
+    Build a document's WordsWithFrequencyDict along with sample sentences for every one of
+    its keywords, reading the document once, the unit of work of the map command
+
+    Args:
+        filepath: path to the document
+        word_limit: the upper limit of keywords to extract from the document
+        example_limit: upper bound on the sentences per keyword, falsy means unlimited
+        cache: KeywordCache to reuse results for unchanged documents from, None disables caching
+        chunk_size: documents larger than this many bytes are read in windows, 0 means never
+        engine: name of the keyword engine to use, see engines.ENGINES
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        text: the document's text when it has already been read, see prefetch
+
+    Returns: The document's WordsWithFrequencyDict and mapping of keyword to sample sentences
+    """
+    if text is None and not (chunk_size and document_size(filepath) > chunk_size):
+        with open_document(filepath) as f:
+            with profiling.stage("read", documents=1) as timer:
+                text = f.read()
+                timer.add(nbytes=len(text))
+    words_with_frequency = process_document(
+        filepath, word_limit, cache, chunk_size, engine, tokenizer, text
+    )
+    return words_with_frequency, extract_document_sentences(
+        filepath, list(words_with_frequency), example_limit, chunk_size, tokenizer, text
+    )
+
+
+def extract_sentence_spans(
+    words: Iterable[str], sentence_spans: Iterable[tuple[int, int, list[str]]]
+) -> dict[str, list[tuple[int, int]]]:
+    """
+    Find every sentence holding each of the lower case words
+
+    Args:
+        words: the lower case words to find sentences for
+        sentence_spans: (start, end, lower case tokens) of each sentence, see iter_sentence_spans
+
+    Returns: Mapping from each word to the (start, end) offsets of its sentences, in text order
+    """
+    spans = {word: [] for word in words}
+    for start, end, lower_tokens in sentence_spans:
+        for word in spans.keys() & set(lower_tokens):
+            spans[word].append((start, end))
+    return spans
+
+
+def index_document(
+    filepath: str,
+    word_limit: int,
+    cache: KeywordCache = None,
+    chunk_size: int = 0,
+    engine: str = DEFAULT_ENGINE,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    text: str = None,
+) -> IndexedDocument:
+    """
+    Build a document's keyword frequencies along with the offsets of every sentence
+    holding each keyword, reading the document once, the unit of work of the index command
+
+    Args:
+        filepath: path to the document
+        word_limit: the upper limit of keywords to extract from the document
+        cache: KeywordCache to reuse results for unchanged documents from, None disables caching
+        chunk_size: documents larger than this many bytes are read in windows, 0 means never
+        engine: name of the keyword engine to use, see engines.ENGINES
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        text: the document's text when it has already been read, see prefetch
+
+    Returns: The document's IndexedDocument
+    """
+    # captured before reading, so an edit made meanwhile makes the offsets stale
+    stat = document_stat(filepath)
+    chunked = text is None and bool(chunk_size) and stat.st_size > chunk_size
+    if text is None and not chunked:
+        with open_document(filepath) as f:
+            with profiling.stage("read", documents=1) as timer:
+                text = f.read()
+                timer.add(nbytes=len(text))
+    words = {
+        word: v[filepath]
+        for word, v in process_document(
+            filepath, word_limit, cache, chunk_size, engine, tokenizer, text
+        ).items()
+    }
+
+    with profiling.stage("sample_sentences", documents=1):
+        if chunked:
+            with open_document(filepath) as f:
+                spans = extract_sentence_spans(
+                    words,
+                    iter_window_sentence_spans(
+                        iter_text_windows(f, chunk_size, tokenizer), tokenizer
+                    ),
+                )
+        else:
+            spans = extract_sentence_spans(
+                words, iter_sentence_spans(text, tokenizer) if text else ()
+            )
+    return IndexedDocument(
+        path=filepath,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        words=words,
+        spans=spans,
+    )
+
+
+def _read_document(
+    filepath: str,
+    chunk_size: int = 0,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    text: str = None,
+) -> Iterator[str]:
+    if text is not None:
+        yield text
+        return
+    with open_document(filepath) as f:
+        if chunk_size and document_size(filepath) > chunk_size:
+            yield from iter_text_windows(f, chunk_size, tokenizer)
+        else:
+            with profiling.stage("read", documents=1) as timer:
+                text = f.read()
+                timer.add(nbytes=len(text))
+            yield text
+
+
+def aggregate_corpus(
+    filepaths: Iterable[str],
+    word_limit: int,
+    limit: int,
+    engine: str,
+    chunk_size: int = 0,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    prefetcher: Prefetcher = None,
+) -> WordsWithFrequencyDict:
+    """
+    Process the documents together with a corpus level engine, whose keywords for each
+    document depend on every other document in the run
+
+    Documents are read one at a time and reduced to their candidate words, they are not
+    cached or spread across workers as no document's result stands on its own.
+
+    Args:
+        filepaths: the documents to process
+        word_limit: the upper limit of keywords to extract per document
+        limit: An upper limit in the total number of words in the result
+        engine: name of a corpus level keyword engine, see engines.ENGINES
+        chunk_size: documents larger than this many bytes are read in windows, 0 means never
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        prefetcher: Prefetcher reading the documents ahead, None reads each one when it is reached
+
+    Returns: The aggregated WordsWithFrequencyDict
+    """
+    seen = []
+    documents = collect(filepaths, seen)
+    if prefetcher is not None:
+        documents = prefetcher.documents(documents, chunk_size, keep=True)
+    else:
+        documents = ((filepath, None) for filepath in documents)
+    with profiling.stage("extract_keywords"):
+        scores = get_engine(engine).score_many(
+            (
+                _read_document(filepath, chunk_size, tokenizer, text)
+                for filepath, text in documents
+            ),
+            word_limit,
+            tokenizer,
+        )
+    return aggregate_words_with_frequency(
+        (
+            {word: {filepath: frequency} for word, _, frequency in scored}
+            for filepath, scored in zip(seen, scores)
+        ),
+        limit,
+    )
+
+
+def process_documents(
+    filepaths: Iterable[str],
+    word_limit: int,
+    cache: KeywordCache = None,
+    executor_map=map,
+    chunk_size: int = 0,
+    engine: str = DEFAULT_ENGINE,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    prefetcher: Prefetcher = None,
+    keep: bool = False,
+) -> Iterator[WordsWithFrequencyDict]:
+    """
+    Build the WordsWithFrequencyDict of each document, see process_document
+
+    Args:
+        filepaths: the documents to process, consumed lazily
+        word_limit: the upper limit of keywords to extract per document
+        cache: KeywordCache to reuse results for unchanged documents from
+        executor_map: map function used to spread the documents across workers
+        chunk_size: documents larger than this many bytes are read in windows, 0 means never
+        engine: name of the keyword engine to use, see engines.ENGINES
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        prefetcher: Prefetcher reading the documents ahead of the workers, None leaves
+            each worker to read its own documents
+        keep: keep the texts read in the prefetcher, for the sample sentence pass
+
+    Returns: Iterator of WordsWithFrequencyDicts in the order of filepaths
+    """
+    process = partial(
+        process_document,
+        word_limit=word_limit,
+        cache=cache,
+        chunk_size=chunk_size,
+        engine=engine,
+        tokenizer=tokenizer,
+    )
+    return _map_over_documents(
+        process, filepaths, executor_map, chunk_size, prefetcher, keep
+    )
+
+
+def aggregate_documents(
+    filepaths: Iterable[str],
+    word_limit: int,
+    limit: int = None,
+    cache: KeywordCache = None,
+    executor_map=map,
+    chunk_size: int = 0,
+    engine: str = DEFAULT_ENGINE,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    prefetcher: Prefetcher = None,
+) -> WordsWithFrequencyDict:
+    """
+    Process the documents and fold each one's WordsWithFrequencyDict into the aggregate as
+    soon as it is produced
+
+    Args:
+        filepaths: the documents to process, consumed lazily as they are discovered
+        word_limit: the upper limit of keywords to extract per document
+        limit: An upper limit in the total number of words in the result
+        cache: KeywordCache to reuse results for unchanged documents from
+        executor_map: map function used to spread the documents across workers
+        chunk_size: documents larger than this many bytes are read in windows, 0 means never
+        engine: name of the keyword engine to use, see engines.ENGINES
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        prefetcher: Prefetcher reading the documents ahead of the workers, None leaves
+            each worker to read its own documents
+
+    Returns: The aggregated WordsWithFrequencyDict
+    """
+    if get_engine(engine).corpus_level:
+        return aggregate_corpus(
+            filepaths, word_limit, limit, engine, chunk_size, tokenizer, prefetcher
+        )
+    return aggregate_words_with_frequency(
+        process_documents(
+            filepaths,
+            word_limit,
+            cache,
+            executor_map,
+            chunk_size,
+            engine,
+            tokenizer,
+            prefetcher,
+            keep=True,
+        ),
+        limit,
+    )
+
+
+def aggregate_documents_approximately(
+    discover: Callable[[], Iterable[str]],
+    word_limit: int,
+    limit: int,
+    approximate_counters: int,
+    cache: KeywordCache = None,
+    executor_map=map,
+    chunk_size: int = 0,
+    engine: str = DEFAULT_ENGINE,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    prefetcher: Prefetcher = None,
+) -> tuple[WordsWithFrequencyDict, list[str], ApproximationReport]:
+    """
+    Like aggregate_documents, in fixed memory
+
+    Only a fixed size SpaceSavingSketch is kept while streaming, the documents are then
+    discovered again and their keywords taken from the cache the first pass filled, rather
+    than extracted twice, to recount the candidates for the most frequent words exactly.
+    Neither pass holds the list of documents, only the postings of the candidates.
+
+    Args:
+        discover: called once per pass, returning the documents to process in the same
+            order each time, consumed lazily as they are discovered
+        word_limit: the upper limit of keywords to extract per document
+        limit: An upper limit in the total number of words in the result
+        approximate_counters: counters in the sketch
+        cache: KeywordCache the second pass takes each document's keywords from, required
+        executor_map: map function used to spread the documents across workers
+        chunk_size: documents larger than this many bytes are read in windows, 0 means never
+        engine: name of a document level keyword engine, see engines.ENGINES
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        prefetcher: Prefetcher reading the documents ahead of the workers, None leaves
+            each worker to read its own documents
+
+    Returns: The aggregated WordsWithFrequencyDict, the documents holding its words in the
+        order processed, and how far it can be trusted
+    """
+    if not limit or get_engine(engine).corpus_level or cache is None:
+        raise ValueError("Invalid Parameter")
+
+    process_all = partial(
+        process_documents,
+        word_limit=word_limit,
+        cache=cache,
+        executor_map=executor_map,
+        chunk_size=chunk_size,
+        engine=engine,
+        tokenizer=tokenizer,
+        prefetcher=prefetcher,
+    )
+    sketch = SpaceSavingSketch(approximate_counters)
+    for words_with_frequency in process_all(discover()):
+        with profiling.stage("aggregate"):
+            sketch.add_words(words_with_frequency)
+    candidates = sketch.candidates(limit)
+
+    # documents without a candidate word are not added, so are not held by the aggregator
+    aggregator = WordFrequencyAggregator()
+    for words_with_frequency in process_all(discover(), keep=True):
+        with profiling.stage("aggregate"):
+            aggregator.add(
+                {
+                    word: v
+                    for word, v in words_with_frequency.items()
+                    if word in candidates
+                }
+            )
+    with profiling.stage("aggregate"):
+        top = aggregator.top(limit)
+        result = aggregator.result(limit)
+        holding = {document for v in result.values() for document in v}
+
+    return (
+        result,
+        [document for document in aggregator.documents if document in holding],
+        ApproximationReport(
+            occurrences=sketch.total,
+            counters=approximate_counters,
+            error_bound=sketch.error_bound,
+            candidates=len(candidates),
+            # words without a counter occur at most error_bound times
+            exact=sketch.error_bound == 0
+            or (len(top) == limit and top[-1][1] > sketch.error_bound),
+        ),
+    )
+
+
+def gather_sample_sentences(
+    result: WordsWithFrequencyDict,
+    filepaths: Iterable[str],
+    limit: int = 1,
+    executor_map=map,
+    chunk_size: int = 0,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    prefetcher: Prefetcher = None,
+    found: dict[str, dict[str, list[str]]] = None,
+) -> dict[str, list[str]]:
+    """
+    Pull sample sentences for the words of a WordsWithFrequencyDict from the documents
+    they were found in, one document at a time
+
+    Args:
+        result: the aggregated WordsWithFrequencyDict to find sentences for
+        filepaths: every document in the corpus, sentences are gathered in this order
+        limit: upper bound on the number of sentences per document and word, falsy means unlimited
+        executor_map: map function used to spread the documents across workers
+        chunk_size: documents larger than this many bytes are read in windows, 0 means never
+        tokenizer: name of the tokenizer to split documents into sentences with, see tokenizers.TOKENIZERS
+        prefetcher: Prefetcher reading the documents ahead of the workers, reusing the
+            texts it kept from the keyword pass, None leaves each worker to read its own
+        found: sample sentences already found for some documents, by document then word,
+            those documents are not read again, see map_document
+
+    Returns: Mapping from each word to its sample sentences
+    """
+    paths_to_word_map = defaultdict(list)
+    for word, v in result.items():
+        for path, _ in v.items():
+            paths_to_word_map[path].append(word)
+    filepaths = [filepath for filepath in filepaths if filepath in paths_to_word_map]
+
+    found = found or {}
+    to_read = [filepath for filepath in filepaths if filepath not in found]
+    if prefetcher is not None:
+        document_texts = (
+            text for _, text in prefetcher.documents(to_read, chunk_size, reuse=True)
+        )
+    else:
+        document_texts = (
+            read_text(filepath) if is_tar_member(filepath) else None
+            for filepath in to_read
+        )
+    # Second iteration to make sure one text file is kept in memory
+    read_sentences = executor_map(
+        extract_document_sentences,
+        to_read,
+        (paths_to_word_map[filepath] for filepath in to_read),
+        repeat(limit),
+        repeat(chunk_size),
+        repeat(tokenizer),
+        document_texts,
+    )
+
+    sentences = defaultdict(list)
+    for filepath in filepaths:
+        document_sentences = (
+            found[filepath] if filepath in found else next(read_sentences)
+        )
+        for word in paths_to_word_map[filepath]:
+            sentences[word] += document_sentences.get(word, ())
+    return sentences
+
+
+def shard_filepaths(
+    filepaths: Iterable[str], root: str = None, shard: tuple[int, int] = None
+) -> Iterator[tuple[int, str]]:
+    """
+    Number the documents of a corpus and pick out those of one hash partition, so nodes
+    listing the same corpus each process their own part of it
+
+    Args:
+        filepaths: every document of the corpus, in corpus order
+        root: the directory the filepaths were discovered under, documents are assigned to
+            shards by their path relative to it, None uses the filepaths as they are
+        shard: (index, count) of the partition to pick, None picks every document
+
+    Returns: Iterator of (position in the corpus, filepath)
+    """
+    for position, filepath in enumerate(filepaths):
+        if shard is not None:
+            relative_path = os.path.relpath(filepath, root) if root else filepath
+            if shard_of(relative_path.replace(os.sep, "/"), shard[1]) != shard[0]:
+                continue
+        yield position, filepath
+
+
+def map_documents(
+    filepaths: Iterable[str],
+    word_limit: int,
+    example_limit: int = 1,
+    cache: KeywordCache = None,
+    executor_map=map,
+    chunk_size: int = 0,
+    engine: str = DEFAULT_ENGINE,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    prefetcher: Prefetcher = None,
+) -> Iterator[tuple[WordsWithFrequencyDict, dict[str, list[str]]]]:
+    """
+    Build each document's WordsWithFrequencyDict and the sample sentences of its keywords,
+    see map_document
+
+    Args:
+        filepaths: the documents to process, consumed lazily
+        word_limit: the upper limit of keywords to extract per document
+        example_limit: upper bound on the sentences per document and keyword, falsy means unlimited
+        cache: KeywordCache to reuse results for unchanged documents from
+        executor_map: map function used to spread the documents across workers
+        chunk_size: documents larger than this many bytes are read in windows, 0 means never
+        engine: name of the keyword engine to use, see engines.ENGINES
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        prefetcher: Prefetcher reading the documents ahead of the workers, None leaves
+            each worker to read its own documents
+
+    Returns: Iterator of (WordsWithFrequencyDict, sample sentences) in the order of filepaths
+    """
+    process = partial(
+        map_document,
+        word_limit=word_limit,
+        example_limit=example_limit,
+        cache=cache,
+        chunk_size=chunk_size,
+        engine=engine,
+        tokenizer=tokenizer,
+    )
+    return _map_over_documents(process, filepaths, executor_map, chunk_size, prefetcher)
+
+
+def index_documents(
+    filepaths: Iterable[str],
+    word_limit: int,
+    cache: KeywordCache = None,
+    executor_map=map,
+    chunk_size: int = 0,
+    engine: str = DEFAULT_ENGINE,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    prefetcher: Prefetcher = None,
+) -> Iterator[IndexedDocument]:
+    """
+    Build each document's IndexedDocument, see index_document
+
+    Args:
+        filepaths: the documents to process, consumed lazily
+        word_limit: the upper limit of keywords to extract per document
+        cache: KeywordCache to reuse results for unchanged documents from
+        executor_map: map function used to spread the documents across workers
+        chunk_size: documents larger than this many bytes are read in windows, 0 means never
+        engine: name of the keyword engine to use, see engines.ENGINES
+        tokenizer: name of the tokenizer to use, see tokenizers.TOKENIZERS
+        prefetcher: Prefetcher reading the documents ahead of the workers, None leaves
+            each worker to read its own documents
+
+    Returns: Iterator of IndexedDocuments in the order of filepaths
+    """
+    process = partial(
+        index_document,
+        word_limit=word_limit,
+        cache=cache,
+        chunk_size=chunk_size,
+        engine=engine,
+        tokenizer=tokenizer,
+    )
+    return _map_over_documents(process, filepaths, executor_map, chunk_size, prefetcher)
+
+
+def merge_partials(
+    partials: list[PartialReader], limit: int = None
+) -> tuple[WordsWithFrequencyDict, dict[str, list[str]]]:
+    """
+    Combine the partial results of the map command as if their documents had been
+    processed in a single run
+
+    Partials holding hash partitions of the same number of shards are merged in corpus
+    order, any others in the order given. A document found in more than one partial is
+    taken from the last.
+
+    Args:
+        partials: the partial results to combine, their settings must agree
+        limit: An upper limit in the total number of words in the result
+
+    Returns: The aggregated WordsWithFrequencyDict and mapping of its words to their sample sentences
+    """
+    result = aggregate_words_with_frequency(
+        (
+            {
+                word: {document["path"]: frequency}
+                for word, frequency in document["words"].items()
+            }
+            for partial in partials
+            for document in partial
+        ),
+        limit,
+    )
+
+    shard_counts = {partial.shard[1] if partial.shard else None for partial in partials}
+    in_corpus_order = len(shard_counts) == 1 and None not in shard_counts
+    # filepath -> (merge order, sample sentences of its words in the result)
+    found = {}
+    with profiling.stage("sample_sentences"):
+        for index, partial in enumerate(partials):
+            for document in partial:
+                order = (
+                    (document["position"],)
+                    if in_corpus_order
+                    else (index, document["position"])
+                )
+                found[document["path"]] = order, {
+                    word: document_sentences
+                    for word, document_sentences in document["sentences"].items()
+                    if word in result
+                }
+
+        sentences = defaultdict(list)
+        for _, document_sentences in sorted(found.values(), key=lambda item: item[0]):
+            for word, word_sentences in document_sentences.items():
+                sentences[word] += word_sentences
+    return result, sentences
+
+
+def write_summary(
+    result: WordsWithFrequencyDict,
+    sentences: dict[str, list[str]],
+    target: str,
+    output_format: str = None,
+):
+    """
+    Write the summary table a row at a time
+
+    Args:
+        result: the aggregated WordsWithFrequencyDict to summarize
+        sentences: mapping from each word to its sample sentences, emptied as rows are written
+        target: filepath for the output table
+        output_format: one of output.OUTPUT_FORMATS, None infers it from the target's extension
+    """
+    with profiling.stage("render"):
+        rows = iter_summary_rows(result, sentences)
+        with summary_writer(target, output_format) as writer:
+            for row in rows:
+                writer.write(row)
+                # the writer has what it needs, streaming writers let the sentences go
+                del sentences[row["word"]]
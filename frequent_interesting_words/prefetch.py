@@ -0,0 +1,237 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+from frequent_interesting_words import profiling
+from frequent_interesting_words.archives import document_size, is_tar_member, read_text
+
+DEFAULT_READERS = 4
+DEFAULT_PREFETCH_MB = 64
+DEFAULT_REUSE_MB = 64
+
+
+class DocumentTexts:
+    """
+    Texts read while keywords were extracted, held for the sample sentence pass so it
+    does not read those documents again, up to a budget in characters
+
+    Documents are kept in the order they are offered until the budget runs out, which is
+    the order the sample sentence pass visits them in.
+
+    Args:
+        max_bytes: upper bound on the number of characters held, 0 keeps none
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._texts = {}
+
+    def __contains__(self, filepath: str) -> bool:
+        return filepath in self._texts
+
+    def add(self, filepath: str, text: str) -> bool:
+        """Hold the text of a document if it fits in the budget, returning whether it was kept"""
+        size = len(text)
+        if filepath in self._texts or self.size + size > self.max_bytes:
+            return False
+        self._texts[filepath] = text
+        self.size += size
+        return True
+
+    def pop(self, filepath: str) -> Optional[str]:
+        """Hand over the text of a document, None when it was not held"""
+        text = self._texts.pop(filepath, None)
+        if text is not None:
+            self.size -= len(text)
+        return text
+
+
+class _ByteBudget:
+    """A semaphore counted in bytes, a request larger than the whole budget waits for all of it"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.available = max_bytes
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, nbytes: int) -> int:
+        nbytes = min(nbytes, self.max_bytes)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.available >= nbytes)
+            self.available -= nbytes
+        return nbytes
+
+    async def release(self, nbytes: int):
+        async with self._condition:
+            self.available += nbytes
+            self._condition.notify_all()
+
+
+async def _read_ahead(
+    filepaths: Iterable[str],
+    queue: asyncio.Queue,
+    budget: _ByteBudget,
+    pool: ThreadPoolExecutor,
+    ordered_pool: ThreadPoolExecutor,
+    max_size: int,
+    reuse: Optional[DocumentTexts],
+):
+    loop = asyncio.get_running_loop()
+    filepath = None
+    try:
+        for filepath in filepaths:
+            if reuse is not None and filepath in reuse:
+                read = loop.create_future()
+                read.set_result(reuse.pop(filepath))
+                await queue.put((filepath, 0, read, False))
+                continue
+            size = document_size(filepath)
+            # tar members are read whole, by a single thread in archive order, see archives
+            in_order = is_tar_member(filepath)
+            if max_size and size > max_size and not in_order:
+                await queue.put((filepath, 0, None, False))
+                continue
+            size = await budget.acquire(size)
+            # submitted to the pool straight away, the read runs while the caller works
+            read = loop.run_in_executor(
+                ordered_pool if in_order else pool, read_text, filepath
+            )
+            await queue.put((filepath, size, read, True))
+    except Exception as error:
+        # raised to the caller in order, in place of the document that failed
+        failed = loop.create_future()
+        failed.set_exception(error)
+        await queue.put((filepath, 0, failed, False))
+        return
+    await queue.put(None)
+
+
+def prefetch_documents(
+    filepaths: Iterable[str],
+    readers: int = DEFAULT_READERS,
+    max_bytes: int = DEFAULT_PREFETCH_MB * 2**20,
+    max_size: int = 0,
+    keep: DocumentTexts = None,
+    reuse: DocumentTexts = None,
+) -> Iterator[tuple[str, Optional[str]]]:
+    """
+    Read documents ahead of the caller, so reading the next documents overlaps with the
+    work done on the current one
+
+    An asyncio reader stage submits reads to a pool of reader threads and queues them
+    in order. The queue holds at most readers documents and max_bytes of text, once
+    full the reader waits for the caller to take a document, so memory stays bounded
+    however slow the caller is. The event loop runs while the caller waits for its next
+    document, reads carry on in the reader threads in between.
+
+    Args:
+        filepaths: documents to read, consumed lazily
+        readers: reads in flight at once, 0 or less reads nothing ahead and yields None texts
+        max_bytes: upper bound on the size of the texts read ahead
+        max_size: documents larger than this many bytes are not read and yielded with a
+            None text, for the caller to read in windows, 0 means no limit
+        keep: texts that are read are offered to it, for reuse by a later pass
+        reuse: documents it holds are taken from it rather than read again
+
+    Returns: Iterator of (filepath, text) pairs in the order of filepaths, the text being
+        None for documents that were not read
+    """
+    if readers <= 0:
+        for filepath in filepaths:
+            yield filepath, reuse.pop(filepath) if reuse is not None else None
+        return
+
+    loop = asyncio.new_event_loop()
+    pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="prefetch")
+    ordered_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+    reader = None
+    try:
+
+        async def start() -> tuple[asyncio.Queue, _ByteBudget, asyncio.Task]:
+            queue = asyncio.Queue(maxsize=readers)
+            budget = _ByteBudget(max_bytes)
+            return (
+                queue,
+                budget,
+                asyncio.ensure_future(
+                    _read_ahead(
+                        filepaths, queue, budget, pool, ordered_pool, max_size, reuse
+                    )
+                ),
+            )
+
+        queue, budget, reader = loop.run_until_complete(start())
+        while True:
+            with profiling.stage("read") as timer:
+                item = loop.run_until_complete(queue.get())
+                if item is None:
+                    break
+                filepath, size, read, from_disk = item
+                text = loop.run_until_complete(read) if read is not None else None
+                loop.run_until_complete(budget.release(size))
+                if from_disk:
+                    timer.add(documents=1, nbytes=len(text))
+            if text is not None and keep is not None:
+                keep.add(filepath, text)
+            yield filepath, text
+        loop.run_until_complete(reader)
+    finally:
+        if reader is not None and not reader.done():
+            reader.cancel()
+            loop.run_until_complete(asyncio.gather(reader, return_exceptions=True))
+        pool.shutdown(wait=True)
+        ordered_pool.shutdown(wait=True)
+        loop.close()
+
+
+class Prefetcher:
+    """
+    The prefetch settings of a run, along with the texts kept from the keyword pass for
+    the sample sentence pass
+
+    Args:
+        readers: reads in flight at once, see prefetch_documents
+        max_bytes: upper bound on the size of the texts read ahead
+        reuse_bytes: upper bound on the size of the texts kept for reuse, 0 keeps none
+
+    Attributes:
+        texts: the DocumentTexts kept for reuse
+    """
+
+    def __init__(
+        self,
+        readers: int = DEFAULT_READERS,
+        max_bytes: int = DEFAULT_PREFETCH_MB * 2**20,
+        reuse_bytes: int = DEFAULT_REUSE_MB * 2**20,
+    ):
+        self.readers = readers
+        self.max_bytes = max_bytes
+        self.texts = DocumentTexts(reuse_bytes)
+
+    def documents(
+        self,
+        filepaths: Iterable[str],
+        max_size: int = 0,
+        keep: bool = False,
+        reuse: bool = False,
+    ) -> Iterator[tuple[str, Optional[str]]]:
+        """
+        Read documents ahead, see prefetch_documents
+
+        Args:
+            filepaths: documents to read, consumed lazily
+            max_size: documents larger than this many bytes are not read, 0 means no limit
+            keep: offer the texts read to texts, for a later pass
+            reuse: take documents held in texts from there rather than reading them again
+
+        Returns: Iterator of (filepath, text) pairs in the order of filepaths
+        """
+        return prefetch_documents(
+            filepaths,
+            self.readers,
+            self.max_bytes,
+            max_size,
+            keep=self.texts if keep else None,
+            reuse=self.texts if reuse else None,
+        )
@@ -0,0 +1,293 @@
+import heapq
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Iterable, Iterator, TypedDict
+
+from frequent_interesting_words.archives import document_size
+
+# The Profiler recording in this process, None when profiling is off
+_active = None
+
+
+class StageMetrics(TypedDict):
+    wall_seconds: float
+    cpu_seconds: float
+    calls: int
+    documents: int
+    bytes: int
+    peak_memory: int
+
+
+class DocumentTiming(TypedDict):
+    path: str
+    seconds: float
+    bytes: int
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def add(self, documents: int = 0, nbytes: int = 0):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """A timed run of a stage, time spent in stages nested inside it is excluded"""
+
+    def __init__(self, profiler: "Profiler", name: str, documents: int, nbytes: int):
+        self.profiler = profiler
+        self.name = name
+        self.documents = documents
+        self.bytes = nbytes
+        self.peak = 0
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+
+    def add(self, documents: int = 0, nbytes: int = 0):
+        """Count documents or bytes read towards the stage"""
+        self.documents += documents
+        self.bytes += nbytes
+
+    def __enter__(self):
+        stack = self.profiler._stack
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        stack.append(self)
+        self.start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.start
+        cpu = time.process_time() - self.cpu_start
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        stack = self.profiler._stack
+        stack.pop()
+        if stack:
+            stack[-1].child_wall += wall
+            stack[-1].child_cpu += cpu
+            stack[-1].peak = max(stack[-1].peak, self.peak)
+        self.profiler._record(
+            self.name,
+            StageMetrics(
+                wall_seconds=wall - self.child_wall,
+                cpu_seconds=cpu - self.child_cpu,
+                calls=1,
+                documents=self.documents,
+                bytes=self.bytes,
+                peak_memory=self.peak,
+            ),
+        )
+
+
+class Profiler:
+    """
+    Records the wall time, CPU time, documents, bytes read and peak traced memory of each
+    stage of a run, along with the slowest documents
+
+    A stage's times exclude the stages nested inside it, so the stage times add up to
+    the time spent in instrumented code. Memory is traced with tracemalloc while the
+    profiler is active, which slows the run down.
+
+    Args:
+        slowest: how many of the slowest documents to keep
+    """
+
+    def __init__(self, slowest: int = 10):
+        self.slowest = slowest
+        self.stages = {}
+        self.documents = []
+        self.pid = os.getpid()
+        self.wall_seconds = 0.0
+        self._stack = []
+        self._started_tracing = False
+        self._start = None
+
+    def _record(self, name: str, metrics: StageMetrics):
+        stage = self.stages.get(name)
+        if stage is None:
+            self.stages[name] = metrics
+            return
+        for key in ("wall_seconds", "cpu_seconds", "calls", "documents", "bytes"):
+            stage[key] += metrics[key]
+        stage["peak_memory"] = max(stage["peak_memory"], metrics["peak_memory"])
+
+    def _record_document(self, timing: DocumentTiming):
+        entry = (timing["seconds"], timing["path"], timing["bytes"])
+        if len(self.documents) < self.slowest:
+            heapq.heappush(self.documents, entry)
+        elif self.slowest:
+            heapq.heappushpop(self.documents, entry)
+
+    def merge(self, snapshot: dict):
+        """Fold in the metrics recorded by another Profiler, see snapshot"""
+        for name, metrics in snapshot["stages"].items():
+            self._record(name, dict(metrics))
+        for timing in snapshot["documents"]:
+            self._record_document(timing)
+
+    def snapshot(self) -> dict:
+        """
+        The metrics recorded so far
+
+        Returns: dict of stage name to StageMetrics under "stages" and the slowest
+            DocumentTimings, slowest first, under "documents"
+        """
+        return {
+            "stages": {name: dict(metrics) for name, metrics in self.stages.items()},
+            "documents": [
+                DocumentTiming(path=path, seconds=seconds, bytes=nbytes)
+                for seconds, path, nbytes in sorted(self.documents, reverse=True)
+            ],
+        }
+
+    def start(self):
+        """Make this the profiler recording in this process"""
+        global _active
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _active = self
+        self._start = time.perf_counter()
+
+    def stop(self):
+        """Stop recording, adding the time since start to wall_seconds"""
+        global _active
+        _active = None
+        self.wall_seconds += time.perf_counter() - self._start
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def summary(self) -> str:
+        """The recorded metrics as a plain text table"""
+        staged = sum(stage["wall_seconds"] for stage in self.stages.values())
+        lines = [
+            f"Profiled {self.wall_seconds:.3f}s wall time, {staged:.3f}s in the stages below",
+            f"{'stage':<20}{'wall s':>10}{'cpu s':>10}{'calls':>10}{'documents':>11}"
+            f"{'MB read':>10}{'peak MB':>10}",
+        ]
+        for name, stage in sorted(
+            self.stages.items(), key=lambda item: -item[1]["wall_seconds"]
+        ):
+            lines.append(
+                f"{name:<20}{stage['wall_seconds']:>10.3f}{stage['cpu_seconds']:>10.3f}"
+                f"{stage['calls']:>10}{stage['documents']:>11}"
+                f"{stage['bytes'] / 2**20:>10.2f}{stage['peak_memory'] / 2**20:>10.1f}"
+            )
+        documents = self.snapshot()["documents"]
+        if documents:
+            lines.append(f"Slowest {len(documents)} documents")
+            for timing in documents:
+                lines.append(
+                    f"{timing['seconds']:>10.3f}s {timing['bytes'] / 2**20:>8.2f}MB  {timing['path']}"
+                )
+        return "\n".join(lines)
+
+
+def active() -> bool:
+    """Whether profiling is on in this process"""
+    return _active is not None and _active.pid == os.getpid()
+
+
+def stage(name: str, documents: int = 0, nbytes: int = 0):
+    """
+    Context manager timing a stage when profiling is on, costing a single check otherwise
+
+    Args:
+        name: name of the stage
+        documents: documents the stage handles
+        nbytes: bytes the stage reads, more can be counted with the add method of the
+            object the context manager returns
+
+    Returns: The context manager
+    """
+    if _active is None or _active.pid != os.getpid():
+        return _NULL_STAGE
+    return _Stage(_active, name, documents, nbytes)
+
+
+@contextmanager
+def document(path: str) -> Iterator[None]:
+    """Time the processing of a document, for the list of slowest documents"""
+    if not active():
+        yield
+        return
+    profiler = _active
+    start = time.perf_counter()
+    yield
+    profiler._record_document(
+        DocumentTiming(
+            path=path,
+            seconds=time.perf_counter() - start,
+            bytes=document_size(path),
+        )
+    )
+
+
+def timed_iter(name: str, iterable: Iterable) -> Iterator:
+    """Pass the items of an iterable through, timing how long producing them takes as a stage"""
+    if not active():
+        return iter(iterable)
+
+    def timed():
+        iterator = iter(iterable)
+        exhausted = object()
+        while True:
+            with stage(name) as timer:
+                item = next(iterator, exhausted)
+                if item is not exhausted:
+                    timer.add(documents=1)
+            if item is exhausted:
+                return
+            yield item
+
+    return timed()
+
+
+def _call_profiled(fn: Callable, *args) -> tuple:
+    global _active
+    previous = _active
+    profiler = Profiler(slowest=1)
+    profiler.start()
+    try:
+        result = fn(*args)
+    finally:
+        profiler.stop()
+        # the map may run the call in this process, hand recording back to its profiler
+        _active = previous
+    return result, profiler.snapshot()
+
+
+def profiled_map(executor_map: Callable) -> Callable:
+    """
+    Wrap a map function that may run its calls in worker processes, so the metrics
+    recorded in the workers are merged into this process' profiler
+
+    Args:
+        executor_map: map compatible callable, see parallel.document_executor
+
+    Returns: A map compatible callable
+    """
+    if executor_map is map or not active():
+        return executor_map
+
+    profiler = _active
+
+    def mapper(fn, *iterables):
+        for result, snapshot in executor_map(partial(_call_profiled, fn), *iterables):
+            profiler.merge(snapshot)
+            yield result
+
+    return mapper
@@ -0,0 +1,49 @@
+"""
+The NLTK models and corpora the pipeline needs, each loaded once per process on first use
+
+nltk itself is only imported once a resource is asked for, so commands that never
+tokenize text, such as --help, do not pay for it.
+"""
+
+from functools import lru_cache
+
+DEFAULT_LANGUAGE = "english"
+
+
+@lru_cache(maxsize=None)
+def stopwords(language: str = DEFAULT_LANGUAGE) -> frozenset[str]:
+    """The NLTK stopwords of a language"""
+    import nltk
+
+    return frozenset(nltk.corpus.stopwords.words(language))
+
+
+@lru_cache(maxsize=None)
+def punkt_tokenizer(language: str = DEFAULT_LANGUAGE):
+    """The punkt sentence tokenizer behind nltk.tokenize.sent_tokenize"""
+    import nltk
+
+    if hasattr(nltk.tokenize, "PunktTokenizer"):
+        return nltk.tokenize.PunktTokenizer(language)
+    # nltk before 3.8.2 ships punkt as a pickle
+    return nltk.data.load(f"tokenizers/punkt/{language}.pickle")
+
+
+@lru_cache(maxsize=None)
+def word_tokenizer():
+    """The treebank word tokenizer behind nltk.tokenize.word_tokenize"""
+    import nltk
+
+    return nltk.tokenize.NLTKWordTokenizer()
+
+
+def sent_tokenize(text: str, language: str = DEFAULT_LANGUAGE) -> list[str]:
+    """Split text into sentences exactly as nltk.tokenize.sent_tokenize does"""
+    return punkt_tokenizer(language).tokenize(text)
+
+
+def preload(language: str = DEFAULT_LANGUAGE):
+    """Load every resource up front, so the first document processed does not pay for them"""
+    stopwords(language)
+    punkt_tokenizer(language)
+    word_tokenizer()
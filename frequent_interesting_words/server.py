@@ -0,0 +1,281 @@
+"""
+A local HTTP server around an Analyzer, so a stream of documents can be analysed without
+paying for interpreter startup and model loading on every one
+
+    POST /documents    {"name": ..., "text": ...} or {"path": ...}, or a list of them
+    GET  /top?k=10     the k most frequent words so far
+    GET  /sentences?word=cat
+    GET  /documents    the names of the documents added
+    GET  /health
+
+Responses are JSON, errors carry an "error" message. Documents can only be added by path
+when the server was given a root directory, and only from beneath it.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import stat
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from typing import Union
+from urllib.parse import parse_qs, urlsplit
+
+from frequent_interesting_words.analyzer import Analyzer
+from frequent_interesting_words.archives import split_member
+from frequent_interesting_words.discovery import iter_filepaths
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Upper bound on the size of a request body, larger documents are better added by path
+MAX_BODY_SIZE = 16 * 2**20
+
+
+class RequestError(Exception):
+    """A request the server cannot act on, answered with its status and message"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalyzerRequestHandler(BaseHTTPRequestHandler):
+    """Answers the requests of one connection from the server's Analyzer"""
+
+    server_version = "frequent-interesting-words"
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # headers and body are written separately, without this small responses wait
+        # on the client's delayed acknowledgement, Unix sockets have no such option
+        self.disable_nagle_algorithm = isinstance(self.client_address, tuple)
+        super().setup()
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+    def log_message(self, format: str, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _respond(self, status: HTTPStatus, body: dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, routes: dict):
+        url = urlsplit(self.path)
+        route = routes.get(url.path.rstrip("/") or "/")
+        try:
+            if route is None:
+                raise RequestError(HTTPStatus.NOT_FOUND, f"No such endpoint {url.path}")
+            self._respond(HTTPStatus.OK, route(parse_qs(url.query)))
+        except RequestError as error:
+            self._respond(error.status, {"error": str(error)})
+        except Exception as error:
+            # answered rather than dropping the connection, the server carries on
+            self.log_error("%s failed: %r", self.requestline, error)
+            self._respond(
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                {"error": f"{type(error).__name__}: {error}"},
+            )
+
+    def do_GET(self):
+        self._handle(
+            {
+                "/health": lambda query: {"status": "ok"},
+                "/top": self._top,
+                "/sentences": self._sentences,
+                "/documents": lambda query: {
+                    "documents": self.server.analyzer.documents
+                },
+            }
+        )
+
+    def do_POST(self):
+        self._handle({"/documents": self._add_documents})
+
+    def _top(self, query: dict) -> dict:
+        k = _int_parameter(query, "k", 10)
+        return {
+            "words": [
+                {"word": word, "frequency": frequency}
+                for word, frequency in self.server.analyzer.top_words(k)
+            ]
+        }
+
+    def _sentences(self, query: dict) -> dict:
+        word = query.get("word", [""])[0].lower()
+        if not word:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Missing parameter word")
+        return {"word": word, "sentences": self.server.analyzer.sample_sentences(word)}
+
+    def _read_json(self) -> Union[dict, list]:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_SIZE:
+            # the body is left unread, so the connection cannot carry another request
+            self.close_connection = True
+        if length < 0:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise RequestError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Bodies are limited to {MAX_BODY_SIZE} bytes, add the document by path",
+            )
+        try:
+            return json.loads(self.rfile.read(length))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "The body is not valid JSON")
+
+    def _add_documents(self, query: dict) -> dict:
+        body = self._read_json()
+        documents = body if isinstance(body, list) else [body]
+        added = []
+        for document in documents:
+            if not isinstance(document, dict):
+                raise RequestError(HTTPStatus.BAD_REQUEST, "Documents are JSON objects")
+            if "text" in document:
+                added.append(self._add_text(document))
+            elif "path" in document:
+                added.extend(self._add_path(document["path"]))
+            else:
+                raise RequestError(
+                    HTTPStatus.BAD_REQUEST, "A document needs either a text or a path"
+                )
+        return {"documents": added}
+
+    def _add_text(self, document: dict) -> dict:
+        text, name = document["text"], document.get("name")
+        if not isinstance(text, str) or not (name is None or isinstance(name, str)):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "text and name are strings")
+        name = name or self.server.next_name()
+        return {
+            "name": name,
+            "words": _frequencies(self.server.analyzer.add_document(name, text)),
+        }
+
+    def _add_path(self, path: str) -> list[dict]:
+        root = self.server.root
+        if root is None:
+            raise RequestError(
+                HTTPStatus.FORBIDDEN,
+                "Adding documents by path needs the server's --root",
+            )
+        if not isinstance(path, str):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "path is a string")
+        path = os.path.realpath(os.path.join(root, path))
+        if not _inside(root, path):
+            raise RequestError(HTTPStatus.FORBIDDEN, f"{path} is outside of the root")
+        if not os.path.exists(path) and split_member(path) is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such document {path}")
+        added = []
+        for filepath in iter_filepaths(path):
+            # symlinks found below path are followed, those leading out of the root are not
+            if not _inside(root, os.path.realpath(filepath)):
+                continue
+            try:
+                words_with_frequency = self.server.analyzer.add_document(filepath)
+            except (OSError, UnicodeDecodeError) as error:
+                raise RequestError(
+                    HTTPStatus.BAD_REQUEST, f"Cannot read {filepath}: {error}"
+                )
+            added.append(
+                {"name": filepath, "words": _frequencies(words_with_frequency)}
+            )
+        return added
+
+
+def _inside(root: str, path: str) -> bool:
+    """Whether the resolved path is the resolved root or below it"""
+    return os.path.commonpath([root, path]) == root
+
+
+def _int_parameter(query: dict, name: str, default: int) -> int:
+    try:
+        return int(query.get(name, [default])[0])
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer")
+
+
+def _frequencies(words_with_frequency: dict[str, dict[str, int]]) -> dict[str, int]:
+    return {word: sum(v.values()) for word, v in words_with_frequency.items()}
+
+
+class _AnalyzerServerMixin:
+    """The state shared by the request handlers of a server"""
+
+    daemon_threads = True
+
+    def setup_analyzer(self, analyzer: Analyzer, root: str = None, quiet: bool = False):
+        self.analyzer = analyzer
+        self.root = os.path.realpath(root) if root else None
+        self.quiet = quiet
+        self._names = count(1)
+
+    def next_name(self) -> str:
+        """A name for a document posted without one"""
+        return f"document-{next(self._names)}"
+
+
+class AnalyzerHTTPServer(_AnalyzerServerMixin, ThreadingHTTPServer):
+    """Serves an Analyzer over TCP, a thread per connection"""
+
+
+if hasattr(socket, "AF_UNIX"):
+
+    class AnalyzerUnixServer(
+        _AnalyzerServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+    ):
+        """Serves an Analyzer over a Unix socket, a thread per connection"""
+
+
+def make_server(
+    analyzer: Analyzer,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: str = None,
+    root: str = None,
+    quiet: bool = False,
+) -> socketserver.BaseServer:
+    """
+    Bind a server answering requests from the Analyzer, call serve_forever to start it
+
+    Args:
+        analyzer: the Analyzer holding the running aggregate
+        host: interface to listen on
+        port: TCP port to listen on, 0 picks a free one
+        socket_path: listen on this Unix socket rather than TCP, replacing a socket left
+            there, raises ValueError when something other than a socket is there
+        root: directory documents can be added by path from, None only accepts texts
+        quiet: do not log each request to stderr
+
+    Returns: The bound server
+    """
+    if socket_path:
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Invalid Parameter")
+        try:
+            mode = os.lstat(socket_path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            # a socket left behind by an earlier server is replaced, anything else is kept
+            if not stat.S_ISSOCK(mode):
+                raise ValueError(f"{socket_path} already exists and is not a socket")
+            os.unlink(socket_path)
+        server = AnalyzerUnixServer(socket_path, AnalyzerRequestHandler)
+    else:
+        server = AnalyzerHTTPServer((host, port), AnalyzerRequestHandler)
+    server.setup_analyzer(analyzer, root, quiet)
+    return server
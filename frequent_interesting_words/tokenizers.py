@@ -0,0 +1,139 @@
+import re
+from functools import lru_cache
+from typing import Iterator
+
+from frequent_interesting_words import resources
+
+DEFAULT_TOKENIZER = "nltk"
+
+# Words that end in a full stop without ending the sentence, compared lower case
+ABBREVIATIONS = frozenset("""
+    mr mrs ms dr prof sr jr st mt ft rev gen col lt sgt capt gov sen rep pres
+    vs etc al approx dept est inc ltd co corp jan feb mar apr jun jul aug sep sept
+    oct nov dec no nos fig figs vol ed eds e.g i.e a.m p.m u.s u.k
+    """.split())
+
+# Terminal punctuation, possibly followed by closing quotes or brackets, then whitespace
+_SENTENCE_END = re.compile(r"[.!?]+[\"'”’)\]]*(?=\s|$)")
+# The space delimited word directly before a full stop
+_LAST_WORD = re.compile(r"\S+$")
+# Numbers with separators stay whole, words keep their inner hyphens and every other
+# non space character is a token of its own
+_TOKEN = re.compile(r"\d+(?:[.,:]\d+)+|\w+(?:-\w+)*|[^\w\s]")
+_NON_SPACE = re.compile(r"\S")
+
+
+class Tokenizer:
+    """
+    Splits text into sentences and sentences into word tokens, built once per process by
+    get_tokenizer and reused for every document
+
+    Attributes:
+        name: the name the tokenizer is registered under in TOKENIZERS
+    """
+
+    name = None
+
+    def span_tokenize(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        Find the sentences of the text
+
+        Args:
+            text: text to split into sentences
+
+        Returns: Iterator of (start, end) offsets of each sentence, without surrounding whitespace
+        """
+        raise NotImplementedError
+
+    def sent_tokenize(self, text: str) -> list[str]:
+        """Split text into sentences"""
+        return [text[start:end] for start, end in self.span_tokenize(text)]
+
+    def word_tokenize(self, sentence: str) -> list[str]:
+        """Split a sentence into word tokens"""
+        raise NotImplementedError
+
+    def preload(self):
+        """Load any models the tokenizer needs, so the first document does not pay for them"""
+
+
+class NltkTokenizer(Tokenizer):
+    """Punkt sentence splitting followed by treebank word tokenization, exactly as nltk.tokenize.word_tokenize"""
+
+    name = "nltk"
+
+    def span_tokenize(self, text: str) -> Iterator[tuple[int, int]]:
+        return resources.punkt_tokenizer().span_tokenize(text)
+
+    def sent_tokenize(self, text: str) -> list[str]:
+        return resources.sent_tokenize(text)
+
+    def word_tokenize(self, sentence: str) -> list[str]:
+        return resources.word_tokenizer().tokenize(sentence)
+
+    def preload(self):
+        resources.preload()
+
+
+class FastTokenizer(Tokenizer):
+    """
+    Precompiled regular expressions standing in for punkt and the treebank tokenizer
+
+    A sentence ends at terminal punctuation followed by whitespace, unless it is a
+    single full stop after a known abbreviation, an initial or a word with inner full
+    stops such as e.g. Words are runs of word characters joined by hyphens, numbers
+    keep their separators and every other character is a token of its own, so
+    contractions and possessives split into their parts rather than treebank's n't and 's.
+    The counts of keywords stay close to those of the nltk tokenizer at a fraction of
+    the cost, see benchmarks/tokenizers.py.
+    """
+
+    name = "fast"
+
+    def _ends_sentence(self, text: str, end: re.Match) -> bool:
+        if end.group().rstrip("\"'”’)]") != ".":
+            return True
+        word = _LAST_WORD.search(text, max(0, end.start() - 32), end.start())
+        if word is None:
+            return True
+        word = word.group().lstrip("\"'“‘([").lower()
+        return not (
+            word in ABBREVIATIONS or (len(word) == 1 and word.isalpha()) or "." in word
+        )
+
+    def span_tokenize(self, text: str) -> Iterator[tuple[int, int]]:
+        start = _NON_SPACE.search(text)
+        if start is None:
+            return
+        start = start.start()
+        for end in _SENTENCE_END.finditer(text, start):
+            if not self._ends_sentence(text, end):
+                continue
+            yield start, end.end()
+            start = _NON_SPACE.search(text, end.end())
+            if start is None:
+                return
+            start = start.start()
+        yield start, len(text.rstrip())
+
+    def word_tokenize(self, sentence: str) -> list[str]:
+        return _TOKEN.findall(sentence)
+
+
+# Tokenizers selectable by name, add a Tokenizer subclass here to make it available
+TOKENIZERS = {NltkTokenizer.name: NltkTokenizer, FastTokenizer.name: FastTokenizer}
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(name: str) -> Tokenizer:
+    """
+    The process wide instance of the named tokenizer, built on first use
+
+    Args:
+        name: name of the tokenizer in TOKENIZERS
+
+    Returns: The Tokenizer
+    """
+    if name not in TOKENIZERS:
+        raise ValueError("Invalid Parameter")
+    return TOKENIZERS[name]()
@@ -8,7 +8,7 @@ setup(
     include_package_data=True,
     entry_points={
         "console_scripts": [
-            "frequent-interesting-words = frequent_interesting_words.cli:frequent_interesting_words",
+            "frequent-interesting-words = frequent_interesting_words.cli:main",
         ],
     },
 )
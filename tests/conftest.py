@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from frequent_interesting_words.engines import get_engine
+
+
+@pytest.fixture(autouse=True)
+def isolated_keyword_cache(tmp_path, monkeypatch):
+    """Keep the keyword cache used by CLI tests out of the user's cache directory"""
+    cache_dir = tmp_path / "keyword_cache"
+    monkeypatch.setenv("FREQUENT_INTERESTING_WORDS_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture
+def file_mode():
+    """Run with a umask of 027, returning the mode files created by open() then get"""
+    umask = os.umask(0o027)
+    yield 0o640
+    os.umask(umask)
+
+
+@pytest.fixture(autouse=True)
+def fresh_keyword_engines():
+    """Keyword engines live for the whole process, rebuild them per test so mocks apply"""
+    get_engine.cache_clear()
+    yield
+    get_engine.cache_clear()
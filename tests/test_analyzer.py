@@ -0,0 +1,162 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from frequent_interesting_words import Analyzer
+from frequent_interesting_words.cache import KeywordCache
+from frequent_interesting_words.discovery import Rediscovery, iter_filepaths
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(ROOT_DIR, "fixtures")
+DOCUMENTS = {
+    "doc1": "cat on mat.",
+    "doc2": "dog and bone.",
+    "doc3": "cat and dog. dog and cat.",
+}
+
+
+def test_analyzer_add_document():
+    analyzer = Analyzer()
+    assert analyzer.add_document("doc3", DOCUMENTS["doc3"]) == {
+        "cat": {"doc3": 2},
+        "dog": {"doc3": 2},
+    }
+    assert analyzer.top_words() == [("cat", 2), ("dog", 2)]
+
+
+def test_analyzer_top_words():
+    analyzer = Analyzer()
+    for name, text in DOCUMENTS.items():
+        analyzer.add_document(name, text)
+    assert analyzer.documents == list(DOCUMENTS)
+    assert analyzer.top_words(2) == [("cat", 3), ("dog", 3)]
+    assert analyzer.top_words() == [("cat", 3), ("dog", 3), ("bone", 1), ("mat", 1)]
+    assert analyzer.result(1) == {"cat": {"doc1": 1, "doc3": 2}}
+
+
+def test_analyzer_sample_sentences():
+    analyzer = Analyzer()
+    for name, text in DOCUMENTS.items():
+        analyzer.add_document(name, text)
+    assert analyzer.sample_sentences("cat") == ["cat on mat.", "cat and dog."]
+    assert analyzer.sample_sentences("unseen") == []
+
+    analyzer = Analyzer(example_limit=None)
+    analyzer.add_document("doc3", DOCUMENTS["doc3"])
+    assert analyzer.sample_sentences("cat") == ["cat and dog.", "dog and cat."]
+
+
+def test_analyzer_keeps_sample_sentences_rather_than_texts():
+    analyzer = Analyzer()
+    analyzer.add_document("doc3", DOCUMENTS["doc3"])
+    assert analyzer._sentences == {
+        "doc3": {"cat": ["cat and dog."], "dog": ["cat and dog."]}
+    }
+    analyzer.add_document("doc3", "")
+    assert analyzer._sentences == {"doc3": {}}
+
+
+def test_analyzer_add_documents_from_files(tmp_path):
+    analyzer = Analyzer()
+    analyzer.add_documents(iter_filepaths(f"{FIXTURE_DIR}/path_directory"))
+    assert [word for word, _ in analyzer.top_words(10)] == ["cat", "dog", "bone", "mat"]
+
+    target = tmp_path / "output.md"
+    analyzer.render(str(target))
+    with open(f"{FIXTURE_DIR}/path_directory.md") as f:
+        assert target.read_text() == f.read()
+
+
+def test_analyzer_render_formats(tmp_path):
+    analyzer = Analyzer()
+    for name, text in DOCUMENTS.items():
+        analyzer.add_document(name, text)
+    target = tmp_path / "output.jsonl"
+    analyzer.render(str(target), limit=2)
+    rows = [json.loads(line) for line in target.read_text().splitlines()]
+    assert [(row["word"], row["documents"]) for row in rows] == [
+        ("cat", ["doc1", "doc3"]),
+        ("dog", ["doc2", "doc3"]),
+    ]
+
+
+def test_analyzer_thread_pool():
+    texts = [(f"doc{i}", text) for i in range(20) for text in DOCUMENTS.values()]
+    sequential = Analyzer()
+    for name, text in texts:
+        sequential.add_document(f"{name}-{len(text)}", text)
+
+    shared = Analyzer()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(
+            pool.map(
+                lambda document: shared.add_document(
+                    f"{document[0]}-{len(document[1])}", document[1]
+                ),
+                texts,
+            )
+        )
+    assert shared.top_words() == sequential.top_words()
+    assert shared.result() == sequential.result()
+
+
+def test_analyzer_add_document_again():
+    analyzer = Analyzer()
+    analyzer.add_document("doc", "The zebra ran. A zebra hid.")
+    analyzer.add_document("doc", "cat on mat.")
+    assert analyzer.top_words() == [("cat", 1), ("mat", 1)]
+    assert analyzer.documents == ["doc"]
+    assert analyzer.sample_sentences("cat") == ["cat on mat."]
+    assert analyzer.sample_sentences("zebra") == []
+
+
+def test_analyzer_merge():
+    analyzer = Analyzer()
+    analyzer.add_document("doc1", DOCUMENTS["doc1"])
+    analyzer.merge({"cat": {"doc9": 5}}, ["doc9"])
+    assert analyzer.top_words(1) == [("cat", 6)]
+    assert analyzer.documents == ["doc1", "doc9"]
+    analyzer.merge({"dog": {"doc9": 2}}, ["doc9"])
+    assert analyzer.top_words() == [("dog", 2), ("cat", 1), ("mat", 1)]
+
+
+def test_analyzer_corpus_level_engine():
+    analyzer = Analyzer(engine="tfidf")
+    with pytest.raises(ValueError):
+        analyzer.add_document("doc1", DOCUMENTS["doc1"])
+    analyzer.add_documents(iter_filepaths(f"{FIXTURE_DIR}/path_directory"))
+    assert [word for word, _ in analyzer.top_words(10)] == ["cat", "dog", "bone", "mat"]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"word_limit": 0}, {"engine": "unknown"}, {"tokenizer": "unknown"}],
+)
+def test_analyzer_invalid_parameters(kwargs):
+    with pytest.raises(ValueError):
+        Analyzer(**kwargs)
+
+
+def test_analyzer_add_documents_approximately(tmp_path, mocker):
+    for name, text in DOCUMENTS.items():
+        (tmp_path / f"{name}.txt").write_text(text)
+    filepaths = sorted(str(path) for path in tmp_path.glob("*.txt"))
+    analyzer = Analyzer(cache=KeywordCache(str(tmp_path / "cache")))
+    with pytest.raises(ValueError):
+        analyzer.add_documents(iter(filepaths), approximate_counters=10, limit=1)
+
+    discover = mocker.Mock(side_effect=lambda: iter(filepaths))
+    report = analyzer.add_documents(
+        Rediscovery(discover), approximate_counters=10, limit=1
+    )
+    # discovered once per pass rather than held, documents without cat are not kept
+    assert discover.call_count == 2
+    assert report["exact"]
+    assert analyzer.top_words() == [("cat", 3)]
+    assert analyzer.documents == [filepaths[0], filepaths[2]]
+    assert analyzer.sample_sentences("cat") == ["cat on mat.", "cat and dog."]
+
+    with pytest.raises(ValueError):
+        Analyzer().add_documents(filepaths, approximate_counters=10, limit=1)
@@ -0,0 +1,172 @@
+import bz2
+import gzip
+import lzma
+import os
+import tarfile
+import zipfile
+
+import pytest
+from click.testing import CliRunner
+
+from frequent_interesting_words import archives as archives_module
+from frequent_interesting_words.archives import (
+    document_size,
+    document_stat,
+    open_document_binary,
+    read_text,
+    split_member,
+    strip_compression,
+    zstandard_available,
+)
+from frequent_interesting_words.cli import main
+from frequent_interesting_words.discovery import iter_filepaths
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(ROOT_DIR, "fixtures")
+CORPUS = os.path.join(FIXTURE_DIR, "path_directory")
+TEXTS = {
+    f"doc{i}.txt": f"Document {i} is here.\nIt has a second line." for i in range(6)
+}
+
+
+@pytest.fixture
+def packed(tmp_path):
+    """Every document of TEXTS, packed in each kind of archive and compressed file"""
+    with tarfile.open(tmp_path / "a.tar.gz", "w:gz") as tar:
+        for name in ("doc0.txt", "doc1.txt"):
+            (tmp_path / name).write_text(TEXTS[name])
+            tar.add(tmp_path / name, f"texts/{name}")
+            (tmp_path / name).unlink()
+    with zipfile.ZipFile(tmp_path / "b.zip", "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("doc2.txt", TEXTS["doc2.txt"])
+        zip_file.writestr("doc3.txt.gz", gzip.compress(TEXTS["doc3.txt"].encode()))
+    (tmp_path / "doc4.txt.bz2").write_bytes(bz2.compress(TEXTS["doc4.txt"].encode()))
+    (tmp_path / "doc5.txt.xz").write_bytes(lzma.compress(TEXTS["doc5.txt"].encode()))
+    return tmp_path
+
+
+def identifiers(root):
+    return [
+        f"{root}/a.tar.gz/texts/doc0.txt",
+        f"{root}/a.tar.gz/texts/doc1.txt",
+        f"{root}/b.zip/doc2.txt",
+        f"{root}/b.zip/doc3.txt.gz",
+        f"{root}/doc4.txt.bz2",
+        f"{root}/doc5.txt.xz",
+    ]
+
+
+def test_discover_and_read(packed):
+    filepaths = list(iter_filepaths(str(packed)))
+    assert filepaths == identifiers(packed)
+    for i, filepath in enumerate(filepaths):
+        assert read_text(filepath) == TEXTS[f"doc{i}.txt"]
+        with open_document_binary(filepath) as f:
+            assert f.read() == TEXTS[f"doc{i}.txt"].encode()
+        assert document_size(filepath) >= len(TEXTS[f"doc{i}.txt"])
+
+
+def test_document_names(packed):
+    assert split_member(f"{packed}/b.zip/doc2.txt") == (f"{packed}/b.zip", "doc2.txt")
+    assert split_member(f"{packed}/doc4.txt.bz2") is None
+    assert split_member(f"{packed}/missing.zip/doc.txt") is None
+    assert strip_compression("b.zip/doc3.txt.gz") == "b.zip/doc3.txt"
+    assert strip_compression("a.tar.gz") == "a.tar.gz"
+    assert document_stat(f"{packed}/b.zip/doc2.txt") == os.stat(packed / "b.zip")
+
+
+def test_tar_decompressed_once(packed, mocker):
+    spy = mocker.spy(archives_module, "_TarStream")
+    # read as discovered, then with every member listed before any is read
+    for filepath in iter_filepaths(str(packed / "a.tar.gz")):
+        read_text(filepath)
+    filepaths = list(iter_filepaths(str(packed / "a.tar.gz")))
+    assert [read_text(filepath) for filepath in filepaths] == [
+        TEXTS["doc0.txt"],
+        TEXTS["doc1.txt"],
+    ]
+    assert spy.call_count == 2
+
+
+def test_tar_members_read_out_of_order(packed, monkeypatch):
+    monkeypatch.setattr(archives_module, "MAX_PENDING_BYTES", 0)
+    filepaths = list(iter_filepaths(str(packed / "a.tar.gz")))
+    assert read_text(filepaths[1]) == TEXTS["doc1.txt"]
+    assert read_text(filepaths[0]) == TEXTS["doc0.txt"]
+    with pytest.raises(FileNotFoundError):
+        read_text(f"{packed}/a.tar.gz/texts/missing.txt")
+
+
+def test_tar_holds_only_wanted_members(packed):
+    archive = str(packed / "a.tar.gz")
+    filepaths = list(iter_filepaths(archive, exclude=["doc0.txt"]))
+    assert filepaths == [f"{archive}/texts/doc1.txt"]
+    assert read_text(filepaths[0]) == TEXTS["doc1.txt"]
+    assert archive not in archives_module._discovered
+
+
+@pytest.mark.skipif(zstandard_available(), reason="zstandard is installed")
+def test_zstandard_missing(tmp_path):
+    (tmp_path / "doc.txt.zst").write_bytes(b"")
+    with pytest.raises(RuntimeError, match="zstandard"):
+        read_text(str(tmp_path / "doc.txt.zst"))
+
+
+def test_zstandard(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    (tmp_path / "doc.txt.zst").write_bytes(
+        zstandard.ZstdCompressor().compress(b"cat on mat.")
+    )
+    assert read_text(str(tmp_path / "doc.txt.zst")) == "cat on mat."
+
+
+@pytest.fixture
+def packed_corpus(tmp_path):
+    """The path_directory fixture as a tar of two documents and a gzip file"""
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    with tarfile.open(corpus / "a.tar.gz", "w:gz") as tar:
+        for name in ("doc1.txt", "doc2.txt"):
+            tar.add(os.path.join(CORPUS, name), name)
+    with open(os.path.join(CORPUS, "doc3.txt"), "rb") as f:
+        (corpus / "doc3.txt.gz").write_bytes(gzip.compress(f.read()))
+    return corpus
+
+
+@pytest.mark.parametrize("prefetch", ["0", "4"])
+def test_run_over_archives(packed_corpus, mocker, prefetch):
+    spy = mocker.spy(archives_module, "_TarStream")
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        result = runner.invoke(
+            main, [str(packed_corpus), "--jobs", "1", "--prefetch", prefetch]
+        )
+        assert result.exit_code == 0
+        assert result.output == "['cat', 'dog', 'bone', 'mat']\n"
+        with open(f"{td}/output.md") as f1, open(
+            f"{FIXTURE_DIR}/path_directory.md"
+        ) as f2:
+            assert f1.read() == f2.read()
+    if prefetch != "0":
+        # the sample sentence pass reuses the texts read for keywords
+        assert spy.call_count == 1
+
+
+def test_update_over_archives(packed_corpus, tmp_path):
+    runner = CliRunner()
+    args = ["update", str(packed_corpus), "--jobs", "1"]
+    args += ["--manifest", str(tmp_path / "manifest.db")]
+    args += ["--target", str(tmp_path / "output.md")]
+    assert "3 documents added" in runner.invoke(main, args).output
+    assert "0 documents added" in runner.invoke(main, args).output
+
+
+def test_index_over_archives(packed_corpus, tmp_path):
+    runner = CliRunner()
+    database = str(tmp_path / "index.db")
+    result = runner.invoke(
+        main, ["index", str(packed_corpus), "--jobs", "1", "--database", database]
+    )
+    assert result.exit_code == 0
+    result = runner.invoke(main, ["query", "--database", database, "sentences", "dog"])
+    assert result.output == "dog and bone.\ncat and dog.\n"
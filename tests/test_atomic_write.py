@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from frequent_interesting_words.atomic import atomic_write
+
+
+def test_atomic_write(tmp_path, file_mode):
+    atomic_write(str(tmp_path / "out.txt"), "caté")
+    assert (tmp_path / "out.txt").read_text(encoding="utf-8") == "caté"
+    assert os.stat(tmp_path / "out.txt").st_mode & 0o777 == file_mode
+
+    atomic_write(str(tmp_path / "out.txt"), b"dog")
+    assert (tmp_path / "out.txt").read_bytes() == b"dog"
+    assert os.listdir(tmp_path) == ["out.txt"]
+
+
+def test_atomic_write_failure_keeps_file(tmp_path):
+    (tmp_path / "out.txt").write_text("cat")
+    with pytest.raises(TypeError):
+        atomic_write(str(tmp_path / "out.txt"), None)
+    assert (tmp_path / "out.txt").read_text() == "cat"
+    assert os.listdir(tmp_path) == ["out.txt"]
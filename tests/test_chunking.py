@@ -0,0 +1,96 @@
+import io
+
+import pytest
+
+from frequent_interesting_words.chunking import (
+    iter_text_windows,
+    iter_window_sentences,
+    merge_keyword_scores,
+)
+from frequent_interesting_words.pipeline import (
+    build_chunked_word_frequencies,
+    build_word_occurance_dict,
+    extract_keywords,
+    extract_sample_sentences_for_keywords,
+    extract_sample_sentences_from_windows,
+)
+
+TEXT = (
+    "Cat on mat. Dog loves bone. The cat and the dog sat. "
+    "Mat for a cat. Dogs chase cats. A bone for the dog.\n"
+)
+
+
+def test_windows_rebuild_text():
+    for window_size in [1, 7, 20, 1000]:
+        windows = list(iter_text_windows(io.StringIO(TEXT), window_size))
+        assert "".join(windows) == TEXT
+
+
+def test_windows_are_sentence_aligned():
+    windows = list(iter_text_windows(io.StringIO(TEXT), 30))
+    assert len(windows) > 1
+    for window in windows[:-1]:
+        assert window.rstrip().endswith(".")
+
+
+def test_long_sentence_cut_at_whitespace():
+    windows = list(iter_text_windows(io.StringIO("cat " * 20), 10))
+    assert all(window.endswith(" ") for window in windows)
+    assert "".join(windows) == "cat " * 20
+
+
+def test_empty_file():
+    assert list(iter_text_windows(io.StringIO(""), 10)) == []
+
+
+def test_window_sentences_match_whole_text():
+    windows = iter_text_windows(io.StringIO(TEXT), 30)
+    assert [s for s, _ in iter_window_sentences(windows)] == [
+        "Cat on mat.",
+        "Dog loves bone.",
+        "The cat and the dog sat.",
+        "Mat for a cat.",
+        "Dogs chase cats.",
+        "A bone for the dog.",
+    ]
+
+
+def test_merge_keyword_scores():
+    assert merge_keyword_scores(
+        [[("Cat", 0.2), ("mat", 0.5)], [("cat", 0.4), ("dog", 0.1), ("bone", 0.5)]],
+        3,
+    ) == ["dog", "cat", "bone"]
+
+
+def test_sample_sentences_from_windows():
+    for limit in [None, 1, 2]:
+        assert extract_sample_sentences_from_windows(
+            ["cat", "bone"], iter_text_windows(io.StringIO(TEXT), 25), limit
+        ) == extract_sample_sentences_for_keywords(["cat", "bone"], TEXT, limit)
+
+
+def test_chunked_word_frequencies_single_window():
+    frequencies = build_chunked_word_frequencies(lambda: [TEXT], 10)
+    assert frequencies == build_word_occurance_dict(TEXT, extract_keywords(TEXT, 10))
+
+
+def test_chunked_word_frequencies_count_across_windows():
+    frequencies = build_chunked_word_frequencies(
+        lambda: iter_text_windows(io.StringIO(TEXT), 25), 10
+    )
+    assert frequencies["cat"] == 3
+    assert frequencies["bone"] == 2
+
+
+def test_chunked_word_frequencies_count_only_keywords():
+    passes = []
+
+    def windows():
+        passes.append(None)
+        return iter_text_windows(io.StringIO(TEXT), 25)
+
+    frequencies = build_chunked_word_frequencies(windows, 2)
+    assert len(passes) == 2
+    assert len(frequencies) == 2
+    assert frequencies == build_word_occurance_dict(TEXT, list(frequencies))
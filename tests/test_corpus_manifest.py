@@ -0,0 +1,165 @@
+import os
+import sqlite3
+
+import pytest
+
+from frequent_interesting_words.incremental import CorpusManifest, hash_file
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "doc1.txt").write_text("cat on mat.")
+    (tmp_path / "docs" / "doc2.txt").write_text("dog and bone.")
+    return tmp_path / "docs"
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    with CorpusManifest(str(tmp_path / "manifest.db"), 10) as manifest:
+        yield manifest
+
+
+def filepaths(corpus):
+    return sorted(str(path) for path in corpus.iterdir())
+
+
+def test_plan_new_corpus(corpus, manifest):
+    changed, deleted = manifest.plan(filepaths(corpus))
+    assert list(changed) == filepaths(corpus)
+    assert changed[str(corpus / "doc1.txt")]["hash"] == hash_file(
+        str(corpus / "doc1.txt")
+    )
+    assert deleted == []
+
+
+def test_plan_detects_changes(corpus, manifest):
+    changed, _ = manifest.plan(filepaths(corpus))
+    for filepath, state in changed.items():
+        manifest.record(filepath, state, {}, {})
+    assert manifest.plan(filepaths(corpus)) == ({}, [])
+
+    (corpus / "doc1.txt").write_text("cat on a different mat.")
+    (corpus / "doc2.txt").unlink()
+    (corpus / "doc3.txt").write_text("new doc.")
+    changed, deleted = manifest.plan(filepaths(corpus))
+    assert sorted(changed) == [str(corpus / "doc1.txt"), str(corpus / "doc3.txt")]
+    assert deleted == [str(corpus / "doc2.txt")]
+
+
+def test_plan_ignores_touched_files(corpus, manifest):
+    changed, _ = manifest.plan(filepaths(corpus))
+    for filepath, state in changed.items():
+        manifest.record(filepath, state, {}, {})
+
+    os.utime(corpus / "doc1.txt", ns=(1, 1))
+    assert manifest.plan(filepaths(corpus)) == ({}, [])
+    # the new mtime is recorded, or the file is hashed again by every run
+    assert manifest.files()[str(corpus / "doc1.txt")]["mtime_ns"] == 1
+
+
+def test_remove_drops_contributions(corpus, manifest):
+    changed, _ = manifest.plan(filepaths(corpus))
+    doc1, doc2 = filepaths(corpus)
+    manifest.record(doc1, changed[doc1], {"cat": {doc1: 1}, "mat": {doc1: 1}}, {})
+    manifest.record(doc2, changed[doc2], {"cat": {doc2: 2}}, {})
+    assert manifest.result() == {"cat": {doc1: 1, doc2: 2}, "mat": {doc1: 1}}
+    assert manifest.top() == [("cat", 3), ("mat", 1)]
+
+    manifest.remove(doc1)
+    assert manifest.result() == {"cat": {doc2: 2}}
+    assert manifest.top() == [("cat", 2)]
+    assert list(manifest.files()) == [doc2]
+
+
+def test_record_replaces_contributions(corpus, manifest):
+    changed, _ = manifest.plan(filepaths(corpus))
+    doc1, doc2 = filepaths(corpus)
+    manifest.record(doc1, changed[doc1], {"cat": {doc1: 1}, "mat": {doc1: 1}}, {})
+    manifest.record(doc2, changed[doc2], {"cat": {doc2: 2}}, {})
+    manifest.record(doc1, changed[doc1], {"cat": {doc1: 3}}, {})
+    assert manifest.result() == {"cat": {doc1: 3, doc2: 2}}
+    assert manifest.top(1) == [("cat", 5)]
+
+
+def test_sentences_are_kept_once_per_file(corpus, manifest):
+    changed, _ = manifest.plan(filepaths(corpus))
+    doc1, doc2 = filepaths(corpus)
+    manifest.record(
+        doc1,
+        changed[doc1],
+        {"cat": {doc1: 1}, "mat": {doc1: 1}},
+        {"cat": ["cat on mat."], "mat": ["cat on mat."]},
+    )
+    manifest.record(doc2, changed[doc2], {"cat": {doc2: 1}}, {"cat": ["cat too."]})
+    (stored,) = manifest._connection.execute(
+        "SELECT sentences FROM files WHERE path = ?", (doc1,)
+    ).fetchone()
+    assert stored == '["cat on mat."]'
+
+    result = manifest.result()
+    assert manifest.sample_sentences(result, [doc2, doc1]) == {
+        "cat": ["cat too.", "cat on mat."],
+        "mat": ["cat on mat."],
+    }
+
+
+def test_saved_and_reopened(corpus, tmp_path, file_mode):
+    path = str(tmp_path / "manifest.db")
+    with CorpusManifest(path, 10) as manifest:
+        changed, _ = manifest.plan(filepaths(corpus))
+        doc1 = filepaths(corpus)[0]
+        manifest.record(
+            doc1, changed[doc1], {"cat": {doc1: 1}}, {"cat": ["cat on mat."]}
+        )
+    assert os.stat(path).st_mode & 0o777 == file_mode
+
+    with CorpusManifest(path, 10) as loaded:
+        assert list(loaded.files()) == [doc1]
+        assert loaded.result() == {"cat": {doc1: 1}}
+        assert loaded.sample_sentences(loaded.result(), [doc1]) == {
+            "cat": ["cat on mat."]
+        }
+
+    # changes of a failed run are dropped
+    with pytest.raises(RuntimeError):
+        with CorpusManifest(path, 10) as manifest:
+            manifest.remove(doc1)
+            raise RuntimeError
+    with CorpusManifest(path, 10) as loaded:
+        assert list(loaded.files()) == [doc1]
+
+
+def test_different_settings_start_afresh(corpus, tmp_path):
+    path = str(tmp_path / "manifest.db")
+    doc1 = filepaths(corpus)[0]
+
+    def fill(*args, **kwargs):
+        with CorpusManifest(path, *args, **kwargs) as manifest:
+            changed, _ = manifest.plan([doc1])
+            manifest.record(doc1, changed[doc1], {"cat": {doc1: 1}}, {})
+
+    fill(10)
+    for args, kwargs in [
+        ((5,), {}),
+        ((10, "fast"), {}),
+        ((10,), {"chunk_size": 2**20}),
+        ((10,), {"example_limit": None}),
+    ]:
+        with CorpusManifest(path, *args, **kwargs) as manifest:
+            assert manifest.result() == {}
+            assert manifest.files() == {}
+        fill(10)
+    with CorpusManifest(path, 10) as manifest:
+        assert manifest.result() == {"cat": {doc1: 1}}
+
+
+def test_refuses_other_files(tmp_path):
+    (tmp_path / "text.db").write_text("not a database")
+    with pytest.raises(ValueError, match="not a corpus manifest"):
+        CorpusManifest(str(tmp_path / "text.db"), 10)
+    sqlite3.connect(tmp_path / "other.db").execute(
+        "CREATE TABLE t (a)"
+    ).connection.close()
+    with pytest.raises(ValueError, match="not a corpus manifest"):
+        CorpusManifest(str(tmp_path / "other.db"), 10)
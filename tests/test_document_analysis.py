@@ -0,0 +1,63 @@
+import nltk
+import pytest
+
+from frequent_interesting_words import resources
+from frequent_interesting_words.document import (
+    DocumentAnalysis,
+    analyse,
+    iter_sentences,
+)
+from frequent_interesting_words.pipeline import (
+    build_word_occurance_dict,
+    extract_sample_sentences_from_text,
+)
+
+
+def test_empty_text():
+    document = DocumentAnalysis("")
+    assert document.sentences == []
+    assert document.tokens == []
+    assert document.sentence_bounds == []
+
+
+def test_tokens_match_word_tokenize():
+    text = "Cat on mat. Dog's bone, isn't it? The cat sat."
+    assert DocumentAnalysis(text).tokens == nltk.tokenize.word_tokenize(text)
+
+
+def test_lower_tokens():
+    assert DocumentAnalysis("Cat on Mat.").lower_tokens == ["cat", "on", "mat", "."]
+
+
+def test_sentence_bounds():
+    document = DocumentAnalysis("Cat on mat. Dog loves bone.")
+    assert document.sentences == ["Cat on mat.", "Dog loves bone."]
+    assert document.sentence_bounds == [(0, 4), (4, 8)]
+    assert document.sentence_lower_tokens(1) == ["dog", "loves", "bone", "."]
+
+
+def test_analyse_reuses_analysis():
+    document = DocumentAnalysis("Cat on mat.")
+    assert analyse(document) is document
+    assert analyse("Cat on mat.").tokens == document.tokens
+
+
+def test_tokenizes_once(mocker):
+    spy = mocker.spy(resources, "sent_tokenize")
+    document = DocumentAnalysis("Cat on mat. Cat loves mat.")
+
+    assert build_word_occurance_dict(document, ["cat", "mat"]) == {"cat": 2, "mat": 2}
+    assert extract_sample_sentences_from_text("cat", document) == [
+        "Cat on mat.",
+        "Cat loves mat.",
+    ]
+    assert spy.call_count == 1
+
+
+def test_iter_sentences_text_and_analysis_agree():
+    text = "Cat on Mat. Dog's bone, isn't it?"
+    assert list(iter_sentences(text)) == list(iter_sentences(DocumentAnalysis(text)))
+    assert list(iter_sentences(text)) == [
+        ("Cat on Mat.", ["cat", "on", "mat", "."]),
+        ("Dog's bone, isn't it?", ["dog", "'s", "bone", ",", "is", "n't", "it", "?"]),
+    ]
@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+from frequent_interesting_words.parallel import (
+    bounded_map,
+    document_executor,
+    resolve_jobs,
+)
+
+
+def square(x, offset):
+    return x * x + offset
+
+
+def test_resolve_jobs(mocker):
+    mocker.patch("os.cpu_count", return_value=6)
+    assert resolve_jobs(0) == 6
+    assert resolve_jobs(-1) == 6
+    assert resolve_jobs(3) == 3
+
+
+def test_single_worker_is_serial():
+    with document_executor(1, 10) as executor_map:
+        assert executor_map is map
+
+
+def test_single_document_is_serial():
+    with document_executor(4, 1) as executor_map:
+        assert executor_map is map
+
+
+def test_pool_preserves_order():
+    with document_executor(2, 20) as executor_map:
+        assert list(executor_map(square, range(20), repeat(1))) == [
+            x * x + 1 for x in range(20)
+        ]
+
+
+def test_pool_reads_inputs_lazily():
+    consumed = []
+
+    def inputs():
+        for x in range(100):
+            consumed.append(x)
+            yield x
+
+    with document_executor(2, None) as executor_map:
+        results = executor_map(square, inputs(), repeat(0))
+        assert next(results) == 0
+        # two chunks per worker are submitted ahead, not the whole input
+        assert len(consumed) < 100
+        assert list(results) == [x * x for x in range(1, 100)]
+
+
+def test_chunks_grow_from_one():
+    chunk_sizes = []
+
+    with ThreadPoolExecutor(2) as executor:
+        submit = executor.submit
+
+        def recording_submit(fn, call, chunk):
+            chunk_sizes.append(len(chunk))
+            return submit(fn, call, chunk)
+
+        executor.submit = recording_submit
+        mapper = bounded_map(executor, 16, 4, grow=True)
+        assert list(mapper(abs, range(100))) == list(range(100))
+    # the first chunks hold a single input, so a handful of documents spread over the pool
+    assert chunk_sizes[:4] == [1, 1, 1, 1]
+    assert chunk_sizes[4:8] == [2, 4, 8, 16]
+    assert max(chunk_sizes) == 16
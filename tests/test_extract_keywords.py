@@ -1,6 +1,6 @@
 import pytest
 
-from frequent_interesting_words.cli import extract_keywords
+from frequent_interesting_words.pipeline import extract_keywords
 
 
 @pytest.fixture
@@ -0,0 +1,54 @@
+import pytest
+
+from frequent_interesting_words.document import DocumentAnalysis
+from frequent_interesting_words.pipeline import (
+    extract_sample_sentences_for_keywords,
+    extract_sample_sentences_from_text,
+)
+from frequent_interesting_words.resources import word_tokenizer
+
+TEXT = "Cat on mat. Dog loves bone. cat and dog. Catherine loves mats. Mat for a cat."
+
+
+def test_empty_parameters():
+    assert extract_sample_sentences_for_keywords([], TEXT) == {}
+    assert extract_sample_sentences_for_keywords(["cat"], "") == {"cat": []}
+    assert extract_sample_sentences_for_keywords([""], TEXT) == {"": []}
+
+
+def test_matches_per_keyword_extraction():
+    keywords = ["cat", "dog", "mat", "bone", "missing"]
+    for limit in [None, 1, 2]:
+        assert extract_sample_sentences_for_keywords(keywords, TEXT, limit) == {
+            keyword: extract_sample_sentences_from_text(keyword, TEXT, limit)
+            for keyword in keywords
+        }
+
+
+def test_multiple_keywords_unlimited():
+    assert extract_sample_sentences_for_keywords(["cat", "dog"], TEXT) == {
+        "cat": ["Cat on mat.", "cat and dog.", "Mat for a cat."],
+        "dog": ["Dog loves bone.", "cat and dog."],
+    }
+
+
+def test_mixed_case_keywords():
+    assert extract_sample_sentences_for_keywords(["Cat", "cat"], TEXT, limit=1) == {
+        "Cat": ["Cat on mat."],
+        "cat": ["Cat on mat."],
+    }
+
+
+def test_document_analysis():
+    assert extract_sample_sentences_for_keywords(["bone"], DocumentAnalysis(TEXT)) == {
+        "bone": ["Dog loves bone."]
+    }
+
+
+def test_stops_once_limits_reached(mocker):
+    spy = mocker.spy(word_tokenizer(), "tokenize")
+    assert extract_sample_sentences_for_keywords(["cat", "dog"], TEXT, limit=1) == {
+        "cat": ["Cat on mat."],
+        "dog": ["Dog loves bone."],
+    }
+    assert spy.call_count == 2
@@ -1,9 +1,12 @@
+import json
 import os
+import shutil
 
 from click.testing import CliRunner
 
 import frequent_interesting_words.cli as fiw_module
-from frequent_interesting_words.cli import frequent_interesting_words
+import frequent_interesting_words.pipeline as pipeline_module
+from frequent_interesting_words.cli import frequent_interesting_words, main
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 FIXTURE_DIR = os.path.join(ROOT_DIR, "fixtures")
@@ -99,3 +102,334 @@ def test_frequent_interesting_words_interesting_words_per_document(mocker):
         assert result.exit_code == 0
         assert result.output == "['cat', 'dog']\n"
         assert os.path.exists(f"{td}/output.md")
+
+
+def test_frequent_interesting_words_jobs_matches_serial():
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        serial = runner.invoke(
+            frequent_interesting_words,
+            [f"{FIXTURE_DIR}/path_directory", "--jobs", "1", "--target", "serial.md"],
+        )
+        parallel = runner.invoke(
+            frequent_interesting_words,
+            [f"{FIXTURE_DIR}/path_directory", "--jobs", "2", "--target", "parallel.md"],
+        )
+        assert serial.exit_code == 0
+        assert parallel.exit_code == 0
+        assert serial.output == parallel.output
+
+        with open(f"{td}/serial.md") as f1, open(f"{td}/parallel.md") as f2:
+            assert f1.read() == f2.read()
+
+
+def test_frequent_interesting_words_reuses_cache(mocker, isolated_keyword_cache):
+    spy = mocker.spy(pipeline_module, "extract_keywords")
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        args = [f"{FIXTURE_DIR}/path_directory", "--jobs", "1"]
+        first = runner.invoke(frequent_interesting_words, args)
+        assert spy.call_count == 3
+        second = runner.invoke(frequent_interesting_words, args)
+        assert spy.call_count == 3
+        assert first.output == second.output
+        assert os.path.isdir(isolated_keyword_cache)
+
+        runner.invoke(frequent_interesting_words, args + ["--no-cache"])
+        assert spy.call_count == 6
+
+
+def test_main_defaults_to_run():
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        result = runner.invoke(main, [f"{FIXTURE_DIR}/cats_and_mats.txt"])
+        assert result.exit_code == 0
+        assert result.output == "['cat', 'mat', 'sat']\n"
+
+        with open(f"{td}/output.md") as f1, open(
+            f"{FIXTURE_DIR}/cats_and_mats.md"
+        ) as f2:
+            assert f1.read() == f2.read()
+
+
+def test_update_processes_only_changes(mocker, tmp_path):
+    corpus = tmp_path / "corpus"
+    shutil.copytree(f"{FIXTURE_DIR}/path_directory", corpus)
+    spy = mocker.spy(pipeline_module, "extract_keywords")
+    sentences_spy = mocker.spy(pipeline_module, "extract_document_sentences")
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        args = ["update", str(corpus), "--jobs", "1", "--no-cache"]
+        result = runner.invoke(main, args)
+        assert result.exit_code == 0
+        assert result.output.endswith("['cat', 'dog', 'bone', 'mat']\n")
+        assert spy.call_count == 3
+        assert sentences_spy.call_count == 3
+        with open(f"{td}/output.md") as f1, open(
+            f"{FIXTURE_DIR}/path_directory.md"
+        ) as f2:
+            assert f1.read() == f2.read()
+        saved = os.stat(f"{td}/corpus_manifest.db").st_mtime_ns
+
+        os.remove(f"{td}/output.md")
+        result = runner.invoke(main, args)
+        assert result.output.endswith("['cat', 'dog', 'bone', 'mat']\n")
+        # nothing changed, no document is read and the manifest is left as it was
+        assert spy.call_count == 3
+        assert sentences_spy.call_count == 3
+        assert os.stat(f"{td}/corpus_manifest.db").st_mtime_ns == saved
+        with open(f"{td}/output.md") as f1, open(
+            f"{FIXTURE_DIR}/path_directory.md"
+        ) as f2:
+            assert f1.read() == f2.read()
+
+        (corpus / "doc1.txt").unlink()
+        (corpus / "doc4.txt").write_text("bone and bone and bone.")
+        result = runner.invoke(main, args)
+        assert result.exit_code == 0
+        assert result.output.endswith("['bone', 'dog', 'cat']\n")
+        assert spy.call_count == 4
+
+
+def test_frequent_interesting_words_approximate_counters(mocker):
+    spy = mocker.spy(pipeline_module, "extract_keywords")
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        approximate = runner.invoke(
+            frequent_interesting_words,
+            [
+                f"{FIXTURE_DIR}/path_directory",
+                "--target",
+                "approximate.md",
+                "--approximate-counters",
+                "4",
+                "--interesting-words-limit",
+                "2",
+            ],
+        )
+        assert approximate.exit_code == 0
+        assert "the top words are exact" in approximate.output
+        # the recount takes each document's keywords from the cache, not the engine
+        assert spy.call_count == 3
+        exact = runner.invoke(
+            frequent_interesting_words,
+            [
+                f"{FIXTURE_DIR}/path_directory",
+                "--target",
+                "exact.md",
+                "--interesting-words-limit",
+                "2",
+                "--no-cache",
+            ],
+        )
+        assert approximate.output.endswith(exact.output)
+
+        with open(f"{td}/exact.md") as f1, open(f"{td}/approximate.md") as f2:
+            assert f1.read() == f2.read()
+
+
+def test_frequent_interesting_words_approximate_counters_needs_limit():
+    runner = CliRunner()
+    result = runner.invoke(
+        frequent_interesting_words,
+        [
+            f"{FIXTURE_DIR}/path_directory",
+            "--approximate-counters",
+            "3",
+            "--interesting-words-limit",
+            "0",
+        ],
+    )
+    assert result.exit_code == 2
+
+
+def test_frequent_interesting_words_approximate_counters_needs_cache(mocker):
+    spy = mocker.spy(pipeline_module, "extract_keywords")
+    result = CliRunner().invoke(
+        frequent_interesting_words,
+        [f"{FIXTURE_DIR}/path_directory", "--approximate-counters", "4", "--no-cache"],
+    )
+    assert result.exit_code == 2
+    assert "--no-cache" in result.output
+    assert spy.call_count == 0
+
+
+def test_frequent_interesting_words_approximate_counters_reports_misses():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            frequent_interesting_words,
+            [f"{FIXTURE_DIR}/path_directory", "--approximate-counters", "2"],
+        )
+        assert result.exit_code == 0
+        assert "may be missing" in result.output
+
+
+def test_frequent_interesting_words_discovery_filters(tmp_path):
+    corpus = tmp_path / "corpus"
+    shutil.copytree(f"{FIXTURE_DIR}/path_directory", corpus / "nested")
+    (corpus / "skipped.md").write_text("mat mat mat mat.")
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            frequent_interesting_words, [str(corpus), "--include", "*.txt"]
+        )
+        assert result.exit_code == 0
+        assert result.output == "['cat', 'dog', 'bone', 'mat']\n"
+
+        result = runner.invoke(
+            frequent_interesting_words,
+            [str(corpus), "--include", "*.txt", "--no-recursive"],
+        )
+        # nothing left to summarize
+        assert isinstance(result.exception, ValueError)
+
+
+def test_frequent_interesting_words_chunk_size():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            frequent_interesting_words,
+            [f"{FIXTURE_DIR}/path_directory", "--chunk-size", "0.00001"],
+        )
+        assert result.exit_code == 0
+        assert result.output == "['cat', 'dog', 'bone', 'mat']\n"
+
+
+def test_frequent_interesting_words_tfidf_engine():
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        result = runner.invoke(
+            frequent_interesting_words,
+            [f"{FIXTURE_DIR}/path_directory", "--engine", "tfidf"],
+        )
+        assert result.exit_code == 0
+        assert result.output == "['cat', 'dog', 'bone', 'mat']\n"
+        assert os.path.exists(f"{td}/output.md")
+
+
+def test_frequent_interesting_words_tfidf_engine_not_approximate():
+    runner = CliRunner()
+    result = runner.invoke(
+        frequent_interesting_words,
+        [
+            f"{FIXTURE_DIR}/path_directory",
+            "--engine",
+            "tfidf",
+            "--approximate-counters",
+            "3",
+        ],
+    )
+    assert result.exit_code == 2
+
+
+def test_frequent_interesting_words_json_lines():
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        result = runner.invoke(
+            frequent_interesting_words,
+            [f"{FIXTURE_DIR}/path_directory", "--target", "output.jsonl"],
+        )
+        assert result.exit_code == 0
+        with open(f"{td}/output.jsonl") as f:
+            rows = [json.loads(line) for line in f]
+        assert [(row["word"], row["frequency"]) for row in rows] == [
+            ("cat", 3),
+            ("dog", 3),
+            ("bone", 1),
+            ("mat", 1),
+        ]
+        assert rows[0]["sentences"] == ["cat on mat.", "cat and dog."]
+
+
+def test_frequent_interesting_words_format_option():
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        result = runner.invoke(
+            frequent_interesting_words,
+            [f"{FIXTURE_DIR}/path_directory", "--target", "output", "--format", "csv"],
+        )
+        assert result.exit_code == 0
+        with open(f"{td}/output") as f:
+            assert f.readline().strip() == "word,frequency,documents,sentences"
+
+
+def test_frequent_interesting_words_parquet_needs_pyarrow(mocker):
+    mocker.patch.object(fiw_module, "parquet_available", return_value=False)
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            frequent_interesting_words,
+            [f"{FIXTURE_DIR}/path_directory", "--target", "output.parquet"],
+        )
+        assert result.exit_code == 2
+        assert "pyarrow" in result.output
+
+
+def test_frequent_interesting_words_profile_json():
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        result = runner.invoke(
+            frequent_interesting_words,
+            [
+                f"{FIXTURE_DIR}/path_directory",
+                "--profile-json",
+                "profile.json",
+                "--jobs",
+                "1",
+            ],
+        )
+        assert result.exit_code == 0
+        assert result.output.startswith("['cat', 'dog', 'bone', 'mat']\n")
+        with open(f"{td}/profile.json") as f:
+            profile = json.load(f)
+        assert {"read", "extract_keywords", "count", "render"} <= set(profile["stages"])
+        # each document is read once, its text is kept for the sample sentences
+        assert profile["stages"]["read"]["documents"] == 3
+        assert len(profile["documents"]) == 3
+
+
+def test_frequent_interesting_words_fast_tokenizer():
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        result = runner.invoke(
+            frequent_interesting_words,
+            [f"{FIXTURE_DIR}/path_directory", "--tokenizer", "fast"],
+        )
+        assert result.exit_code == 0
+        assert result.output == "['cat', 'dog', 'bone', 'mat']\n"
+        assert os.path.exists(f"{td}/output.md")
+
+
+def test_frequent_interesting_words_without_prefetch():
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        result = runner.invoke(
+            frequent_interesting_words,
+            [
+                f"{FIXTURE_DIR}/path_directory",
+                "--prefetch",
+                "0",
+                "--profile-json",
+                "profile.json",
+                "--jobs",
+                "1",
+            ],
+        )
+        assert result.exit_code == 0
+        assert result.output.startswith("['cat', 'dog', 'bone', 'mat']\n")
+        with open(f"{td}/profile.json") as f:
+            profile = json.load(f)
+        # each document is read once for keywords and once for sample sentences
+        assert profile["stages"]["read"]["documents"] == 6
+
+
+def test_option_defaults_match_the_library():
+    from frequent_interesting_words import index, prefetch, server
+
+    assert fiw_module.DEFAULT_READERS == prefetch.DEFAULT_READERS
+    assert fiw_module.DEFAULT_PREFETCH_MB == prefetch.DEFAULT_PREFETCH_MB
+    assert fiw_module.DEFAULT_REUSE_MB == prefetch.DEFAULT_REUSE_MB
+    assert fiw_module.DEFAULT_HOST == server.DEFAULT_HOST
+    assert fiw_module.DEFAULT_PORT == server.DEFAULT_PORT
+    assert fiw_module.DEFAULT_INDEX == index.DEFAULT_INDEX
@@ -0,0 +1,203 @@
+import os
+import sqlite3
+
+import pytest
+from click.testing import CliRunner
+
+from frequent_interesting_words import index as index_module
+from frequent_interesting_words.cli import main
+from frequent_interesting_words.index import (
+    CorpusIndex,
+    IndexedDocument,
+    IndexWriter,
+    read_spans,
+)
+from frequent_interesting_words.pipeline import index_document
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(ROOT_DIR, "fixtures")
+CORPUS = os.path.join(FIXTURE_DIR, "path_directory")
+SETTINGS = {"word_limit": 50, "engine": "yake", "tokenizer": "nltk"}
+
+
+def write_document(path, text, words, spans):
+    path.write_text(text)
+    stat = os.stat(path)
+    return IndexedDocument(
+        path=str(path),
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        words=words,
+        spans=spans,
+    )
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    documents = [
+        write_document(
+            tmp_path / "doc1.txt",
+            "The cat sat. A dog barked. The cat ran.",
+            {"cat": 2, "dog": 1},
+            {"cat": [(0, 12), (27, 39)], "dog": [(13, 26)]},
+        ),
+        write_document(
+            tmp_path / "doc2.txt",
+            "Dog and cat.",
+            {"dog": 1, "cat": 1},
+            {"dog": [(0, 12)], "cat": [(0, 12)]},
+        ),
+        write_document(tmp_path / "doc3.txt", "", {}, {}),
+    ]
+    with IndexWriter(str(tmp_path / "index.db"), SETTINGS) as writer:
+        for document in documents:
+            writer.write(document)
+    with CorpusIndex(str(tmp_path / "index.db")) as index:
+        yield index
+
+
+def test_index_queries(corpus, tmp_path):
+    assert corpus.settings == {"version": 1, **SETTINGS}
+    assert corpus.top() == [("cat", 3), ("dog", 2)]
+    assert corpus.top(1) == [("cat", 3)]
+    assert corpus.word_documents("cat") == [
+        (str(tmp_path / "doc1.txt"), 2),
+        (str(tmp_path / "doc2.txt"), 1),
+    ]
+    assert corpus.word_documents("bird") == []
+    assert corpus.document_words(str(tmp_path / "doc2.txt")) == [("cat", 1), ("dog", 1)]
+    assert corpus.document_words(str(tmp_path / "doc3.txt")) == []
+    assert corpus.document_words("unknown") is None
+    assert corpus.result(1) == {
+        "cat": {str(tmp_path / "doc1.txt"): 2, str(tmp_path / "doc2.txt"): 1}
+    }
+
+
+def test_index_sample_sentences(corpus):
+    assert corpus.sample_sentences(["cat", "dog", "bird"]) == {
+        "cat": ["The cat sat.", "Dog and cat."],
+        "dog": ["A dog barked.", "Dog and cat."],
+        "bird": [],
+    }
+    assert corpus.sample_sentences(["cat"], limit=None) == {
+        "cat": ["The cat sat.", "The cat ran.", "Dog and cat."]
+    }
+
+
+def test_index_refuses_changed_documents(corpus, tmp_path):
+    (tmp_path / "doc2.txt").write_text("Dog and cat!!")
+    with pytest.raises(ValueError, match="changed since it was indexed"):
+        corpus.sample_sentences(["cat"])
+    (tmp_path / "doc2.txt").unlink()
+    with pytest.raises(ValueError):
+        corpus.sample_sentences(["dog"])
+
+
+def test_index_writes_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_module, "INSERT_BATCH_SIZE", 2)
+    with IndexWriter(str(tmp_path / "index.db"), SETTINGS) as writer:
+        for i in range(5):
+            writer.write(
+                write_document(
+                    tmp_path / f"doc{i}.txt", "cat.", {"cat": 1}, {"cat": [(0, 4)]}
+                )
+            )
+    with CorpusIndex(str(tmp_path / "index.db")) as index:
+        assert index.top() == [("cat", 5)]
+        assert len(index.word_documents("cat")) == 5
+
+
+def test_index_gets_the_umask_mode(tmp_path, file_mode):
+    with IndexWriter(str(tmp_path / "index.db"), SETTINGS):
+        pass
+    assert os.stat(tmp_path / "index.db").st_mode & 0o777 == file_mode
+
+
+def test_failed_build_keeps_previous_index(corpus, tmp_path):
+    with pytest.raises(RuntimeError):
+        with IndexWriter(str(tmp_path / "index.db"), SETTINGS) as writer:
+            raise RuntimeError
+    assert sorted(os.listdir(tmp_path)) == [
+        "doc1.txt",
+        "doc2.txt",
+        "doc3.txt",
+        "index.db",
+    ]
+    with CorpusIndex(str(tmp_path / "index.db")) as index:
+        assert index.top(1) == [("cat", 3)]
+
+
+def test_index_refuses_other_files(tmp_path):
+    with pytest.raises(ValueError):
+        CorpusIndex(str(tmp_path / "missing.db"))
+    (tmp_path / "text.db").write_text("not a database")
+    with pytest.raises(ValueError):
+        CorpusIndex(str(tmp_path / "text.db"))
+    sqlite3.connect(tmp_path / "other.db").execute(
+        "CREATE TABLE t (a)"
+    ).connection.close()
+    with pytest.raises(ValueError):
+        CorpusIndex(str(tmp_path / "other.db"))
+
+
+def test_read_spans(tmp_path):
+    (tmp_path / "text").write_text("héllo wörld, goodbye")
+    assert list(read_spans(str(tmp_path / "text"), [(0, 5), (6, 11), (13, 20)])) == [
+        "héllo",
+        "wörld",
+        "goodbye",
+    ]
+
+
+def test_index_document_spans_match_in_windows(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("The cat sat on the mat. " * 50 + "A dog barked at the cat. " * 50)
+    whole = index_document(str(path), 10)
+    windowed = index_document(str(path), 10, chunk_size=200)
+    assert windowed["spans"]["dog"] == whole["spans"]["dog"]
+    assert len(whole["spans"]["cat"]) == 100
+    with open(path) as f:
+        text = f.read()
+    start, end = whole["spans"]["dog"][0]
+    assert text[start:end] == "A dog barked at the cat."
+
+
+def test_index_and_query_commands():
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        result = runner.invoke(main, ["index", CORPUS, "--jobs", "1"])
+        assert result.exit_code == 0
+        assert os.path.isfile(f"{td}/corpus_index.db")
+
+        result = runner.invoke(main, ["query", "top", "-k", "2"])
+        assert result.output == "cat\t3\ndog\t3\n"
+        result = runner.invoke(main, ["query", "word", "Cat"])
+        assert result.output == f"{CORPUS}/doc3.txt\t2\n{CORPUS}/doc1.txt\t1\n"
+        result = runner.invoke(main, ["query", "document", f"{CORPUS}/doc1.txt"])
+        assert result.output == "cat\t1\nmat\t1\n"
+        result = runner.invoke(main, ["query", "sentences", "dog"])
+        assert result.output == "dog and bone.\ncat and dog.\n"
+
+        result = runner.invoke(main, ["query", "table"])
+        assert result.exit_code == 0
+        assert result.output == "['cat', 'dog', 'bone', 'mat']\n"
+        with open(f"{td}/output.md") as f1, open(
+            f"{FIXTURE_DIR}/path_directory.md"
+        ) as f2:
+            assert f1.read() == f2.read()
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--database", "missing.db", "top"],
+        ["word", "unicorn"],
+        ["document", "unknown.txt"],
+    ],
+)
+def test_query_failures(args):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(main, ["index", CORPUS, "--jobs", "1"])
+        result = runner.invoke(main, ["query", *args])
+        assert result.exit_code == 1
@@ -0,0 +1,168 @@
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from frequent_interesting_words.discovery import collect, iter_filepaths
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "nested").mkdir()
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "a.txt").write_text("cat on mat.")
+    (tmp_path / "c.md").write_text("dog and bone, dog and bone.")
+    (tmp_path / "b" / "d.txt").write_text("x")
+    (tmp_path / "b" / "nested" / "e.txt").write_text("cat and dog.")
+    (tmp_path / ".git" / "config").write_text("[core]")
+    return tmp_path
+
+
+def relative(root, filepaths):
+    return [os.path.relpath(filepath, root) for filepath in filepaths]
+
+
+def test_file_path(tree):
+    assert list(iter_filepaths(str(tree / "a.txt"))) == [str(tree / "a.txt")]
+
+
+def test_recursive_sorted(tree):
+    assert relative(tree, iter_filepaths(str(tree))) == [
+        ".git/config",
+        "a.txt",
+        "b/d.txt",
+        "b/nested/e.txt",
+        "c.md",
+    ]
+
+
+def test_not_recursive(tree):
+    assert relative(tree, iter_filepaths(str(tree), recursive=False)) == [
+        "a.txt",
+        "c.md",
+    ]
+
+
+def test_include_and_exclude(tree):
+    assert relative(tree, iter_filepaths(str(tree), include=["*.txt"])) == [
+        "a.txt",
+        "b/d.txt",
+        "b/nested/e.txt",
+    ]
+    assert relative(tree, iter_filepaths(str(tree), exclude=[".git", "b/nested"])) == [
+        "a.txt",
+        "b/d.txt",
+        "c.md",
+    ]
+
+
+def test_size_limits(tree):
+    assert relative(tree, iter_filepaths(str(tree), min_size=2, max_size=12)) == [
+        ".git/config",
+        "a.txt",
+        "b/nested/e.txt",
+    ]
+
+
+def test_symlink_policies(tree, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside")
+    (outside / "f.txt").write_text("outside")
+    os.symlink(outside, tree / "linked_dir")
+    os.symlink(tree / "a.txt", tree / "linked.txt")
+    os.symlink(tree, tree / "b" / "loop")
+    os.symlink(tree / "missing.txt", tree / "broken.txt")
+
+    skip = relative(tree, iter_filepaths(str(tree), symlinks="skip"))
+    files = relative(tree, iter_filepaths(str(tree), symlinks="files"))
+    follow = relative(tree, iter_filepaths(str(tree), symlinks="follow"))
+
+    assert "linked.txt" not in skip
+    assert "linked.txt" in files
+    assert "linked_dir/f.txt" not in files
+    assert "linked_dir/f.txt" in follow
+    # the loop back to the root is only walked once
+    assert not any(path.startswith("b/loop") for path in follow)
+    assert "broken.txt" not in follow
+
+
+def test_invalid_symlink_policy(tree):
+    with pytest.raises(ValueError):
+        list(iter_filepaths(str(tree), symlinks="sometimes"))
+
+
+def test_lazy(tree, mocker):
+    spy = mocker.spy(os, "scandir")
+    filepaths = iter_filepaths(str(tree))
+    assert relative(tree, [next(filepaths)]) == [".git/config"]
+    assert spy.call_count == 2
+
+
+def test_collect(tree):
+    seen = []
+    filepaths = collect(iter_filepaths(str(tree), recursive=False), seen)
+    assert seen == []
+    next(filepaths)
+    assert relative(tree, seen) == ["a.txt"]
+    list(filepaths)
+    assert relative(tree, seen) == ["a.txt", "c.md"]
+
+
+@pytest.fixture
+def archives(tree):
+    with zipfile.ZipFile(tree / "b" / "bundle.zip", "w") as bundle:
+        bundle.writestr("f.txt", "cat on mat.")
+        bundle.writestr("drafts/g.txt", "dog and bone.")
+        bundle.writestr("h.md", "x")
+        bundle.writestr("nested.zip", b"")
+    with tarfile.open(tree / "corpus.tar.gz", "w:gz") as corpus:
+        corpus.add(tree / "a.txt", "z.txt")
+        corpus.add(tree / "c.md", "y.md")
+    return tree
+
+
+def test_archive_members(archives):
+    assert relative(archives, iter_filepaths(str(archives), exclude=[".git"])) == [
+        "a.txt",
+        "b/bundle.zip/f.txt",
+        "b/bundle.zip/drafts/g.txt",
+        "b/bundle.zip/h.md",
+        "b/d.txt",
+        "b/nested/e.txt",
+        "c.md",
+        "corpus.tar.gz/z.txt",
+        "corpus.tar.gz/y.md",
+    ]
+    assert list(iter_filepaths(str(archives / "corpus.tar.gz"))) == [
+        str(archives / "corpus.tar.gz" / "z.txt"),
+        str(archives / "corpus.tar.gz" / "y.md"),
+    ]
+
+
+def test_archive_members_filtered(archives):
+    b = archives / "b"
+    assert relative(b, iter_filepaths(str(b), include=["*.txt"])) == [
+        "bundle.zip/f.txt",
+        "bundle.zip/drafts/g.txt",
+        "d.txt",
+        "nested/e.txt",
+    ]
+    assert relative(b, iter_filepaths(str(b), exclude=["drafts", "*.md"])) == [
+        "bundle.zip/f.txt",
+        "d.txt",
+        "nested/e.txt",
+    ]
+    assert relative(b, iter_filepaths(str(b), min_size=2)) == [
+        "bundle.zip/f.txt",
+        "bundle.zip/drafts/g.txt",
+        "nested/e.txt",
+    ]
+    assert relative(b, iter_filepaths(str(b / "bundle.zip"), recursive=False)) == [
+        "bundle.zip/f.txt",
+        "bundle.zip/h.md",
+    ]
+    assert relative(archives, iter_filepaths(str(archives), recursive=False)) == [
+        "a.txt",
+        "c.md",
+    ]
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from frequent_interesting_words.cache import KeywordCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return KeywordCache(str(tmp_path / "cache"))
+
+
+def test_key_depends_on_text_and_params():
+    key = KeywordCache.key("cat on mat", word_limit=10)
+    assert key == KeywordCache.key("cat on mat", word_limit=10)
+    assert key != KeywordCache.key("cat on mat.", word_limit=10)
+    assert key != KeywordCache.key("cat on mat", word_limit=5)
+
+
+def test_missing_entry(cache):
+    assert cache.get(KeywordCache.key("cat on mat")) is None
+
+
+def test_put_and_get_preserves_order(cache):
+    key = KeywordCache.key("cat sat on mat")
+    cache.put(key, {"cat": 2, "sat": 1, "mat": 1})
+    assert list(cache.get(key).items()) == [("cat", 2), ("sat", 1), ("mat", 1)]
+
+
+def test_entries_get_the_umask_mode(cache, file_mode):
+    key = KeywordCache.key("cat on mat")
+    cache.put(key, {"cat": 1})
+    assert os.stat(cache._path(key)).st_mode & 0o777 == file_mode
+
+
+def test_corrupt_entry_is_a_miss(cache):
+    key = KeywordCache.key("cat on mat")
+    cache.put(key, {"cat": 1})
+    with open(cache._path(key), "w") as f:
+        f.write('{"cat": ')
+    assert cache.get(key) is None
+
+
+def test_evict_least_recently_used(cache):
+    keys = [KeywordCache.key(text) for text in ["cat", "dog", "bone"]]
+    for age, key in enumerate(keys):
+        cache.put(key, {"word": 1})
+        os.utime(cache._path(key), (1000 + age, 1000 + age))
+    # reading the oldest entry makes it the most recently used
+    assert cache.get(keys[0]) == {"word": 1}
+
+    cache.max_size = os.path.getsize(cache._path(keys[0])) * 2
+    cache.evict()
+
+    assert cache.get(keys[0]) == {"word": 1}
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) == {"word": 1}
+
+
+def test_evict_empty_cache(cache):
+    cache.evict()
+
+
+def test_key_from_chunks_matches_key():
+    assert KeywordCache.key_from_chunks(
+        ["cat on ", "mat"], word_limit=10
+    ) == KeywordCache.key("cat on mat", word_limit=10)
@@ -0,0 +1,141 @@
+import pytest
+
+from frequent_interesting_words.engines import (
+    DEFAULT_ENGINE,
+    ENGINES,
+    KeywordEngine,
+    TfidfEngine,
+    YakeEngine,
+    get_engine,
+)
+from frequent_interesting_words.pipeline import (
+    build_interesting_word_frequency_dict,
+    build_word_occurance_dict,
+)
+
+
+class ReversedEngine(KeywordEngine):
+    name = "reversed"
+
+    def extract(self, text, word_limit):
+        words = text.replace(".", "").split()
+        return [(word, float(i)) for i, word in enumerate(reversed(words))][:word_limit]
+
+
+@pytest.fixture
+def reversed_engine(monkeypatch):
+    monkeypatch.setitem(ENGINES, ReversedEngine.name, ReversedEngine)
+    return ReversedEngine.name
+
+
+def test_get_engine_default_is_yake():
+    assert isinstance(get_engine(DEFAULT_ENGINE), YakeEngine)
+
+
+def test_get_engine_reused():
+    assert get_engine(DEFAULT_ENGINE) is get_engine("yake")
+
+
+def test_get_engine_unknown():
+    with pytest.raises(ValueError):
+        get_engine("unknown")
+
+
+def test_yake_engine_builds_extractor_once(mocker):
+    extractor = mocker.MagicMock()
+    extractor.extract_keywords.return_value = [("cat", 0.1)]
+    factory = mocker.patch("yake.KeywordExtractor", return_value=extractor)
+    engine = YakeEngine()
+
+    assert engine.extract("cat on mat", 10) == [("cat", 0.1)]
+    assert engine.extract("cat on hat", 10) == [("cat", 0.1)]
+    factory.assert_called_once()
+    assert extractor.extract_keywords.call_count == 2
+
+
+def test_yake_engine_extractor_per_word_limit(mocker):
+    factory = mocker.patch("yake.KeywordExtractor")
+    engine = YakeEngine()
+    engine.extract("cat on mat", 1)
+    engine.extract("cat on mat", 2)
+    engine.extract("cat on mat", 1)
+
+    assert [call.kwargs["top"] for call in factory.call_args_list] == [1, 2]
+
+
+def test_extract_many_matches_extract():
+    engine = YakeEngine()
+    texts = ["cat on mat", "", "dog in fog with dog"]
+
+    assert list(engine.extract_many(texts, 10)) == [
+        engine.extract(text, 10) for text in texts
+    ]
+
+
+def test_extract_many_is_lazy():
+    def texts():
+        yield "cat on mat"
+        raise AssertionError("read too far")
+
+    results = YakeEngine().extract_many(texts(), 10)
+    assert next(results)
+
+
+def test_yake_engine_params():
+    assert YakeEngine(language="de", dedup_limit=0.5).params == {
+        "language": "de",
+        "dedup_limit": 0.5,
+    }
+
+
+def test_build_interesting_word_frequency_dict_with_engine(reversed_engine):
+    assert build_interesting_word_frequency_dict(
+        "cat on mat. dog.", "doc.txt", 2, engine=reversed_engine
+    ) == {"dog": {"doc.txt": 1}, "mat": {"doc.txt": 1}}
+
+
+def test_tfidf_engine_prefers_distinctive_words():
+    engine = TfidfEngine()
+    scores = list(
+        engine.extract_many(["cat dog.", "cat bird.", "cat fish."], word_limit=2)
+    )
+    assert [[word for word, _ in scored] for scored in scores] == [
+        ["dog", "cat"],
+        ["bird", "cat"],
+        ["fish", "cat"],
+    ]
+
+
+def test_tfidf_engine_skips_stopwords_short_words_and_punctuation():
+    assert TfidfEngine().extract("The ox and the cat, 42 cats!", 10) == [
+        ("cat", -0.5),
+        ("cats", -0.5),
+    ]
+
+
+def test_tfidf_engine_empty_texts():
+    assert list(TfidfEngine().extract_many(["", "the"], 10)) == [[], []]
+
+
+def test_tfidf_engine_unlimited():
+    assert len(TfidfEngine().extract("cats dogs birds fish", 0)) == 4
+
+
+def test_tfidf_engine_frequencies_match_word_occurance():
+    texts = [
+        "Cats sat on mats. The cat sat on the mat, cats!",
+        "Dogs chase cats. A dog chased the cat.",
+        "",
+    ]
+    scored = TfidfEngine().score_many(([text] for text in texts), 3)
+    for text, keywords in zip(texts, scored):
+        assert {word: frequency for word, _, frequency in keywords} == dict(
+            build_word_occurance_dict(text, [word for word, _, _ in keywords])
+        )
+
+
+def test_tfidf_engine_pieces_match_whole_text():
+    engine = TfidfEngine()
+    assert engine.score_many([["cat sat. ", "dog sat."]], 10) == engine.score_many(
+        [["cat sat. dog sat."]], 10
+    )
@@ -0,0 +1,52 @@
+import pytest
+from yake.highlight import TextHighlighter
+
+from frequent_interesting_words.highlight import KeywordHighlighter, keyword_highlighter
+
+
+def yake_highlight(text, word):
+    return TextHighlighter(
+        max_ngram_size=1, highlight_pre="**", highlight_post="**"
+    ).highlight(text, [word, f"{word}’s", f"{word}'s", f"{word}`s"])
+
+
+@pytest.mark.parametrize(
+    "text, word",
+    [
+        ("cat on mat.", "cat"),
+        ("  Cat on\nmat with CAT!  ", "cat"),
+        ("cat's on mat, cat`s on mat, cat’s on mat.", "cat"),
+        ('(cat) "cat" cat; cat? cat: cats', "cat"),
+        ("ca-,t and c.at and cat-cat", "cat"),
+        ("concatenate the cat", "cat"),
+        ("cat  on  mat", "cat"),
+        ("a cat.", "a"),
+        ("it’s here, it's there", "it’s"),
+        ("text with  double spaces", ""),
+        ("", "cat"),
+    ],
+)
+def test_highlight_matches_yake(text, word):
+    assert KeywordHighlighter(word).highlight(text) == yake_highlight(text, word)
+
+
+def test_highlight_many():
+    sentences = ["cat on mat.", "no match here.", "Cat!"]
+    assert KeywordHighlighter("cat").highlight_many(sentences) == [
+        "**cat** on mat.",
+        "no match here.",
+        "**Cat**!",
+    ]
+
+
+def test_keyword_highlighter_reused():
+    assert keyword_highlighter("cat") is keyword_highlighter("cat")
+    assert keyword_highlighter("cat") is not keyword_highlighter("mat")
+
+
+def test_remembered_tokens_are_bounded():
+    highlighter = KeywordHighlighter("cat")
+    cache = KeywordHighlighter._highlight_token
+    sentence = " ".join(f"cat{i}" for i in range(cache.cache_info().maxsize + 10))
+    assert highlighter.highlight(sentence) == sentence
+    assert cache.cache_info().currsize == cache.cache_info().maxsize
@@ -0,0 +1,198 @@
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from click.testing import CliRunner
+
+from frequent_interesting_words.cli import main
+from frequent_interesting_words.partials import (
+    PartialReader,
+    PartialSettings,
+    PartialWriter,
+    shard_of,
+)
+from frequent_interesting_words.pipeline import merge_partials, shard_filepaths
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(ROOT_DIR, "fixtures")
+CORPUS = os.path.join(FIXTURE_DIR, "path_directory")
+SETTINGS = PartialSettings(
+    word_limit=50, example_limit=1, engine="yake", tokenizer="nltk"
+)
+
+
+def write_partial(path, documents, shard=None, settings=SETTINGS):
+    with PartialWriter(str(path), settings, shard) as writer:
+        for document in documents:
+            writer.write(*document)
+    return PartialReader(str(path))
+
+
+def map_shard(args):
+    """A node of the cluster, run in its own process"""
+    return CliRunner().invoke(main, ["map", *args]).exit_code
+
+
+def test_partial_round_trip(tmp_path):
+    partial = write_partial(
+        tmp_path / "partial.fiwp",
+        [
+            (
+                3,
+                "doc3",
+                {"cat": 2, "dog": 2, "bone": 1},
+                {"cat": ["cat and dog."], "dog": ["cat and dog."]},
+            ),
+            (5, "doc5", {}, {}),
+        ],
+        shard=(1, 4),
+    )
+    assert partial.settings == SETTINGS
+    assert partial.shard == (1, 4)
+    assert list(partial) == [
+        {
+            "position": 3,
+            "path": "doc3",
+            "words": {"cat": 2, "dog": 2, "bone": 1},
+            "sentences": {"cat": ["cat and dog."], "dog": ["cat and dog."], "bone": []},
+        },
+        {"position": 5, "path": "doc5", "words": {}, "sentences": {}},
+    ]
+
+
+def test_partial_sentences_stored_once(tmp_path):
+    sentence = "the cat and the dog and the bone. " * 100
+    write_partial(
+        tmp_path / "partial.fiwp",
+        [
+            (
+                0,
+                "doc",
+                {"cat": 1, "dog": 1, "bone": 1},
+                dict.fromkeys(["cat", "dog", "bone"], [sentence]),
+            )
+        ],
+    )
+    with gzip.open(tmp_path / "partial.fiwp", "rt") as f:
+        assert f.read().count(sentence) == 1
+
+
+@pytest.mark.parametrize("content", [b"", b"not gzip", gzip.compress(b'{"a": 1}\n')])
+def test_partial_reader_rejects_other_files(tmp_path, content):
+    (tmp_path / "other").write_bytes(content)
+    with pytest.raises(ValueError):
+        PartialReader(str(tmp_path / "other"))
+
+
+def test_shard_of_is_stable():
+    assert shard_of("a/doc1.txt", 4) == shard_of("a/doc1.txt", 4)
+    assert {shard_of(f"doc{i}.txt", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_shard_filepaths_partition_the_corpus():
+    filepaths = [f"/corpus/dir{i % 7}/doc{i}.txt" for i in range(200)]
+    shards = [list(shard_filepaths(filepaths, "/corpus", (i, 3))) for i in range(3)]
+    assert sorted(document for shard in shards for document in shard) == list(
+        enumerate(filepaths)
+    )
+    assert list(shard_filepaths(filepaths[:2])) == [
+        (0, filepaths[0]),
+        (1, filepaths[1]),
+    ]
+
+
+def test_merge_partials_in_corpus_order(tmp_path):
+    partials = [
+        write_partial(
+            tmp_path / "shard1.fiwp",
+            [(1, "doc2", {"cat": 1}, {"cat": ["second cat."]})],
+            shard=(1, 2),
+        ),
+        write_partial(
+            tmp_path / "shard0.fiwp",
+            [
+                (0, "doc1", {"cat": 2, "mat": 1}, {"cat": ["first cat."], "mat": []}),
+                (2, "doc3", {"cat": 1}, {"cat": ["third cat."]}),
+            ],
+            shard=(0, 2),
+        ),
+    ]
+    result, sentences = merge_partials(partials, limit=1)
+    assert result == {"cat": {"doc2": 1, "doc1": 2, "doc3": 1}}
+    assert sentences == {"cat": ["first cat.", "second cat.", "third cat."]}
+
+
+def test_merge_partials_in_given_order(tmp_path):
+    partials = [
+        write_partial(tmp_path / "b.fiwp", [(0, "doc2", {"cat": 1}, {"cat": ["b."]})]),
+        write_partial(tmp_path / "a.fiwp", [(0, "doc1", {"cat": 1}, {"cat": ["a."]})]),
+    ]
+    _, sentences = merge_partials(partials)
+    assert sentences == {"cat": ["b.", "a."]}
+
+
+def test_map_shards_in_processes_and_merge(tmp_path):
+    partials = [str(tmp_path / f"shard{i}.fiwp") for i in range(3)]
+    with ProcessPoolExecutor(max_workers=3) as nodes:
+        exit_codes = nodes.map(
+            map_shard,
+            [
+                [CORPUS, "--shard", f"{i}/3", "--output", partial, "--jobs", "1"]
+                for i, partial in enumerate(partials)
+            ],
+        )
+        assert list(exit_codes) == [0, 0, 0]
+
+    runner = CliRunner()
+    with runner.isolated_filesystem() as td:
+        result = runner.invoke(main, ["merge", *reversed(partials)])
+        assert result.exit_code == 0
+        assert result.output == "['cat', 'dog', 'bone', 'mat']\n"
+        with open(f"{td}/output.md") as f1, open(
+            f"{FIXTURE_DIR}/path_directory.md"
+        ) as f2:
+            assert f1.read() == f2.read()
+
+
+def test_map_files_from(tmp_path):
+    listing = tmp_path / "files.txt"
+    listing.write_text("".join(os.path.join(CORPUS, f"doc{i}.txt\n") for i in (3, 1)))
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        ["map", "--files-from", str(listing), "--output", str(tmp_path / "p.fiwp")],
+    )
+    assert result.exit_code == 0
+    assert [
+        document["path"] for document in PartialReader(str(tmp_path / "p.fiwp"))
+    ] == [
+        os.path.join(CORPUS, "doc3.txt"),
+        os.path.join(CORPUS, "doc1.txt"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        [],
+        [CORPUS, "--files-from", "-"],
+        [CORPUS, "--shard", "2/2"],
+        [CORPUS, "--shard", "half"],
+        [CORPUS, "--engine", "tfidf"],
+    ],
+)
+def test_map_bad_usage(args):
+    assert CliRunner().invoke(main, ["map", *args]).exit_code == 2
+
+
+def test_merge_refuses_mismatched_settings(tmp_path):
+    write_partial(tmp_path / "a.fiwp", [])
+    write_partial(
+        tmp_path / "b.fiwp", [], settings=PartialSettings(SETTINGS, word_limit=10)
+    )
+    result = CliRunner().invoke(
+        main, ["merge", str(tmp_path / "a.fiwp"), str(tmp_path / "b.fiwp")]
+    )
+    assert result.exit_code == 2
+    assert "word_limit" in result.output
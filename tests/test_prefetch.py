@@ -0,0 +1,152 @@
+import asyncio
+import threading
+
+import pytest
+
+import frequent_interesting_words.prefetch as prefetch_module
+from frequent_interesting_words.prefetch import (
+    DocumentTexts,
+    Prefetcher,
+    _ByteBudget,
+    prefetch_documents,
+)
+
+
+@pytest.fixture
+def documents(tmp_path):
+    filepaths = []
+    for i in range(10):
+        filepath = tmp_path / f"{i}.txt"
+        filepath.write_text(f"Document {i} " * (i + 1))
+        filepaths.append(str(filepath))
+    return filepaths
+
+
+def read(filepath):
+    with open(filepath) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("readers", [0, 1, 4])
+def test_prefetch_documents_order(documents, readers):
+    result = list(prefetch_documents(documents, readers))
+    assert [filepath for filepath, _ in result] == documents
+    if readers:
+        assert [text for _, text in result] == [read(fp) for fp in documents]
+    else:
+        assert all(text is None for _, text in result)
+
+
+def test_prefetch_documents_consumes_lazily(documents):
+    taken = []
+
+    def filepaths():
+        for filepath in documents:
+            taken.append(filepath)
+            yield filepath
+
+    iterator = prefetch_documents(filepaths(), readers=2)
+    next(iterator)
+    # the first document, two queued and one waiting for space in the queue
+    assert len(taken) <= 4
+    iterator.close()
+
+
+def test_byte_budget():
+    async def run():
+        budget = _ByteBudget(10)
+        assert await budget.acquire(6) == 6
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(budget.acquire(6), 0.01)
+        await budget.release(6)
+        # a request larger than the budget waits for all of it
+        assert await budget.acquire(20) == 10
+        assert budget.available == 0
+
+    asyncio.run(run())
+
+
+def test_prefetch_documents_byte_budget(tmp_path, mocker):
+    filepaths = []
+    for i in range(10):
+        filepath = tmp_path / f"{i}.txt"
+        filepath.write_text("x" * 100)
+        filepaths.append(str(filepath))
+    in_flight = []
+    lock = threading.Lock()
+    peak = [0]
+    read_text = prefetch_module.read_text
+
+    def tracked_read(filepath):
+        with lock:
+            in_flight.append(filepath)
+            peak[0] = max(peak[0], len(in_flight))
+        return read_text(filepath)
+
+    mocker.patch.object(prefetch_module, "read_text", side_effect=tracked_read)
+    for filepath, text in prefetch_documents(filepaths, readers=4, max_bytes=100):
+        assert text == "x" * 100
+        with lock:
+            in_flight.remove(filepath)
+    # one document within the budget, the next may start as the caller takes it
+    assert peak[0] <= 2
+
+
+def test_prefetch_documents_larger_than_budget(documents):
+    result = list(prefetch_documents(documents, readers=2, max_bytes=1))
+    assert [text for _, text in result] == [read(fp) for fp in documents]
+
+
+def test_prefetch_documents_max_size(documents):
+    max_size = len(read(documents[4]))
+    for filepath, text in prefetch_documents(documents, 2, max_size=max_size):
+        if len(read(filepath)) > max_size:
+            assert text is None
+        else:
+            assert text == read(filepath)
+
+
+def test_prefetch_documents_keep_and_reuse(documents, mocker):
+    budget = sum(len(read(fp)) for fp in documents[:3])
+    texts = DocumentTexts(budget)
+    list(prefetch_documents(documents, 2, keep=texts))
+    assert [fp in texts for fp in documents] == [True] * 3 + [False] * 7
+
+    spy = mocker.spy(prefetch_module, "read_text")
+    result = list(prefetch_documents(documents, 2, reuse=texts))
+    assert [text for _, text in result] == [read(fp) for fp in documents]
+    assert sorted(call.args[0] for call in spy.call_args_list) == sorted(documents[3:])
+    assert texts.size == 0
+
+
+def test_prefetch_documents_reuse_without_readers(documents):
+    texts = DocumentTexts(100)
+    texts.add(documents[0], "kept")
+    result = list(prefetch_documents(documents[:2], 0, reuse=texts))
+    assert result == [(documents[0], "kept"), (documents[1], None)]
+
+
+def test_prefetch_documents_missing_file(documents):
+    with pytest.raises(FileNotFoundError):
+        list(prefetch_documents([documents[0], "/cannot/exist"], 2))
+
+
+def test_document_texts():
+    texts = DocumentTexts(10)
+    assert texts.add("a", "12345")
+    assert not texts.add("a", "12345")
+    assert not texts.add("b", "123456")
+    assert texts.add("c", "12345")
+    assert texts.size == 10
+    assert texts.pop("a") == "12345"
+    assert texts.pop("a") is None
+    assert texts.size == 5
+
+
+def test_prefetcher(documents):
+    prefetcher = Prefetcher(readers=2, reuse_bytes=2**20)
+    list(prefetcher.documents(documents, keep=True))
+    assert all(fp in prefetcher.texts for fp in documents)
+    assert list(prefetcher.documents(documents, reuse=True)) == [
+        (fp, read(fp)) for fp in documents
+    ]
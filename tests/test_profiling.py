@@ -0,0 +1,120 @@
+import time
+
+import pytest
+
+from frequent_interesting_words import profiling
+from frequent_interesting_words.profiling import Profiler
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler(slowest=2)
+    profiler.start()
+    yield profiler
+    if profiling.active():
+        profiler.stop()
+
+
+def test_stage_off_is_a_no_op():
+    assert not profiling.active()
+    with profiling.stage("read") as timer:
+        timer.add(documents=1, nbytes=10)
+    assert profiling.stage("read") is profiling.stage("count")
+
+
+def test_stage_excludes_nested_stages(profiler):
+    with profiling.stage("outer", documents=1):
+        time.sleep(0.02)
+        with profiling.stage("inner") as timer:
+            time.sleep(0.05)
+            timer.add(nbytes=100)
+    profiler.stop()
+
+    outer, inner = profiler.stages["outer"], profiler.stages["inner"]
+    assert 0.02 <= outer["wall_seconds"] < 0.05
+    assert inner["wall_seconds"] >= 0.05
+    assert (outer["calls"], outer["documents"], outer["bytes"]) == (1, 1, 0)
+    assert (inner["calls"], inner["documents"], inner["bytes"]) == (1, 0, 100)
+
+
+def test_stage_peak_memory(profiler):
+    with profiling.stage("allocate"):
+        data = bytearray(2**20)
+    del data
+    profiler.stop()
+    assert profiler.stages["allocate"]["peak_memory"] >= 2**20
+
+
+def test_stages_accumulate_across_calls(profiler):
+    for _ in range(3):
+        with profiling.stage("count", documents=2):
+            pass
+    assert profiler.stages["count"]["calls"] == 3
+    assert profiler.stages["count"]["documents"] == 6
+
+
+def test_slowest_documents(profiler, tmp_path):
+    for name, seconds in [("a", 0.0), ("b", 0.03), ("c", 0.01)]:
+        path = tmp_path / name
+        path.write_text("x" * 10)
+        with profiling.document(str(path)):
+            time.sleep(seconds)
+
+    documents = profiler.snapshot()["documents"]
+    assert [timing["path"] for timing in documents] == [
+        str(tmp_path / "b"),
+        str(tmp_path / "c"),
+    ]
+    assert documents[0]["bytes"] == 10
+
+
+def test_merge(profiler):
+    other = Profiler(slowest=1)
+    other._record_document(profiling.DocumentTiming(path="x", seconds=1.0, bytes=1))
+    other._record(
+        "count",
+        profiling.StageMetrics(
+            wall_seconds=1.0,
+            cpu_seconds=0.5,
+            calls=1,
+            documents=1,
+            bytes=0,
+            peak_memory=10,
+        ),
+    )
+    with profiling.stage("count"):
+        pass
+
+    profiler.merge(other.snapshot())
+    profiler.stop()
+
+    assert profiler.stages["count"]["calls"] == 2
+    assert profiler.stages["count"]["wall_seconds"] >= 1.0
+    assert profiler.stages["count"]["peak_memory"] >= 10
+    assert profiler.snapshot()["documents"][0]["path"] == "x"
+    assert "count" in profiler.summary()
+
+
+def test_timed_iter(profiler):
+    assert list(profiling.timed_iter("discovery", iter("abc"))) == ["a", "b", "c"]
+    assert profiler.stages["discovery"]["documents"] == 3
+    assert profiler.stages["discovery"]["calls"] == 4
+
+
+def test_timed_iter_off():
+    items = ["a", "b"]
+    assert list(profiling.timed_iter("discovery", items)) == items
+
+
+def _profiled_square(x):
+    with profiling.stage("square"):
+        return x * x
+
+
+def test_profiled_map_merges_snapshots(profiler):
+    assert profiling.profiled_map(map) is map
+    mapper = profiling.profiled_map(lambda fn, *iterables: map(fn, *iterables))
+
+    assert list(mapper(_profiled_square, [1, 2, 3])) == [1, 4, 9]
+    assert profiling.active()
+    assert profiler.stages["square"]["calls"] == 3
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import nltk
+
+from frequent_interesting_words import resources
+
+
+def test_stopwords():
+    stopwords = resources.stopwords()
+    assert isinstance(stopwords, frozenset)
+    assert stopwords == frozenset(nltk.corpus.stopwords.words("english"))
+    assert resources.stopwords() is stopwords
+
+
+def test_tokenizers_loaded_once():
+    assert resources.punkt_tokenizer() is resources.punkt_tokenizer()
+    assert resources.word_tokenizer() is resources.word_tokenizer()
+
+
+def test_sent_tokenize_matches_nltk():
+    text = "Mr. Smith sat on the mat. The cat didn't! Did it? Yes, e.g. twice."
+    assert resources.sent_tokenize(text) == nltk.tokenize.sent_tokenize(text)
+
+
+def test_cli_import_defers_heavy_dependencies():
+    heavy = ["nltk", "numpy", "yake", "pytablewriter", "pyarrow"]
+    # nor the processing modules, so --help starts quickly
+    heavy += [
+        "frequent_interesting_words.pipeline",
+        "asyncio",
+        "http.server",
+        "sqlite3",
+    ]
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, frequent_interesting_words.cli; "
+            f"print(' '.join(m for m in {heavy!r} if m in sys.modules))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    assert loaded == []
@@ -0,0 +1,258 @@
+import http.client
+import json
+import os
+import socket
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+from frequent_interesting_words import Analyzer
+from frequent_interesting_words.cli import main
+from frequent_interesting_words.server import make_server
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(ROOT_DIR, "fixtures")
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**kwargs):
+        server = make_server(Analyzer(), port=0, quiet=True, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def client(serve):
+    def connect(**kwargs):
+        server = serve(**kwargs)
+        return http.client.HTTPConnection(*server.server_address)
+
+    return connect
+
+
+def request(connection, method, path, body=None):
+    connection.request(
+        method, path, body=None if body is None else json.dumps(body).encode("utf-8")
+    )
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_server_documents_and_queries(client):
+    connection = client()
+    assert request(connection, "GET", "/health") == (200, {"status": "ok"})
+
+    status, body = request(
+        connection,
+        "POST",
+        "/documents",
+        [
+            {"name": "doc1", "text": "cat on mat."},
+            {"text": "cat and dog. dog and cat."},
+        ],
+    )
+    assert status == 200
+    assert body == {
+        "documents": [
+            {"name": "doc1", "words": {"cat": 1, "mat": 1}},
+            {"name": "document-1", "words": {"cat": 2, "dog": 2}},
+        ]
+    }
+
+    assert request(connection, "GET", "/top?k=2") == (
+        200,
+        {"words": [{"word": "cat", "frequency": 3}, {"word": "dog", "frequency": 2}]},
+    )
+    assert request(connection, "GET", "/sentences?word=Cat") == (
+        200,
+        {"word": "cat", "sentences": ["cat on mat.", "cat and dog."]},
+    )
+    assert request(connection, "GET", "/documents") == (
+        200,
+        {"documents": ["doc1", "document-1"]},
+    )
+
+
+def test_server_document_posted_again(client):
+    connection = client()
+    request(connection, "POST", "/documents", {"name": "doc", "text": "zebra. zebra."})
+    request(connection, "POST", "/documents", {"name": "doc", "text": "cat on mat."})
+    assert request(connection, "GET", "/top?k=1") == (
+        200,
+        {"words": [{"word": "cat", "frequency": 1}]},
+    )
+
+
+def test_server_documents_by_path(client):
+    connection = client(root=FIXTURE_DIR)
+    status, body = request(connection, "POST", "/documents", {"path": "path_directory"})
+    assert status == 200
+    assert [document["name"] for document in body["documents"]] == [
+        os.path.join(FIXTURE_DIR, "path_directory", f"doc{i}.txt") for i in (1, 2, 3)
+    ]
+    status, body = request(connection, "GET", "/top?k=4")
+    assert [word["word"] for word in body["words"]] == ["cat", "dog", "bone", "mat"]
+
+    status, _ = request(connection, "POST", "/documents", {"path": "../"})
+    assert status == 403
+    status, _ = request(connection, "POST", "/documents", {"path": "missing.txt"})
+    assert status == 404
+
+
+def test_server_documents_by_path_stay_in_root(client, tmp_path):
+    (tmp_path / "outside").mkdir()
+    (tmp_path / "outside" / "secret.txt").write_text(
+        "The secret password is swordfish."
+    )
+    root = tmp_path / "root"
+    (root / "docs").mkdir(parents=True)
+    (root / "docs" / "doc.txt").write_text("cat on mat.")
+    (root / "docs" / "link.txt").symlink_to(tmp_path / "outside" / "secret.txt")
+    (root / "docs" / "inner.txt").symlink_to(root / "docs" / "doc.txt")
+    connection = client(root=str(root))
+
+    assert (
+        request(connection, "POST", "/documents", {"path": "docs/link.txt"})[0] == 403
+    )
+    status, body = request(connection, "POST", "/documents", {"path": "."})
+    assert status == 200
+    assert [document["name"] for document in body["documents"]] == [
+        str(root / "docs" / "doc.txt"),
+        str(root / "docs" / "inner.txt"),
+    ]
+    assert request(connection, "GET", "/sentences?word=password") == (
+        200,
+        {"word": "password", "sentences": []},
+    )
+
+
+def test_server_documents_by_path_needs_root(client):
+    status, body = request(client(), "POST", "/documents", {"path": FIXTURE_DIR})
+    assert status == 403
+    assert "--root" in body["error"]
+
+
+@pytest.mark.parametrize(
+    "method, path, body, status",
+    [
+        ("GET", "/unknown", None, 404),
+        ("GET", "/top?k=many", None, 400),
+        ("GET", "/sentences", None, 400),
+        ("POST", "/documents", {"name": "doc1"}, 400),
+        ("POST", "/documents", {"text": 3}, 400),
+        ("POST", "/documents", ["text"], 400),
+    ],
+)
+def test_server_bad_requests(client, method, path, body, status):
+    assert request(client(), method, path, body)[0] == status
+
+
+def test_server_invalid_json(client):
+    connection = client()
+    connection.request("POST", "/documents", body=b"{not json")
+    response = connection.getresponse()
+    assert response.status == 400
+    assert "JSON" in json.loads(response.read())["error"]
+
+
+@pytest.mark.parametrize("length", ["-5", "many"])
+def test_server_invalid_content_length(client, length):
+    connection = client()
+    connection.putrequest("POST", "/documents")
+    connection.putheader("Content-Length", length)
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == 400
+    assert "Content-Length" in json.loads(response.read())["error"]
+
+
+def test_server_internal_error(client, tmp_path):
+    (tmp_path / "doc.txt").write_text("cat on mat.")
+    connection = client(root=str(tmp_path))
+    assert request(connection, "POST", "/documents", {"path": "doc.txt"})[0] == 200
+    (tmp_path / "doc.txt").unlink()
+    status, body = request(connection, "GET", "/sentences?word=cat")
+    assert status == 500
+    assert body["error"].startswith("FileNotFoundError")
+    assert request(connection, "GET", "/health") == (200, {"status": "ok"})
+
+
+def test_server_concurrent_clients(serve):
+    server = serve()
+
+    def post(i):
+        connection = http.client.HTTPConnection(*server.server_address)
+        for j in range(5):
+            request(
+                connection,
+                "POST",
+                "/documents",
+                {"name": f"doc{i}-{j}", "text": "cat on mat."},
+            )
+
+    threads = [threading.Thread(target=post, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.analyzer.top_words() == [("cat", 20), ("mat", 20)]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_server_unix_socket(serve, tmp_path):
+    socket_path = str(tmp_path / "fiw.sock")
+    serve(socket_path=socket_path)
+
+    class UnixConnection(http.client.HTTPConnection):
+        def connect(self):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(socket_path)
+
+    connection = UnixConnection("localhost")
+    request(connection, "POST", "/documents", {"text": "cat on mat."})
+    assert request(connection, "GET", "/top?k=1") == (
+        200,
+        {"words": [{"word": "cat", "frequency": 1}]},
+    )
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_server_unix_socket_keeps_other_files(tmp_path):
+    (tmp_path / "notes.txt").write_text("keep me")
+    with pytest.raises(ValueError, match="not a socket"):
+        make_server(Analyzer(), socket_path=str(tmp_path / "notes.txt"))
+    assert (tmp_path / "notes.txt").read_text() == "keep me"
+
+    # a socket left behind by an earlier server is replaced
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(tmp_path / "fiw.sock"))
+    stale.close()
+    make_server(Analyzer(), socket_path=str(tmp_path / "fiw.sock")).server_close()
+
+
+def test_serve_command(mocker):
+    server = mocker.Mock(server_address=("127.0.0.1", 8765))
+    server.serve_forever.side_effect = KeyboardInterrupt
+    make_server = mocker.patch(
+        "frequent_interesting_words.server.make_server", return_value=server
+    )
+    result = CliRunner().invoke(main, ["serve", "--no-cache", "--quiet"])
+    assert result.exit_code == 0
+    assert "Serving on http://127.0.0.1:8765" in result.output
+    assert make_server.call_args.args[1:] == ("127.0.0.1", 8765, None, None, True)
+    server.server_close.assert_called_once()
+
+
+def test_serve_command_corpus_level_engine():
+    result = CliRunner().invoke(main, ["serve", "--engine", "tfidf"])
+    assert result.exit_code == 2
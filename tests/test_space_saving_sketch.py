@@ -0,0 +1,72 @@
+import random
+from collections import Counter
+
+import pytest
+
+from frequent_interesting_words.aggregation import SpaceSavingSketch
+
+
+def zipf_stream(seed=0, length=20_000, vocabulary=2_000):
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    return rng.choices([f"word{i}" for i in range(vocabulary)], weights, k=length)
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        SpaceSavingSketch(0)
+
+
+def test_exact_while_under_capacity():
+    sketch = SpaceSavingSketch(10)
+    sketch.add_words({"cat": {"doc1": 2, "doc2": 1}, "mat": {"doc1": 1}})
+    sketch.add("cat")
+    assert sketch.counts == {"cat": 4, "mat": 1}
+    assert sketch.error_bound == 0
+    assert sketch.total == 5
+    assert sketch.candidates(1) == {"cat"}
+    assert sketch.candidates(5) == {"cat", "mat"}
+
+
+def test_eviction_inherits_minimum():
+    sketch = SpaceSavingSketch(2)
+    sketch.add("cat", 3)
+    sketch.add("mat", 1)
+    sketch.add("dog", 2)
+    assert sketch.counts == {"cat": 3, "dog": 3}
+    assert sketch.errors == {"cat": 0, "dog": 1}
+    assert sketch.error_bound == 3
+
+
+def test_memory_is_bounded():
+    sketch = SpaceSavingSketch(50)
+    for word in zipf_stream():
+        sketch.add(word)
+    assert len(sketch.counts) == 50
+    assert len(sketch._heap) <= 4 * 50
+
+
+def test_error_bounds_hold():
+    stream = zipf_stream()
+    exact = Counter(stream)
+    sketch = SpaceSavingSketch(100)
+    for word in stream:
+        sketch.add(word)
+
+    assert sketch.error_bound <= len(stream) / 100
+    for word, count in sketch.counts.items():
+        assert exact[word] <= count <= exact[word] + sketch.errors[word]
+    for word, count in exact.items():
+        if count > sketch.error_bound:
+            assert word in sketch.counts
+
+
+def test_candidates_contain_true_top_k():
+    stream = zipf_stream(seed=1)
+    exact = Counter(stream)
+    sketch = SpaceSavingSketch(100)
+    for word in stream:
+        sketch.add(word)
+
+    top = {word for word, _ in exact.most_common(10)}
+    assert top <= sketch.candidates(10)
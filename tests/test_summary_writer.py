@@ -0,0 +1,125 @@
+import csv
+import json
+
+import pytest
+
+from frequent_interesting_words.output import (
+    CsvSummaryWriter,
+    JsonLinesSummaryWriter,
+    MarkdownSummaryWriter,
+    output_format_for,
+    summary_writer,
+)
+from frequent_interesting_words.pipeline import format_output_table, iter_summary_rows
+
+WORDS_WITH_FREQUENCY = {
+    "word": {"/welp/doc2.txt": 3, "/welp/doc1.txt": 1},
+    "word2": {"/welp/doc1.txt": 1},
+}
+SENTENCES = {
+    "word": ["A terrible word.", "The power of a word."],
+    "word2": ["Oh word2, so silly!"],
+}
+
+
+def write(writer_class, target):
+    with writer_class(str(target)) as writer:
+        for row in iter_summary_rows(WORDS_WITH_FREQUENCY, SENTENCES):
+            writer.write(row)
+
+
+def test_iter_summary_rows():
+    assert list(iter_summary_rows(WORDS_WITH_FREQUENCY, SENTENCES)) == [
+        {
+            "word": "word",
+            "frequency": 4,
+            "documents": ["/welp/doc1.txt", "/welp/doc2.txt"],
+            "sentences": ["A terrible word.", "The power of a word."],
+        },
+        {
+            "word": "word2",
+            "frequency": 1,
+            "documents": ["/welp/doc1.txt"],
+            "sentences": ["Oh word2, so silly!"],
+        },
+    ]
+
+
+def test_iter_summary_rows_empty_parameters():
+    with pytest.raises(ValueError):
+        iter_summary_rows({}, {})
+
+
+def test_markdown_writer_matches_table(tmp_path):
+    write(MarkdownSummaryWriter, tmp_path / "output.md")
+    assert (tmp_path / "output.md").read_text() == format_output_table(
+        WORDS_WITH_FREQUENCY, SENTENCES
+    ).dumps()
+
+
+def test_json_lines_writer(tmp_path):
+    write(JsonLinesSummaryWriter, tmp_path / "output.jsonl")
+    with open(tmp_path / "output.jsonl") as f:
+        rows = [json.loads(line) for line in f]
+    assert rows == list(iter_summary_rows(WORDS_WITH_FREQUENCY, SENTENCES))
+
+
+def test_json_lines_writer_streams(tmp_path):
+    target = tmp_path / "output.jsonl"
+    with JsonLinesSummaryWriter(str(target)) as writer:
+        rows = iter_summary_rows(WORDS_WITH_FREQUENCY, SENTENCES)
+        writer.write(next(rows))
+        writer._file.flush()
+        assert len(target.read_text().splitlines()) == 1
+
+
+def test_csv_writer(tmp_path):
+    write(CsvSummaryWriter, tmp_path / "output.csv")
+    with open(tmp_path / "output.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [
+        ["word", "frequency", "documents", "sentences"],
+        [
+            "word",
+            "4",
+            "/welp/doc1.txt\n/welp/doc2.txt",
+            "A terrible word.\nThe power of a word.",
+        ],
+        ["word2", "1", "/welp/doc1.txt", "Oh word2, so silly!"],
+    ]
+
+
+def test_parquet_writer(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    target = tmp_path / "output.parquet"
+    with summary_writer(str(target)) as writer:
+        for row in iter_summary_rows(WORDS_WITH_FREQUENCY, SENTENCES):
+            writer.write(row)
+    assert parquet.read_table(target).to_pylist() == list(
+        iter_summary_rows(WORDS_WITH_FREQUENCY, SENTENCES)
+    )
+
+
+@pytest.mark.parametrize(
+    "target, output_format",
+    [
+        ("output.md", "markdown"),
+        ("output.JSONL", "jsonl"),
+        ("out/put.csv", "csv"),
+        ("output.parquet", "parquet"),
+        ("output.txt", "markdown"),
+        ("output", "markdown"),
+    ],
+)
+def test_output_format_for(target, output_format):
+    assert output_format_for(target) == output_format
+
+
+def test_summary_writer_explicit_format(tmp_path):
+    with summary_writer(str(tmp_path / "output.md"), "jsonl") as writer:
+        assert isinstance(writer, JsonLinesSummaryWriter)
+
+
+def test_summary_writer_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        summary_writer(str(tmp_path / "output.md"), "xml")
@@ -0,0 +1,75 @@
+import pytest
+
+from frequent_interesting_words.counting import TokenCounter, token_counter
+
+
+@pytest.fixture
+def counter():
+    return TokenCounter(["on", "the"])
+
+
+def test_count(counter):
+    assert counter.count(["cat", "on", "cat", "on", "mat"], ["cat", "mat"]) == {
+        "cat": 2,
+        "mat": 1,
+    }
+
+
+def test_count_case_insensitive(counter):
+    assert counter.count(["Cat", "on", "cat", "MAT"], ["CAT", "mat"]) == {
+        "cat": 2,
+        "mat": 1,
+    }
+
+
+def test_count_stopwords_case_sensitive(counter):
+    assert counter.count(["the", "The", "on"], ["the", "on"]) == {"the": 1}
+
+
+def test_count_missing_words(counter):
+    assert counter.count(["cat"], ["dog", "cat"]) == {"cat": 1}
+    assert counter.count([], ["cat"]) == {}
+    assert counter.count(["cat"], []) == {}
+
+
+def test_count_keeps_word_order(counter):
+    assert list(counter.count(["mat", "cat", "bat"], ["cat", "bat", "mat"])) == [
+        "cat",
+        "bat",
+        "mat",
+    ]
+
+
+def test_count_repeated_words(counter):
+    assert counter.count(["cat", "cat"], ["cat", "Cat"]) == {"cat": 2}
+
+
+def test_vocabulary_shared_between_documents(counter):
+    counter.count(["Cat", "mat"], [])
+    size = len(counter)
+    assert counter.count(["cat", "mat", "mat"], ["mat"]) == {"mat": 2}
+    assert len(counter) == size
+
+
+def test_token_ids_grow_past_capacity(counter):
+    tokens = [f"word{i}" for i in range(5000)]
+    ids = counter.token_ids(tokens)
+    assert len(set(ids.tolist())) == 5000
+    assert counter.count(tokens + ["WORD4999"], ["word4999", "word0"]) == {
+        "word4999": 2,
+        "word0": 1,
+    }
+
+
+def test_token_counter_reused():
+    assert token_counter() is token_counter()
+    assert "the" in token_counter().stopwords
+
+
+def test_vocabulary_rebuilt_past_limit():
+    counter = TokenCounter(["on"], max_vocabulary=100)
+    tokens = [f"word{i}" for i in range(150)]
+    assert counter.count(tokens, ["word0"]) == {"word0": 1}
+    assert len(counter) == 150
+    assert counter.count(["Cat", "on", "cat"], ["cat", "word0"]) == {"cat": 2}
+    assert len(counter) == 3
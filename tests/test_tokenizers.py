@@ -0,0 +1,112 @@
+import io
+
+import pytest
+
+from frequent_interesting_words.chunking import iter_text_windows
+from frequent_interesting_words.document import DocumentAnalysis, iter_sentences
+from frequent_interesting_words.pipeline import (
+    build_word_occurance_dict,
+    extract_sample_sentences_for_keywords,
+)
+from frequent_interesting_words.tokenizers import (
+    DEFAULT_TOKENIZER,
+    TOKENIZERS,
+    FastTokenizer,
+    get_tokenizer,
+)
+
+TEXT = "Cat on mat. Dog loves bone! Cat and dog? Mat for a cat."
+
+
+@pytest.mark.parametrize(
+    "text, sentences",
+    [
+        ("", []),
+        ("  \n ", []),
+        ("no full stop", ["no full stop"]),
+        (TEXT, ["Cat on mat.", "Dog loves bone!", "Cat and dog?", "Mat for a cat."]),
+        ("  Cat on mat.\n\nDog.  ", ["Cat on mat.", "Dog."]),
+        (
+            "Mr. Smith met Dr. Jones. They sat.",
+            ["Mr. Smith met Dr. Jones.", "They sat."],
+        ),
+        (
+            "J. R. Hartley wrote it. Fly fishing.",
+            ["J. R. Hartley wrote it.", "Fly fishing."],
+        ),
+        (
+            "Cats (e.g. Tom) sat. The U.S. Senate met.",
+            ["Cats (e.g. Tom) sat.", "The U.S. Senate met."],
+        ),
+        (
+            'He said "Stop." Then left...  Why?!',
+            ['He said "Stop."', "Then left...", "Why?!"],
+        ),
+        ("Version 3.14 shipped. It works.", ["Version 3.14 shipped.", "It works."]),
+        ("Kenya's. Next", ["Kenya's.", "Next"]),
+    ],
+)
+def test_fast_sentences(text, sentences):
+    assert FastTokenizer().sent_tokenize(text) == sentences
+
+
+def test_fast_spans_index_the_text():
+    text = "  Cat on mat.\n Dog loves bone.  "
+    spans = list(FastTokenizer().span_tokenize(text))
+    assert [text[start:end] for start, end in spans] == [
+        "Cat on mat.",
+        "Dog loves bone.",
+    ]
+
+
+@pytest.mark.parametrize(
+    "sentence, tokens",
+    [
+        ("Cat on mat.", ["Cat", "on", "mat", "."]),
+        (
+            "A well-known cat, 3.5 kg!",
+            ["A", "well-known", "cat", ",", "3.5", "kg", "!"],
+        ),
+        (
+            "The cat's mat isn't here",
+            ["The", "cat", "'", "s", "mat", "isn", "'", "t", "here"],
+        ),
+        ('"Cat" (mat)', ['"', "Cat", '"', "(", "mat", ")"]),
+    ],
+)
+def test_fast_word_tokens(sentence, tokens):
+    assert FastTokenizer().word_tokenize(sentence) == tokens
+
+
+def test_get_tokenizer():
+    assert DEFAULT_TOKENIZER in TOKENIZERS
+    assert get_tokenizer("fast") is get_tokenizer("fast")
+    with pytest.raises(ValueError):
+        get_tokenizer("missing")
+
+
+def test_document_analysis_with_fast_tokenizer():
+    document = DocumentAnalysis(TEXT, "fast")
+    assert len(document.sentences) == 4
+    assert document.sentence_lower_tokens(1) == ["dog", "loves", "bone", "!"]
+    assert list(iter_sentences(TEXT, "fast")) == list(iter_sentences(document))
+
+
+@pytest.mark.parametrize("tokenizer", list(TOKENIZERS))
+def test_tokenizers_agree_on_simple_text(tokenizer):
+    assert build_word_occurance_dict(TEXT, ["cat", "dog", "mat"], tokenizer) == {
+        "cat": 3,
+        "dog": 2,
+        "mat": 2,
+    }
+    assert extract_sample_sentences_for_keywords(
+        ["bone"], TEXT, tokenizer=tokenizer
+    ) == {"bone": ["Dog loves bone!"]}
+
+
+def test_fast_windows_are_sentence_aligned():
+    windows = list(iter_text_windows(io.StringIO(TEXT), 20, "fast"))
+    assert "".join(windows) == TEXT
+    assert len(windows) > 1
+    for window in windows[:-1]:
+        assert window.rstrip()[-1] in ".!?"
@@ -0,0 +1,196 @@
+import random
+from functools import total_ordering
+
+import pytest
+
+import frequent_interesting_words.aggregation as aggregation_module
+import frequent_interesting_words.pipeline as pipeline_module
+from frequent_interesting_words.aggregation import (
+    WordFrequencyAggregator,
+    frequency_order,
+)
+from frequent_interesting_words.pipeline import (
+    aggregate_words_with_frequency,
+    flatten_and_sort_words_with_frequency,
+)
+
+LARGE_VOCABULARY = 10**6
+
+
+@pytest.fixture
+def aggregator():
+    aggregator = WordFrequencyAggregator()
+    aggregator.add({"cat": {"doc1": 2}, "mat": {"doc1": 1}, "sat": {"doc1": 1}})
+    aggregator.add({"cat": {"doc2": 1}, "dog": {"doc2": 3}})
+    return aggregator
+
+
+def random_collection(vocabulary_size, documents, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            f"word{rng.randrange(vocabulary_size)}": {f"doc{d}": rng.randint(1, 5)}
+            for _ in range(vocabulary_size // documents)
+        }
+        for d in range(documents)
+    ]
+
+
+def test_running_totals(aggregator):
+    assert aggregator.totals == {"cat": 3, "mat": 1, "sat": 1, "dog": 3}
+
+
+def test_duplicate_document_replaces_total(aggregator):
+    aggregator.add({"cat": {"doc1": 5}})
+    assert aggregator.totals["cat"] == 6
+    assert aggregator.words["cat"] == {"doc1": 5, "doc2": 1}
+
+
+def test_remove_document(aggregator):
+    aggregator.add({"cat": {"doc3": 4}, "owl": {"doc3": 1}})
+    aggregator.remove("doc1")
+    assert aggregator.words == {
+        "cat": {"doc2": 1, "doc3": 4},
+        "dog": {"doc2": 3},
+        "owl": {"doc3": 1},
+    }
+    assert aggregator.totals == {"cat": 5, "dog": 3, "owl": 1}
+    aggregator.remove("doc3", ["cat", "owl", "unseen"])
+    assert aggregator.totals == {"cat": 1, "dog": 3}
+    aggregator.remove("unknown")
+    aggregator.add({"mat": {"doc1": 2}})
+    assert aggregator.top(2) == [("dog", 3), ("mat", 2)]
+
+
+def test_top_ties_broken_alphabetically(aggregator):
+    assert aggregator.top(3) == [("cat", 3), ("dog", 3), ("mat", 1)]
+    assert aggregator.top(10) == flatten_and_sort_words_with_frequency(aggregator.words)
+
+
+def test_result_keeps_first_seen_order(aggregator):
+    assert list(aggregator.result(3)) == ["cat", "mat", "dog"]
+    assert aggregator.result() is aggregator.words
+
+
+def test_matches_full_sort():
+    collection = random_collection(10_000, 20)
+    aggregator = WordFrequencyAggregator()
+    for words_with_frequency in collection:
+        aggregator.add(words_with_frequency)
+    for k in [1, 10, 500, 20_000]:
+        assert (
+            aggregator.top(k)
+            == flatten_and_sort_words_with_frequency(aggregator.words)[:k]
+        )
+
+
+def test_limit_on_large_vocabulary(mocker):
+    spy = mocker.spy(pipeline_module, "flatten_and_sort_words_with_frequency")
+    collection = [
+        {f"word{i}": {"doc": i % 1000} for i in range(1, LARGE_VOCABULARY + 1)}
+    ]
+
+    result = aggregate_words_with_frequency(collection, limit=10)
+
+    # 999 is the highest frequency, ties are broken alphabetically
+    assert (
+        sorted(result)
+        == sorted(f"word{i}" for i in range(999, LARGE_VOCABULARY + 1, 1000))[:10]
+    )
+    assert all(v["doc"] == 999 for v in result.values())
+    assert spy.call_count == 0
+
+
+def test_top_k_does_not_sort_vocabulary(mocker):
+    comparisons = 0
+
+    @total_ordering
+    class Counted:
+        def __init__(self, key):
+            self.key = key
+
+        def __eq__(self, other):
+            return self.key == other.key
+
+        def __lt__(self, other):
+            nonlocal comparisons
+            comparisons += 1
+            return self.key < other.key
+
+    mocker.patch.object(
+        aggregation_module,
+        "frequency_order",
+        lambda word_with_frequency: Counted(frequency_order(word_with_frequency)),
+    )
+    for vocabulary_size in (LARGE_VOCABULARY // 100, LARGE_VOCABULARY // 10):
+        aggregator = WordFrequencyAggregator()
+        aggregator.totals.update((f"word{i}", i % 997) for i in range(vocabulary_size))
+        comparisons = 0
+        top = aggregator.top(10)
+        assert top == sorted(aggregator.totals.items(), key=frequency_order)[:10]
+        # a bounded heap compares each word about once, sorting needs log2(V) times that
+        assert 0 < comparisons < 2 * vocabulary_size
+
+
+def test_words_view_is_dict_compatible(aggregator):
+    assert aggregator.words == {
+        "cat": {"doc1": 2, "doc2": 1},
+        "mat": {"doc1": 1},
+        "sat": {"doc1": 1},
+        "dog": {"doc2": 3},
+    }
+    postings = aggregator.words["cat"]
+    assert list(postings.items()) == [("doc1", 2), ("doc2", 1)]
+    assert sum(postings.values()) == 3
+    assert postings["doc2"] == 1
+    assert "doc3" not in postings
+    assert repr(postings) == "{'doc1': 2, 'doc2': 1}"
+    assert repr(aggregator.words["dog"]) == "{'doc2': 3}"
+    with pytest.raises(KeyError):
+        aggregator.words["unseen"]
+
+
+def test_documents_stored_once(aggregator):
+    assert aggregator.documents == ["doc1", "doc2"]
+    aggregator.add({"cat": {"doc1": 1}, "dog": {"doc1": 2}})
+    assert aggregator.documents == ["doc1", "doc2"]
+    assert aggregator.words["dog"] == {"doc2": 3, "doc1": 2}
+    assert aggregator.words["mat"] == {"doc1": 1}
+    assert aggregator.totals == {"cat": 2, "mat": 1, "sat": 1, "dog": 5}
+
+
+def test_copy_is_independent(aggregator):
+    copied = aggregator.copy()
+    aggregator.add({"cat": {"doc3": 4}, "mat": {"doc1": 7}, "owl": {"doc3": 1}})
+    assert copied.words == {
+        "cat": {"doc1": 2, "doc2": 1},
+        "mat": {"doc1": 1},
+        "sat": {"doc1": 1},
+        "dog": {"doc2": 3},
+    }
+    assert copied.totals == {"cat": 3, "mat": 1, "sat": 1, "dog": 3}
+    assert aggregator.copy(2).words == {
+        "cat": {"doc1": 2, "doc2": 1, "doc3": 4},
+        "mat": {"doc1": 7},
+    }
+
+
+def test_matches_dict_of_dicts():
+    collection = random_collection(2_000, 50, seed=1)
+    collection += random_collection(2_000, 50, seed=2)
+    aggregator = WordFrequencyAggregator()
+    for words_with_frequency in collection:
+        aggregator.add(words_with_frequency)
+
+    # built the way the aggregate was before posting lists
+    expected = {}
+    for words_with_frequency in collection:
+        for word, v in words_with_frequency.items():
+            for document, frequency in v.items():
+                expected.setdefault(word, {})[document] = frequency
+    assert aggregator.words == expected
+    totals = {word: sum(v.values()) for word, v in expected.items()}
+    assert aggregator.totals == totals
+    ranked = sorted(totals.items(), key=lambda pair: (-pair[1], pair[0]))
+    assert aggregator.top(100) == ranked[:100]
+    assert aggregator.top(len(totals)) == ranked